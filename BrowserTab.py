@@ -1,49 +1,56 @@
-try:
-    from PyQt6.QtCore import Qt, QUrl, QSize, QEvent
-    from PyQt6.QtGui import QAction, QIcon, QKeySequence, QShortcut  # <-- QShortcut here!
-    from PyQt6.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
-        QLineEdit, QTabBar, QStackedWidget, QToolButton, QFileDialog, QLabel,
-        QStyle, QMessageBox, QSizePolicy
-    )
-    from PyQt6.QtWebEngineWidgets import QWebEngineView
-    from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
-    USING_QT6 = True
-except Exception:
-    from PyQt5.QtCore import Qt, QUrl, QSize, QEvent
+from typing import Optional
+
+from perf import LoadMetrics
+from private_profile import PrivateProfilePool
+from request_interceptor import ContentBlocker, attach_interceptor
+from qtcompat import QUrl, QVBoxLayout, QWebEnginePage, QWebEngineView, QWidget
+
 
 class BrowserTab(QWidget):
-    def __init__(self, parent=None, url: QUrl = QUrl("about:blank"), private: bool = False):
+    def __init__(self, parent=None, url: QUrl = QUrl("about:blank"), private: bool = False,
+                 defer_load: bool = False):
         super().__init__(parent)
         self.private = private
+        # With defer_load the URL waits for start_load() (see LoadScheduler)
+        self._pending_url: Optional[QUrl] = url if defer_load else None
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
 
         self.view = QWebEngineView(self)
 
-        # Set up a private/off-the-record profile when requested
+        # Private tabs share their window's off-the-record profile
+        self._profile_pool = None
         if private:
-            profile = QWebEngineProfile(self.view)
-            # Best-effort cross-version incognito:
-            try:
-                # Qt6 API
-                profile.setOffTheRecord(True)  # type: ignore[attr-defined]
-            except Exception:
-                # Qt5 fallback: no persistent storage/cookies/cache
-                try:
-                    profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.NoPersistentCookies)  # type: ignore
-                except Exception:
-                    pass
-                try:
-                    profile.setPersistentStoragePath('')
-                    profile.setCachePath('')
-                except Exception:
-                    pass
-            page = QWebEnginePage(profile, self.view)
+            self._profile_pool = PrivateProfilePool.for_window(parent)
+            page = QWebEnginePage(self._profile_pool.acquire(), self.view)
             self.view.setPage(page)
 
         self.layout.addWidget(self.view)
-        self.view.setUrl(url)
+        # A new page starts its blocked-request count from zero; the count
+        # is the page's own where Qt allows a per-page interceptor
+        self._interceptor = attach_interceptor(self.view.page())
+        counts = self._interceptor or ContentBlocker.shared()
+        self.view.urlChanged.connect(counts.reset)
+        # Load timings for tbrowser://perf/ and the /perf:hud overlay
+        self.metrics = LoadMetrics()
+        self.view.loadStarted.connect(self.metrics.load_started)
+        self.view.loadFinished.connect(lambda ok: self.metrics.load_finished(self.view.page(), ok))
+        if not defer_load:
+            self.view.setUrl(url)
+
+    def start_load(self):
+        if self._pending_url is not None:
+            url, self._pending_url = self._pending_url, None
+            self.view.setUrl(url)
+
+    def is_load_pending(self) -> bool:
+        return self._pending_url is not None
+
+    def release_profile(self):
+        """Call before deleteLater() so the shared private profile can be freed."""
+        if self._profile_pool is not None:
+            self._profile_pool.release()
+            self._profile_pool = None
 
     def title(self) -> str:
         try:
@@ -52,7 +59,50 @@ class BrowserTab(QWidget):
             return "New Tab"
 
     def url(self) -> QUrl:
-        return self.view.url()
+        return self._pending_url if self._pending_url is not None else self.view.url()
+
+    def is_private(self) -> bool:
+        return self.private
+
+    def blocked_requests(self) -> int:
+        """Requests the content blocker stopped on the current page."""
+        if self._interceptor is not None:
+            return self._interceptor.blocked
+        return ContentBlocker.shared().blocked_on(self.url())
+
+    def renderer_pid(self) -> int:
+        try:
+            return int(self.view.page().renderProcessPid())
+        except Exception:
+            return 0
+
+    def lifecycle_state(self):
+        return self.view.page().lifecycleState()
+
+    def is_discarded(self) -> bool:
+        try:
+            return self.lifecycle_state() == QWebEnginePage.LifecycleState.Discarded
+        except Exception:
+            return False
+
+
+class PendingTab(QWidget):
+    """Placeholder for a restored tab: just a URL and a title, no web view.
+
+    MainWindow swaps it for a real BrowserTab the first time it is activated,
+    so restoring a large session costs about as much as opening one tab.
+    """
+
+    def __init__(self, parent=None, url: QUrl = QUrl("about:blank"), title: str = ""):
+        super().__init__(parent)
+        self._url = url
+        self._title = title or url.toString()
+
+    def title(self) -> str:
+        return self._title
+
+    def url(self) -> QUrl:
+        return self._url
 
     def is_private(self) -> bool:
-        return self.private
\ No newline at end of file
+        return False
@@ -1,69 +1,60 @@
-import json
 import os
-from pathlib import Path
-import re
-import time
-from typing import Optional
+from typing import List, Optional
 
-import urllib
-from BrowserTab import BrowserTab
+import urllib.parse
+from BrowserTab import BrowserTab, PendingTab
 from cmd_palette import CommandPalette
 from commands import command_handler
-from shortcuts import shortcuts
-from constants import ASSETS_DIR, HISTORY_FILE, COMMANDS_JSON
-from utils import to_qurl, read_asset, resource_icon
-
-try:
-    from PyQt6.QtCore import Qt, QUrl, QSize, QEvent
-    from PyQt6.QtGui import QAction, QIcon, QKeySequence, QShortcut  # <-- QShortcut here!
-    from PyQt6.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
-        QLineEdit, QTabBar, QStackedWidget, QToolButton, QFileDialog, QLabel,
-        QStyle, QMessageBox, QSizePolicy
-    )
-    from PyQt6.QtWebEngineWidgets import QWebEngineView
-    from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
-    USING_QT6 = True
-except Exception:
-    from PyQt5.QtCore import Qt, QUrl, QSize, QEvent
+from keymap import KeymapDispatcher
+from constants import ASSETS_DIR
+from history_store import HistoryStore
+from completion import CompletionIndex
+from load_scheduler import LoadScheduler
+from page_capture import capture_current_tab
+from perf import PerfHud
+from tab_lifecycle import TabLifecycleManager
+from private_profile import PrivateProfilePool
+from session import SessionManager
+from scheme_handler import NEW_TAB_URL, PRIVATE_TAB_URL
+from utils import to_qurl, resource_icon
+from qtcompat import (
+    Qt, QApplication, QHBoxLayout, QMainWindow, QMessageBox,
+    QSizePolicy, QStackedWidget, QTabBar, QToolButton, QUrl, QVBoxLayout, QWidget,
+    USING_QT6
+)
 
 
-    
-    
 class MainWindow(QMainWindow):
     windows = []
 
     @classmethod
-    def new_window(cls):
-        w = cls()
+    def new_window(cls, session: Optional[dict] = None, defer_load: bool = False):
+        """Create and register a window; ``defer_load`` leaves its tabs unloaded
+        until load_current_tab() (startup shows windows before WebEngine work)."""
+        w = cls(session)
         cls.windows.append(w)
+        w.session.mark_dirty(w)
+        if not defer_load:
+            w.load_current_tab()
         return w
-    
-    def _load_history(self):
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return []
 
-    def _save_history(self):
-        try:
-            os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-            try:
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    existing_history = json.load(f)
-            except Exception:
-                existing_history = []
-            urls = set(entry["url"] for entry in existing_history)
-            merged_history = existing_history[:]
-            for entry in self.global_history:
-                if entry["url"] not in urls:
-                    merged_history.append(entry)
-                    urls.add(entry["url"])
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(merged_history, f)
-        except Exception:
-            pass
+    @classmethod
+    def open_args(cls, args: List[str]) -> None:
+        """Open URLs and run /commands from the command line (or a later launch)."""
+        active = QApplication.activeWindow()
+        win = active if active in cls.windows else (cls.windows[-1] if cls.windows else None)
+        if win is None or not args:
+            # A bare relaunch asks for a new window, like other browsers
+            win = cls.new_window()
+        for arg in args:
+            if arg.startswith("/"):
+                win.handle_command(arg)
+            else:
+                win.new_tab(to_qurl(arg))
+        win.show()
+        win.raise_()
+        win.activateWindow()
+    
     def go_back(self):
         tab = self.current_tab()
         if tab:
@@ -83,15 +74,21 @@ class MainWindow(QMainWindow):
         command_handler(self, text, new_window_factory=type(self).new_window)
     
     def _make_shortcuts(self):
-        shortcuts(self)
+        # Global chords are handled by the dispatcher's one app-wide filter
+        KeymapDispatcher.shared(type(self).windows).install_shortcuts(self)
             
-    def __init__(self):
+    def __init__(self, session: Optional[dict] = None):
         super().__init__()
         self.setWindowTitle("TBrowser")
         self.resize(1200, 800)
 
-        # Global (non-private) history
-        self.global_history = self._load_history()
+        # Freezes/discards background tabs across all windows
+        self.lifecycle = TabLifecycleManager.shared()
+        # Starts tab loads a few at a time, foreground first
+        self.loads = LoadScheduler.shared()
+        # Set while a command batch runs, so only its last tab takes focus
+        self.open_tabs_in_background = False
+        self.session = SessionManager.shared(type(self).windows)
 
         # Central layout (stack for tabs + bottom bar)
         central = QWidget(self)
@@ -159,6 +156,7 @@ class MainWindow(QMainWindow):
         self.tabbar.setTabsClosable(True)
         self.tabbar.currentChanged.connect(self.on_tab_changed)
         self.tabbar.tabCloseRequested.connect(self.close_tab)
+        self.tabbar.tabMoved.connect(self._on_tab_moved)
 
         h.addWidget(self.btn_back)
         h.addWidget(self.btn_forward)
@@ -170,47 +168,118 @@ class MainWindow(QMainWindow):
 
         # Slash Command Palette overlay
         self.palette = CommandPalette(self)
+        # /perf:hud overlay, built on first use
+        self.perf_hud: Optional[PerfHud] = None
 
         # Shortcuts
         self._make_shortcuts()
-        QApplication.instance().installEventFilter(self)
-
-        # Start with one tab
-        new_tab_html = read_asset("browser_pages/new_tab.html")
-        self.new_tab(QUrl("about:blank"))
-        tab = self.current_tab()
-        if tab:
-            tab.view.setHtml(new_tab_html, QUrl("about:blank"))
 
+        # Tabs start as placeholders, so the window can be shown before any
+        # web view exists; signals are blocked so adding them doesn't
+        # activate (and build) tab 0. See load_current_tab().
+        entries = (session or {}).get("tabs") or [{"url": NEW_TAB_URL, "title": "New Tab"}]
+        self.tabbar.blockSignals(True)
+        for entry in entries:
+            self.add_pending_tab(QUrl(entry.get("url", "about:blank")), entry.get("title", ""))
+        current = int((session or {}).get("current", 0))
+        self.tabbar.setCurrentIndex(min(max(current, 0), self.tabbar.count() - 1))
+        self.stack.setCurrentIndex(self.tabbar.currentIndex())
+        self.tabbar.blockSignals(False)
+
+    @property
+    def history(self) -> HistoryStore:
+        # Global (non-private) history, shared by every window; opened lazily
+        return HistoryStore.shared()
+
+    def load_current_tab(self):
+        """Build the web view of the current (placeholder) tab."""
+        self.on_tab_changed(self.tabbar.currentIndex())
 
     # --- Tabs management -----------------------------------------------------
-    def new_tab(self, url: QUrl, private: bool = False) -> int:
-        tab = BrowserTab(self, url=url, private=private)
+    def new_tab(self, url: QUrl, private: bool = False, background: bool = False) -> int:
+        tab = BrowserTab(self, url=url, private=private, defer_load=True)
+        background = background or self.open_tabs_in_background
+        tindex = self._add_tab(tab, "Private" if private else "New Tab", private, background)
+        self.loads.request(tab)
+        return tindex
+
+    def adopt_tab(self, tab: BrowserTab, load_ok: Optional[bool] = None) -> int:
+        """Show a tab that started loading out of view (a palette prerender).
+
+        ``load_ok`` is the result of a load that already finished, which the
+        window would otherwise never hear about.
+        """
+        tindex = self._add_tab(tab, self._short_title(tab.title()), False)
+        tab.show()
+        if load_ok is not None:
+            self._on_load_finished(tab, load_ok)
+        return tindex
+
+    def _add_tab(self, tab: BrowserTab, label: str, private: bool, background: bool = False) -> int:
         idx = self.stack.addWidget(tab)
-        label = "Private" if private else "New Tab"
         tindex = self.tabbar.addTab(label)
         if private:
             # Purple label to indicate private
             self.tabbar.setTabTextColor(tindex, Qt.GlobalColor.magenta if USING_QT6 else Qt.magenta)
-        self.tabbar.setCurrentIndex(tindex)
-        self.stack.setCurrentIndex(idx)
+        if not background:
+            self.tabbar.setCurrentIndex(tindex)
+            self.stack.setCurrentIndex(idx)
 
+        self._wire_tab(tab)
+        if not background:
+            self.lifecycle.touch(tab)
+        return tindex
+
+    def _wire_tab(self, tab: BrowserTab):
         # Wiring signals to update tab text + history
         tab.view.titleChanged.connect(lambda _=None, t=tab: self._update_tab_title(t))
         tab.view.urlChanged.connect(lambda _=None, t=tab: self._on_url_changed(t))
         tab.view.loadFinished.connect(lambda ok, t=tab: self._on_load_finished(t, ok))
-
+        self.lifecycle.track(tab)
+        self.session.mark_dirty(self)
+
+    def add_pending_tab(self, url: QUrl, title: str = "") -> int:
+        """Add a tab that only becomes a BrowserTab when first activated."""
+        self.stack.addWidget(PendingTab(self, url=url, title=title))
+        tindex = self.tabbar.addTab(self._short_title(title or url.toString()))
+        self.tabbar.setTabToolTip(tindex, url.toString())
         return tindex
 
+    def _materialize(self, index: int, pending: PendingTab) -> BrowserTab:
+        url = pending.url()
+        if url.toString() in ("", "about:blank"):
+            url = QUrl(NEW_TAB_URL)
+        tab = BrowserTab(self, url=url, private=False, defer_load=True)
+        self.stack.insertWidget(index, tab)
+        self.stack.removeWidget(pending)
+        pending.deleteLater()
+        self.stack.setCurrentIndex(index)
+        self._wire_tab(tab)
+        self.loads.request(tab)
+        return tab
+
+    def _on_tab_moved(self, from_index: int, to_index: int):
+        # Keep the stack in the same order as the tab bar
+        w = self.stack.widget(from_index)
+        self.stack.removeWidget(w)
+        self.stack.insertWidget(to_index, w)
+        self.stack.setCurrentIndex(self.tabbar.currentIndex())
+        self.session.mark_dirty(self)
+
     def close_tab(self, index: int):
         if self.tabbar.count() <= 1:
             # Keep at least one tab open
             self.reload_page()
             return
         w = self.stack.widget(index)
+        self.lifecycle.forget(w)
+        self.loads.forget(w)
         self.stack.removeWidget(w)
         w.deleteLater()
+        if isinstance(w, BrowserTab):
+            w.release_profile()
         self.tabbar.removeTab(index)
+        self.session.mark_dirty(self)
         # Ensure a valid current index
         if self.tabbar.count() > 0:
             self.tabbar.setCurrentIndex(max(0, index - 1))
@@ -223,6 +292,14 @@ class MainWindow(QMainWindow):
     def on_tab_changed(self, index: int):
         if 0 <= index < self.stack.count():
             self.stack.setCurrentIndex(index)
+            tab = self.stack.widget(index)
+            if isinstance(tab, PendingTab):
+                tab = self._materialize(index, tab)
+            if isinstance(tab, BrowserTab):
+                # Wakes frozen tabs; discarded ones reload from their URL
+                self.lifecycle.touch(tab)
+                self.loads.activated(tab)
+            self.session.mark_dirty(self)
 
     def current_tab(self) -> Optional[BrowserTab]:
         idx = self.tabbar.currentIndex()
@@ -247,250 +324,92 @@ class MainWindow(QMainWindow):
             self.tabbar.setCurrentIndex(prev_idx)
     
     def onew_tab(self):
-        new_tab_html = read_asset("browser_pages/new_tab.html")
-        self.new_tab(QUrl("about:blank"))
-        tab = self.current_tab()
-        if tab:
-            tab.view.setHtml(new_tab_html, QUrl("about:blank"))
+        self.new_tab(QUrl(NEW_TAB_URL))
     
     def onew_ptab(self):
-        new_tab_html = read_asset("browser_pages/new-ptab.html")
-        self.new_tab(QUrl("about:blank"))
-        tab = self.current_tab()
-        if tab:
-            tab.view.setHtml(new_tab_html, QUrl("about:blank"))
+        self.new_tab(QUrl(PRIVATE_TAB_URL), private=True)
             
-    def eventFilter(self, obj, event):
-        try:
-            # Qt5/Qt6 compatibility shims
-            KeyPressType   = (QEvent.Type.KeyPress if USING_QT6 else QEvent.KeyPress)
-            ShortcutOvType = (QEvent.Type.ShortcutOverride if USING_QT6 else QEvent.ShortcutOverride)
-
-            evt_type = event.type()
-
-            # We handle BOTH KeyPress and ShortcutOverride.
-            if evt_type not in (KeyPressType, ShortcutOvType):
-                return super().eventFilter(obj, event)
-
-            key  = event.key()
-            mods = event.modifiers()
-
-            CtrlMod  = (Qt.KeyboardModifier.ControlModifier if USING_QT6 else Qt.ControlModifier)
-            ShiftMod = (Qt.KeyboardModifier.ShiftModifier   if USING_QT6 else Qt.ShiftModifier)
-            MetaMod  = (Qt.KeyboardModifier.MetaModifier    if USING_QT6 else Qt.MetaModifier)
-
-            ctrl  = bool(mods & CtrlMod)
-            shift = bool(mods & ShiftMod)
-            meta  = bool(mods & MetaMod)   # Cmd on macOS
-
-            TabKey     = (Qt.Key.Key_Tab     if USING_QT6 else Qt.Key_Tab)
-            BackTabKey = (Qt.Key.Key_Backtab if USING_QT6 else Qt.Key_Backtab)
-            PageUpKey   = (Qt.Key.Key_PageUp   if USING_QT6 else Qt.Key_PageUp)
-            PageDownKey = (Qt.Key.Key_PageDown if USING_QT6 else Qt.Key_PageDown)
-            HKey       = (Qt.Key.Key_H       if USING_QT6 else Qt.Key_H)
-
-            is_tab     = (key == TabKey)
-            is_backtab = (key == BackTabKey)
-
-            # ---------- Tab switching ----------
-            # Ctrl+Shift+Tab or Backtab → previous tab
-            if ctrl and (is_backtab or (shift and is_tab)):
-                if evt_type == ShortcutOvType:
-                    event.accept()     # claim the shortcut before QWebEngineView does
-                self.prev_tab()
-                return True
-
-            # Ctrl+Tab → next tab
-            if ctrl and is_tab and not shift:
-                if evt_type == ShortcutOvType:
-                    event.accept()
-                self.next_tab()
-                return True
-
-            # Optional alternates: Ctrl+PageUp / Ctrl+PageDown
-            if ctrl and key == PageUpKey:
-                if evt_type == ShortcutOvType:
-                    event.accept()
-                self.prev_tab()
-                return True
-
-            if ctrl and key == PageDownKey:
-                if evt_type == ShortcutOvType:
-                    event.accept()
-                self.next_tab()
-                return True
-
-            # ---------- History (mac-safe + cross-platform) ----------
-            # macOS: Cmd+Shift+H (avoid Cmd+H which is "Hide")
-            if meta and shift and key == HKey:
-                if evt_type == ShortcutOvType:
-                    event.accept()
-                self.open_history_tab()
-                return True
-
-            # Windows/Linux: Ctrl+H
-            if ctrl and key == HKey:
-                if evt_type == ShortcutOvType:
-                    event.accept()
-                self.open_history_tab()
-                return True
-
-        except Exception:
-            pass
-
-        return super().eventFilter(obj, event)
-
-
     def _update_tab_title(self, tab: BrowserTab):
         try:
+            if tab.is_discarded():
+                return  # keep the last real title in the tab bar
             idx = self.stack.indexOf(tab)
             if idx != -1:
-                title = tab.title()
-                # Keep titles reasonably short
-                if len(title) > 28:
-                    title = title[:28] + "…"
-                self.tabbar.setTabText(idx, title)
+                self.tabbar.setTabText(idx, self._short_title(tab.title()))
+                self.session.mark_dirty(self)
         except Exception:
             pass
 
+    @staticmethod
+    def _short_title(title: str) -> str:
+        # Keep titles reasonably short
+        if len(title) > 28:
+            title = title[:28] + "…"
+        return title
+
     def _on_url_changed(self, tab: BrowserTab):
         # Could reflect URL elsewhere if we add an address bar in future
-        pass
+        if not tab.is_private():
+            self.session.mark_dirty(self)
 
     def _on_load_finished(self, tab: BrowserTab, ok: bool):
-        # Record into global (non-private) history
-        if ok and not tab.is_private():
+        # Record into global (non-private) history; the store skips
+        # consecutive duplicates of the same URL
+        if ok and not tab.is_private() and tab.url().scheme() != "tbrowser":
             url = tab.url().toString()
             title = tab.title() or url
-            # De-duplicate consecutive entries for same URL
-            entry = {"title": title, "url": url, "timestamp": time.time()}
-            # Load latest history from file before appending
-            latest_history = self._load_history()
-            # Only append if not duplicate of last entry in file
-            if not latest_history or latest_history[-1].get("url") != url:
-                latest_history.append(entry)
-                self.global_history = latest_history
-                self._save_history()
-
-    def _save_history(self):
-        try:
-            os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-            try:
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    existing_history = json.load(f)
-            except Exception:
-                existing_history = []
-            urls = set(entry["url"] for entry in existing_history)
-            merged_history = existing_history[:]
-            for entry in self.global_history:
-                if entry["url"] not in urls:
-                    merged_history.append(entry)
-                    urls.add(entry["url"])
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(merged_history, f)
-        except Exception:
-            pass
+            if self.history.record_visit(url, title):
+                CompletionIndex.shared().record_visit(url, title)
+        idx = self.stack.indexOf(tab)
+        if idx != -1:
+            blocked = tab.blocked_requests()
+            tip = tab.url().toString()
+            self.tabbar.setTabToolTip(idx, f"{tip}\n{blocked} requests blocked" if blocked else tip)
 
     def closeEvent(self, event):
-        if self.global_history:
-            self._save_history()
+        # Push queued visits to disk before the window goes away
+        self.history.flush()
+        for i in range(self.stack.count()):
+            self.lifecycle.forget(self.stack.widget(i))
+            self.loads.forget(self.stack.widget(i))
+        PrivateProfilePool.drop_window(self)
+        if type(self).windows == [self]:
+            # Last window: its tabs are the session to restore next time
+            self.session.save_now()
+            self.session.freeze()
+        if self in type(self).windows:
+            type(self).windows.remove(self)
+            self.session.mark_dirty(self)
         super().closeEvent(event)
 
-    def open_history_tab(self):
-        html = read_asset("browser_pages/history.html")
-        # Use current session history for dynamic updates
-        history = self.global_history
-        history_items = ""
-        for entry in reversed(history):
-            ts = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["timestamp"]))
-            history_items += f'<li><a href="{entry["url"]}">{entry["title"]}</a> <small>{ts}</small></li>\n'
-        if history_items:
-            html = html.replace("<!-- HISTORY_ITEMS -->", f"<ul>{history_items}</ul>")
-        else:
-            html = html.replace("<!-- HISTORY_ITEMS -->", "<p><em>No history yet (private tabs are excluded).</em></p>")
-        tab_index = self.new_tab(QUrl("about:blank"), private=False)
-        tab = self.current_tab()
-        if tab:
-            tab.view.setHtml(html, QUrl("about:blank"))
-            self.tabbar.setTabText(tab_index, "History")
+    def open_history_tab(self, query: str = ""):
+        # Served by scheme_handler in pages, so the cost doesn't grow with history
+        url = QUrl("tbrowser://history/")
+        if query:
+            url.setQuery(urllib.parse.urlencode({"q": query}))
+        tab_index = self.new_tab(url, private=False)
+        self.tabbar.setTabText(tab_index, f"History: {query}" if query else "History")
 
     def open_help_tab(self):
-        help_html = read_asset("browser_pages/help.html")
-        tab_index = self.new_tab(QUrl("about:blank"), private=False)
-        tab = self.current_tab()
-        if tab:
-            tab.view.setHtml(help_html, QUrl("about:blank"))
-            self.tabbar.setTabText(tab_index, "Help")
-    
-    
+        self.new_tab(QUrl("tbrowser://help/"), private=False)
+
     def open_commands_tab(self):
-        # 1) Load the HTML template
-        html = read_asset("browser_pages/commands.html") or ""
+        # The page fetches the maps from tbrowser://commands/api itself
+        self.new_tab(QUrl("tbrowser://commands/"), private=False)
 
-        # 2) Load commands.json
-        cmd_path = COMMANDS_JSON if isinstance(COMMANDS_JSON, Path) else Path(COMMANDS_JSON)
-        try:
-            maps = json.loads(cmd_path.read_text(encoding="utf-8")) if cmd_path.exists() else {}
-        except Exception as e:
-            maps = {}
-            print("[maps] failed reading commands.json:", e)
-
-        # 3) Build table rows on the server side (no JS needed)
-        if maps:
-            rows = "\n".join(
-                f'<tr><td class="cmd">/{name}</td><td class="tpl"><code>{template}</code></td></tr>'
-                for name, template in sorted(maps.items())
-            )
-        else:
-            rows = '<tr><td colspan="2" class="empty">No maps found.</td></tr>'
-
-        # 4) Replace the tbody content if present; otherwise, append a full table
-        tbody_pattern = re.compile(
-            r'(<tbody[^>]*id=["\']maps-body["\'][^>]*>)(.*?)(</tbody>)',
-            flags=re.S | re.I
-        )
-        if tbody_pattern.search(html):
-            html = tbody_pattern.sub(rf'\1{rows}\3', html)
-        else:
-            # If the template has no target tbody, append a minimal table
-            table_html = f"""
-            <table>
-            <thead><tr><th>Command</th><th>Template</th></tr></thead>
-            <tbody id="maps-body">
-                {rows}
-            </tbody>
-            </table>
-            """
-            # try to insert before </body>, or just append
-            html = html.replace("</body>", table_html + "\n</body>") if "</body>" in html else html + table_html
-
-        # 5) Show the page
-        tab_index = self.new_tab(QUrl("about:blank"), private=False)
-        tab = self.current_tab()
-        if tab:
-            tab.view.setHtml(html, QUrl("about:blank"))
-            self.tabbar.setTabText(tab_index, "Maps")
-        
-    def capture_screenshot(self):
-        tab = self.current_tab()
-        if not tab:
-            return
-        # Grab the visible widget area
-        pix = tab.view.grab()
-        if pix.isNull():
-            QMessageBox.warning(self, "Screenshot", "Failed to capture screenshot.")
-            return
+    def open_perf_tab(self):
+        # Load metrics of every tab in every window, from tbrowser://perf/api
+        self.new_tab(QUrl("tbrowser://perf/"), private=False)
 
-        default_name = time.strftime("tbrowser_%Y%m%d_%H%M%S.png")
-        # Ask user where to save
-        path, _ = QFileDialog.getSaveFileName(self, "Save Screenshot", default_name, "PNG Image (*.png)")
-        if not path:
-            return
-        saved = pix.save(path, "PNG")
-        if saved:
-            self.statusBar().showMessage(f"Saved screenshot: {path}", 5000)
-        else:
-            QMessageBox.warning(self, "Screenshot", "Failed to save screenshot.")
+    def toggle_perf_hud(self):
+        if self.perf_hud is None:
+            self.perf_hud = PerfHud(self)
+        self.perf_hud.toggle()
+
+    def capture_screenshot(self, options: str = ""):
+        # Encoding and the disk write happen on screenshots' worker pool;
+        # /capture:full and /capture:all are driven by page_capture
+        capture_current_tab(self, options)
 
     # --- Events --------------------------------------------------------------
     def keyPressEvent(self, event):
@@ -509,4 +428,6 @@ class MainWindow(QMainWindow):
         if self.palette.isVisible():
             self.palette.toggle()  # will recompute geometry
             self.palette.toggle()
-        super().resizeEvent(event)
\ No newline at end of file
+        super().resizeEvent(event)
+        if self.perf_hud is not None and self.perf_hud.isVisible():
+            self.perf_hud.refresh()  # stay in the corner
\ No newline at end of file
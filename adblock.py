@@ -0,0 +1,432 @@
+"""EasyList-style blocklists compiled into a fast URL matcher.
+
+Pure Python (no Qt) so it can be loaded on a worker thread and benchmarked
+on its own; request_interceptor.py plugs it into QtWebEngine.
+"""
+import os
+import pickle
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bump when the pickled layout changes
+CACHE_VERSION = 2
+
+# Literal part of a pattern rule fed to Aho-Corasick. Capping the length
+# keeps the automaton small; the rule's regex confirms every hit anyway.
+TOKEN_MAX = 8
+TOKEN_MIN = 3
+
+RESOURCE_TYPES = (
+    "document", "subdocument", "stylesheet", "script", "image", "font", "object",
+    "xmlhttprequest", "ping", "media", "websocket", "other",
+)
+_TYPE_BITS = {name: 1 << i for i, name in enumerate(RESOURCE_TYPES)}
+_ALL_TYPES = (1 << len(RESOURCE_TYPES)) - 1
+_TYPE_ALIASES = {"xhr": "xmlhttprequest", "frame": "subdocument", "css": "stylesheet"}
+
+# Suffixes under which every name is its own site. Not the Public Suffix
+# List: hosts under suffixes missing here (e.g. "*.blogspot.com" sites)
+# still count as first-party to each other.
+_MULTI_LABEL_SUFFIXES = frozenset({
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "ltd.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au", "co.nz", "org.nz",
+    "co.jp", "ne.jp", "or.jp", "ac.jp", "co.kr", "or.kr", "co.in", "net.in", "org.in",
+    "com.br", "net.br", "org.br", "com.cn", "net.cn", "org.cn", "com.hk", "com.tw",
+    "com.sg", "com.my", "co.id", "co.th", "com.mx", "com.ar", "com.co", "com.tr",
+    "co.za", "co.il", "com.ua", "com.pl", "github.io", "gitlab.io", "pages.dev",
+    "herokuapp.com", "appspot.com", "netlify.app", "vercel.app", "blogspot.com",
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9%%._/=-]{%d,}" % TOKEN_MIN)
+
+
+class Rule:
+    """One network rule's conditions (everything but the URL pattern)."""
+    __slots__ = ("third_party", "types", "include", "exclude", "important")
+
+    def __init__(self, third_party: Optional[bool] = None, types: int = 0,
+                 include: Tuple[str, ...] = (), exclude: Tuple[str, ...] = (),
+                 important: bool = False):
+        self.third_party = third_party
+        self.types = types            # bitmask of RESOURCE_TYPES, 0 = not restricted
+        self.include = include        # domain= first-party domains
+        self.exclude = exclude        # domain=~ first-party domains
+        self.important = important    # $important: blocks despite @@ exceptions
+
+    def __getstate__(self):
+        return (self.third_party, self.types, self.include, self.exclude, self.important)
+
+    def __setstate__(self, state):
+        self.third_party, self.types, self.include, self.exclude, self.important = state
+
+    def applies(self, third_party: bool, type_bit: int, site: str) -> bool:
+        if self.third_party is not None and self.third_party != third_party:
+            return False
+        if self.types and not self.types & type_bit:
+            return False
+        if self.exclude and _on_domain(site, self.exclude):
+            return False
+        if self.include and not _on_domain(site, self.include):
+            return False
+        return True
+
+
+ANY = Rule()
+
+
+def _on_domain(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def _parse_options(text: str) -> Optional[Rule]:
+    third_party = None
+    important = False
+    types = negated = 0
+    include, exclude = [], []
+    for opt in text.lower().split(","):
+        opt = opt.strip()
+        name = opt.lstrip("~")
+        inverse = opt.startswith("~")
+        if name in ("third-party", "3p"):
+            third_party = not inverse
+        elif name in ("first-party", "1p"):
+            third_party = inverse
+        elif name.startswith("domain="):
+            for d in opt[len("domain="):].split("|"):
+                (exclude if d.startswith("~") else include).append(d.lstrip("~"))
+        elif _TYPE_ALIASES.get(name, name) in _TYPE_BITS:
+            bit = _TYPE_BITS[_TYPE_ALIASES.get(name, name)]
+            if inverse:
+                negated |= bit
+            else:
+                types |= bit
+        elif name == "important":
+            important = True
+        elif name in ("match-case", "all") or not name:
+            continue
+        else:
+            # popup, csp, redirect, removeparam, ... change what a rule means
+            # in ways we don't implement: skip it rather than apply it too broadly
+            return None
+    if negated:
+        types = (types or _ALL_TYPES) & ~negated
+    return Rule(third_party, types, tuple(include), tuple(exclude), important)
+
+
+def _pattern_regex(pattern: str) -> str:
+    out = []
+    if pattern.startswith("||"):
+        out.append(r"^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?")
+        pattern = pattern[2:]
+    elif pattern.startswith("|"):
+        out.append("^")
+        pattern = pattern[1:]
+    end = ""
+    if pattern.endswith("|"):
+        end = "$"
+        pattern = pattern[:-1]
+    for ch in pattern:
+        if ch == "*":
+            out.append(".*")
+        elif ch == "^":
+            out.append(r"(?:[^\w.%-]|$)")
+        else:
+            out.append(re.escape(ch))
+    return "".join(out) + end
+
+
+def _token(pattern: str) -> str:
+    body = pattern.lstrip("|").rstrip("|")
+    candidates = _TOKEN_RE.findall(body.replace("^", "*"))
+    if not candidates:
+        return ""
+    # Longest literal is the most selective; trimmed to TOKEN_MAX
+    return max(candidates, key=len)[:TOKEN_MAX]
+
+
+_PURE_DOMAIN = re.compile(r"^\|\|([a-z0-9.-]+)\^?$")
+
+
+def parse_line(line: str):
+    """("domain"|"pattern", exception, target, Rule) for a network rule, else None."""
+    line = line.strip()
+    if not line or line.startswith(("!", "[")) or "##" in line or "#@#" in line \
+            or "#?#" in line or "#$#" in line:
+        return None
+    exception = line.startswith("@@")
+    if exception:
+        line = line[2:]
+    if line.startswith("/") and line.endswith("/") and len(line) > 2:
+        return None  # raw regex rules: rare and costly, skipped
+    rule = ANY
+    if "$" in line:
+        line, _, options = line.rpartition("$")
+        rule = _parse_options(options)
+        if rule is None:
+            return None
+    line = line.lower()
+    if not line or line in ("*", "|", "||"):
+        return None
+    m = _PURE_DOMAIN.match(line)
+    if m:
+        return ("domain", exception, m.group(1).strip("."), rule)
+    return ("pattern", exception, line, rule)
+
+
+class _DomainTrie:
+    """Domain suffix trie, flattened into one dict keyed by domain.
+
+    Walking a host's label suffixes ("a.b.com", "b.com", "com") is one dict
+    lookup each, and a flat dict of strings pickles an order of magnitude
+    faster than a tree of 100k nested dicts.
+    """
+
+    _ANY = (ANY,)
+
+    def __init__(self):
+        self.domains: Dict[str, Tuple[Rule, ...]] = {}
+
+    def add(self, domain: str, rule: Rule) -> None:
+        rules = self._ANY if rule is ANY else (rule,)
+        old = self.domains.get(domain)
+        self.domains[domain] = old + rules if old else rules
+
+    def lookup(self, host: str) -> List[Rule]:
+        """Rules of every listed domain that ``host`` equals or is under."""
+        found = []
+        domains = self.domains
+        while True:
+            rules = domains.get(host)
+            if rules:
+                found.extend(rules)
+            dot = host.find(".")
+            if dot == -1:
+                return found
+            host = host[dot + 1:]
+
+
+class _PatternSet:
+    """Pattern rules indexed by a literal token in an Aho-Corasick automaton.
+
+    The automaton is flattened into one {state << 8 | byte: state} dict plus
+    a failure array, which pickles and loads far faster than a node tree.
+    Rules without a usable token are kept aside and tried on every URL.
+    """
+
+    def __init__(self):
+        self.regexes: List[str] = []
+        self.rules: List[Rule] = []
+        self.goto: Dict[int, int] = {}
+        self.fail = array("I", [0])
+        self.out: Dict[int, Tuple[int, ...]] = {}
+        self.untokenized: List[int] = []
+        self._states = 1
+        self._compiled: Dict[int, "re.Pattern"] = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_compiled"] = {}
+        return state
+
+    def add(self, pattern: str, rule: Rule) -> None:
+        rid = len(self.regexes)
+        self.regexes.append(_pattern_regex(pattern))
+        self.rules.append(rule)
+        token = _token(pattern)
+        if not token:
+            self.untokenized.append(rid)
+            return
+        s = 0
+        for b in token.encode("ascii", "ignore"):
+            key = s << 8 | b
+            nxt = self.goto.get(key)
+            if nxt is None:
+                nxt = self.goto[key] = self._states
+                self._states += 1
+            s = nxt
+        self.out[s] = self.out.get(s, ()) + (rid,)
+
+    def build(self) -> None:
+        """Compute failure links (BFS) and merge outputs along them."""
+        children: Dict[int, List[Tuple[int, int]]] = {}
+        for key, nxt in self.goto.items():
+            children.setdefault(key >> 8, []).append((key & 0xFF, nxt))
+        fail = array("I", [0]) * self._states
+        queue = [nxt for _, nxt in children.get(0, ())]
+        for s in queue:  # grows while iterating: breadth-first
+            for b, nxt in children.get(s, ()):
+                f = fail[s]
+                while f and (f << 8 | b) not in self.goto:
+                    f = fail[f]
+                target = self.goto.get(f << 8 | b, 0)
+                fail[nxt] = target if target != nxt else 0
+                if fail[nxt] in self.out:
+                    self.out[nxt] = self.out.get(nxt, ()) + self.out[fail[nxt]]
+                queue.append(nxt)
+        self.fail = fail
+
+    def _regex(self, rid: int):
+        rx = self._compiled.get(rid)
+        if rx is None:
+            rx = self._compiled[rid] = re.compile(self.regexes[rid])
+        return rx
+
+    def match(self, url: str, third_party: bool, type_bit: int, site: str) -> bool:
+        goto, fail, out = self.goto, self.fail, self.out
+        tried = set()
+        s = 0
+        for b in url.encode("ascii", "ignore"):
+            while True:
+                nxt = goto.get(s << 8 | b)
+                if nxt is not None:
+                    s = nxt
+                    break
+                if not s:
+                    break
+                s = fail[s]
+            hits = out.get(s)
+            if hits:
+                for rid in hits:
+                    if rid in tried:
+                        continue
+                    tried.add(rid)
+                    if self.rules[rid].applies(third_party, type_bit, site) \
+                            and self._regex(rid).search(url):
+                        return True
+        for rid in self.untokenized:
+            if self.rules[rid].applies(third_party, type_bit, site) and self._regex(rid).search(url):
+                return True
+        return False
+
+
+def _site(host: str) -> str:
+    """Rough registrable domain for third-party checks: the last two labels,
+    or three under a _MULTI_LABEL_SUFFIXES entry such as "co.uk"."""
+    parts = host.rsplit(".", 3)
+    if len(parts) > 2 and ".".join(parts[-2:]) in _MULTI_LABEL_SUFFIXES:
+        return ".".join(parts[-3:])
+    return ".".join(parts[-2:])
+
+
+class BlockMatcher:
+    """Compiled block and exception rules from one or more lists.
+
+    $important block rules are kept apart and checked first: they win over
+    @@ exceptions.
+    """
+
+    def __init__(self):
+        self.block_domains = _DomainTrie()
+        self.allow_domains = _DomainTrie()
+        self.important_domains = _DomainTrie()
+        self.block_patterns = _PatternSet()
+        self.allow_patterns = _PatternSet()
+        self.important_patterns = _PatternSet()
+        self.rule_count = 0
+        self._init_cache()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_host_rules", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_cache()
+
+    def _init_cache(self):
+        # Pages ask for dozens of resources from the same few hosts
+        self._host_rules = lru_cache(maxsize=4096)(
+            lambda host: (tuple(self.block_domains.lookup(host)),
+                          tuple(self.allow_domains.lookup(host)),
+                          tuple(self.important_domains.lookup(host))))
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "BlockMatcher":
+        m = cls()
+        for line in lines:
+            parsed = parse_line(line)
+            if parsed is None:
+                continue
+            kind, exception, target, rule = parsed
+            if kind == "domain":
+                if exception:
+                    m.allow_domains.add(target, rule)
+                else:
+                    (m.important_domains if rule.important else m.block_domains).add(target, rule)
+            elif exception:
+                m.allow_patterns.add(target, rule)
+            else:
+                (m.important_patterns if rule.important else m.block_patterns).add(target, rule)
+            m.rule_count += 1
+        m.block_patterns.build()
+        m.allow_patterns.build()
+        m.important_patterns.build()
+        return m
+
+    def should_block(self, url: str, host: str, first_party_host: str = "",
+                     resource_type: str = "other") -> bool:
+        url = url.lower()
+        host = host.lower()
+        first_party_host = first_party_host.lower()
+        third_party = bool(first_party_host) and _site(host) != _site(first_party_host)
+        type_bit = _TYPE_BITS.get(resource_type, _TYPE_BITS["other"])
+        blocked_by, allowed_by, important_by = self._host_rules(host)
+        if any(r.applies(third_party, type_bit, first_party_host) for r in important_by) \
+                or (self.important_patterns.regexes
+                    and self.important_patterns.match(url, third_party, type_bit, first_party_host)):
+            return True
+        blocked = any(r.applies(third_party, type_bit, first_party_host) for r in blocked_by) \
+            or self.block_patterns.match(url, third_party, type_bit, first_party_host)
+        if not blocked:
+            return False
+        if any(r.applies(third_party, type_bit, first_party_host) for r in allowed_by):
+            return False
+        return not self.allow_patterns.match(url, third_party, type_bit, first_party_host)
+
+
+def _sources_key(paths: List[str]) -> tuple:
+    key = [CACHE_VERSION]
+    for p in paths:
+        st = os.stat(p)
+        key.append((os.path.basename(p), st.st_mtime_ns, st.st_size))
+    return tuple(key)
+
+
+def list_files(directory: str) -> List[str]:
+    try:
+        return sorted(os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".txt"))
+    except OSError:
+        return []
+
+
+def load_matcher(paths: List[str], cache_path: str) -> Optional[BlockMatcher]:
+    """Matcher for the lists at ``paths``, from the pickle cache when it's current."""
+    if not paths:
+        return None
+    key = _sources_key(paths)
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, matcher = pickle.load(f)
+        if cached_key == key:
+            return matcher
+    except Exception:
+        pass
+
+    def lines():
+        for p in paths:
+            with open(p, "r", encoding="utf-8", errors="replace") as f:
+                yield from f
+
+    matcher = BlockMatcher.from_lines(lines())
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((key, matcher), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    except Exception as e:
+        print("[adblock] failed writing cache:", e)
+    return matcher
@@ -1,52 +1,100 @@
 
 import sys
-import os
 import time
-import urllib.parse
-import json
-from typing import Optional
-from commands import load_user_commands
-
-from cmd_palette import CommandPalette
-from MainWindow import MainWindow
-
-
-# --- Guarded dual-imports for PyQt6 / PyQt5 compatibility --------------------
-USING_QT6 = False
-
-try:
-    from PyQt6.QtCore import Qt, QUrl, QSize, QEvent
-    from PyQt6.QtGui import QAction, QIcon, QKeySequence, QShortcut  # <-- QShortcut here!
-    from PyQt6.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
-        QLineEdit, QTabBar, QStackedWidget, QToolButton, QFileDialog, QLabel,
-        QStyle, QMessageBox, QSizePolicy
-    )
-    from PyQt6.QtWebEngineWidgets import QWebEngineView
-    from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
-    USING_QT6 = True
-except Exception:
-    from PyQt5.QtCore import Qt, QUrl, QSize, QEvent
-    from PyQt5.QtGui import QAction, QIcon, QKeySequence, QShortcut  # <-- QShortcut here!
-    from PyQt5.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
-        QLineEdit, QTabBar, QStackedWidget, QToolButton, QFileDialog, QLabel,
-        QStyle, QMessageBox, QSizePolicy
-    )
-    from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEnginePage
-
+from typing import List
 
+import ipc
+from constants import RESTORE_SESSION, SINGLE_INSTANCE, STALL_WATCHDOG
 
 
 def main():
+    started = time.perf_counter()
+    argv = sys.argv[1:]
+    if any(a == "--batch" or a.startswith("--batch=") for a in argv):
+        # Headless and self-contained: no forwarding, session or windows
+        from batch import run_batch
+        sys.exit(run_batch(argv))
+    profile = "--profile-startup" in argv
+    watch_stalls = STALL_WATCHDOG or "--watch-stalls" in argv
+    args = ipc.normalize_args([a for a in argv if a not in ("--profile-startup", "--watch-stalls")])
+    # A profiled launch always cold-starts, even with an instance running
+    if SINGLE_INSTANCE and not profile and ipc.forward(args):
+        return  # the running instance took them
+    _run(args, profile, started, watch_stalls)
+
+
+def _run(args: List[str], profile: bool, started: float, watch_stalls: bool = False) -> None:
+    # Qt + QtWebEngine imports are most of a cold start, so a launch that
+    # forwards to a running instance never makes them
+    from qtcompat import QApplication, QWebEngineProfile
+    from commands import flush_user_commands, load_user_commands, run_startup_script
+    from completion import CompletionIndex
+    from history_store import HistoryStore
+    from instance_server import InstanceServer
+    from request_interceptor import ContentBlocker, install_interceptor
+    from MainWindow import MainWindow
+    from scheme_handler import register_scheme, install_scheme_handler
+    from session import SessionManager
+    from startup import StartupProfiler, after_first_paint, run_deferred
+
+    profiler = StartupProfiler(profile, started)
+    profiler.mark("imports")
+
+    register_scheme()  # tbrowser:// has to be known before QApplication
     app = QApplication(sys.argv)
     app.setApplicationName("TBrowser")
+    if watch_stalls:
+        from stall_watchdog import StallWatchdog
+        StallWatchdog.shared().start()
+        app.aboutToQuit.connect(StallWatchdog.shared().stop)
+    install_scheme_handler(QWebEngineProfile.defaultProfile())
+    install_interceptor(QWebEngineProfile.defaultProfile())
+    profiler.mark("QApplication")
+
+    session = SessionManager.shared(MainWindow.windows)
+    saved = session.load() if RESTORE_SESSION else []
+    # Windows come up with placeholder tabs; web views are built after first paint
+    windows = [MainWindow.new_window(state, defer_load=True) for state in (saved or [None])]
+    for win in windows:
+        win.show()
+    profiler.mark("MainWindow")
+
+    # Listening is cheap; do it early so a second launch can't slip past
+    if SINGLE_INSTANCE and not profile:
+        server = InstanceServer(MainWindow.open_args, app)
+        server.listen()
+        app.aboutToQuit.connect(server.close)
+
+    def start_history():
+        # Before any tab loads, so no visit lands in the index before it's built
+        CompletionIndex.shared().load_async(HistoryStore.shared())
+
+    def load_tabs():
+        # The first web view is what starts Chromium (profile, GPU, renderer)
+        for win in MainWindow.windows:
+            win.load_current_tab()
+
+    steps = [
+        ("history", start_history),
+        ("content blocker", ContentBlocker.shared().load_async),
+        ("WebEngine warm-up", load_tabs),
+        ("user commands", load_user_commands),
+        ("startup script", lambda: run_startup_script(windows[0], MainWindow.new_window)),
+        ("command-line args", lambda: MainWindow.open_args(args) if args else None),
+    ]
+
+    def on_first_paint():
+        profiler.mark("first paint")
+        run_deferred(steps, profiler)
+
+    after_first_paint(windows[0], on_first_paint)
 
-    win = MainWindow()
-    QApplication.instance().installEventFilter(win)
-    load_user_commands()
-    win.show()
-    sys.exit(app.exec())
+    app.aboutToQuit.connect(session.save_now)
+    app.aboutToQuit.connect(session.freeze)
+    app.aboutToQuit.connect(flush_user_commands)
+    rc = app.exec()
+    HistoryStore.shared().close()  # final flush + stop the writer thread
+    sys.exit(rc)
    
 
 
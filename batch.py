@@ -0,0 +1,309 @@
+"""Headless batch mode, for cron jobs:
+
+    tbrowser --batch urls.txt [--capture DIR] [--jobs 4] [--timeout 30] [--full]
+
+Each input line is a URL or a palette command (";" batches and macros
+too). Commands go through command_handler with the BatchRunner standing
+in for a window, so pages they open become jobs. Jobs load in ``--jobs``
+off-screen views at once, each with its own timeout, are optionally
+captured, and end up in a JSON timing report. Runs on the offscreen QPA
+platform; no window is ever shown.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from commands import CommandQueue, command_handler, load_user_commands
+from constants import (
+    BATCH_JOBS, BATCH_TIMEOUT, BATCH_VIEWPORT, CAPTURE_SETTLE_MS, SCREENSHOT_QUALITY,
+    STALL_WATCHDOG
+)
+from page_capture import CaptureHost, FullPageCapture, grab_viewport
+from private_profile import PrivateProfilePool
+from qtcompat import QApplication, QObject, QSize, QTimer, QUrl, QWebEnginePage, pyqtSignal
+from request_interceptor import ContentBlocker, attach_interceptor
+from scheme_handler import register_scheme
+from screenshots import FORMATS, CaptureOptions, ScreenshotSaver
+from utils import to_qurl
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="tbrowser --batch",
+                                description="Load (and capture) pages without a window.")
+    p.add_argument("--batch", metavar="FILE", required=True,
+                   help="URLs or /commands, one per line; '-' reads stdin")
+    p.add_argument("--capture", metavar="DIR", help="save a capture of every page here")
+    p.add_argument("--jobs", type=int, default=BATCH_JOBS, help="pages loading at once")
+    p.add_argument("--timeout", type=float, default=BATCH_TIMEOUT,
+                   help="seconds per page; slower pages are captured as they are")
+    p.add_argument("--full", action="store_true", help="full-page captures (PNG)")
+    p.add_argument("--format", choices=("png", "jpg", "webp"), default="png")
+    p.add_argument("--quality", type=int, default=SCREENSHOT_QUALITY)
+    p.add_argument("--size", default=BATCH_VIEWPORT, help="viewport, WIDTHxHEIGHT")
+    p.add_argument("--report", metavar="FILE",
+                   help="JSON report (default: DIR/report.json with --capture, else stdout)")
+    args = p.parse_args(argv)
+    if not re.fullmatch(r"\d+x\d+", args.size):
+        p.error("--size must look like 1280x800")
+    args.jobs = max(1, args.jobs)
+    return args
+
+
+def read_lines(path: str) -> List[str]:
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+class _Slot:
+    """One off-screen view that loads, then captures, one job at a time."""
+
+    def __init__(self, runner: "BatchRunner", profile, size: QSize):
+        self.runner = runner
+        self.host = CaptureHost()
+        self.page = QWebEnginePage(profile, self.host.view)
+        self.page.setAudioMuted(True)
+        self.interceptor = attach_interceptor(self.page)
+        self.host.attach(self.page, size)
+        self.page.loadFinished.connect(self._on_loaded)
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_timeout)
+        self.job: Optional[Dict] = None
+        self.loading = False
+
+    def start(self, job: Dict) -> None:
+        self.job = job
+        if self.interceptor is not None:
+            self.interceptor.blocked = 0
+        self.loading = True
+        job["_started"] = time.perf_counter()
+        self.timer.start(int(self.runner.args.timeout * 1000))
+        self.page.setUrl(QUrl(job["url"]))
+
+    def _on_loaded(self, ok: bool) -> None:
+        if not self.loading:
+            return  # a stop() after the timeout, or a late subframe
+        self._loaded("ok" if ok else "load failed")
+
+    def _on_timeout(self) -> None:
+        if self.loading:
+            self.host.view.stop()
+            self._loaded("timeout")
+
+    def _loaded(self, status: str) -> None:
+        self.loading = False
+        self.timer.stop()
+        job = self.job
+        job["status"] = status
+        job["load_ms"] = round((time.perf_counter() - job["_started"]) * 1000.0, 1)
+        job["final_url"] = self.page.url().toString()
+        job["title"] = self.page.title()
+        if self.interceptor is not None:
+            job["blocked"] = self.interceptor.blocked
+        else:
+            job["blocked"] = ContentBlocker.shared().blocked_on(self.page.url())
+        if self.runner.args.capture and status != "load failed":
+            QTimer.singleShot(CAPTURE_SETTLE_MS, self._capture)
+        else:
+            self._done()
+
+    def _capture(self) -> None:
+        args = self.runner.args
+        path = self.runner.capture_path(self.job)
+        if args.full:
+            FullPageCapture(self.host.view, path, self._on_saved).start()
+            return
+        started = time.perf_counter()
+        image = grab_viewport(self.host.view)
+        capture_ms = (time.perf_counter() - started) * 1000.0
+        opts = CaptureOptions(fmt=args.format, quality=args.quality, ask=False)
+        ScreenshotSaver.shared().submit(image, path, opts, self._on_saved, capture_ms=capture_ms)
+
+    def _on_saved(self, result: Dict) -> None:
+        job = self.job
+        job["capture_ms"] = round(result.get("capture_ms", 0.0), 1)
+        job["encode_ms"] = round(result.get("encode_ms", 0.0), 1)
+        if result["ok"]:
+            job["path"] = result["path"]
+            try:
+                job["bytes"] = os.path.getsize(result["path"])
+            except OSError as e:
+                print("[batch] saved capture not found:", result["path"], e, file=sys.stderr)
+                job["bytes"] = None
+        else:
+            job["status"] = "capture failed"
+            job["error"] = result.get("error", "")
+        self._done()
+
+    def _done(self) -> None:
+        job, self.job = self.job, None
+        job["total_ms"] = round((time.perf_counter() - job.pop("_started")) * 1000.0, 1)
+        self.runner.job_done(self, job)
+
+
+class BatchRunner(QObject):
+    """Feeds input lines to command_handler and pages to the slots.
+
+    command_handler only needs the part of MainWindow that commands use, so
+    this provides that: new_tab() queues a job, there is no current tab,
+    and messages go to stderr through notify() instead of dialogs.
+    """
+
+    finished = pyqtSignal()
+
+    def __init__(self, args: argparse.Namespace, lines: List[str]):
+        super().__init__()
+        self.args = args
+        self.lines = deque(lines)
+        self.open_tabs_in_background = False  # set by CommandQueue
+        self.pending = deque()
+        self.results: List[Dict] = []
+        self.failed = 0
+        w, h = (int(v) for v in args.size.split("x"))
+        # Off the record: no cookies or cache left behind, and no clash with
+        # the profile directory of a running instance
+        profile = PrivateProfilePool.for_window(self).acquire()
+        self.idle = [_Slot(self, profile, QSize(w, h)) for _ in range(args.jobs)]
+        self.busy = 0
+        self._count = 0
+        self._started = 0.0
+        self._wall = ""
+
+    # --- What command_handler calls ------------------------------------------
+    def new_tab(self, url: QUrl, private: bool = False, background: bool = False) -> int:
+        self._count += 1
+        self.pending.append({"index": self._count, "url": url.toString()})
+        QTimer.singleShot(0, self._pump)
+        return -1
+
+    def current_tab(self):
+        return None
+
+    def open_history_tab(self, query: str = ""):
+        self.new_tab(QUrl("tbrowser://history/"))
+
+    def open_help_tab(self):
+        self.new_tab(QUrl("tbrowser://help/"))
+
+    def open_commands_tab(self):
+        self.new_tab(QUrl("tbrowser://commands/"))
+
+    def open_perf_tab(self):
+        self.new_tab(QUrl("tbrowser://perf/"))
+
+    def toggle_perf_hud(self):
+        self.notify("Perf", "there is no window to show the HUD in; see the report instead")
+
+    def capture_screenshot(self, options: str = ""):
+        self.notify("Capture", "in --batch mode every page is captured with --capture DIR")
+
+    def notify(self, title: str, text: str) -> None:
+        print(f"[batch] {title}: {text}", file=sys.stderr)
+
+    # --- Running -------------------------------------------------------------
+    def start(self) -> None:
+        # A line like "/map:a=b ; /map:c=d" opens no tab, so nothing else
+        # would look again once its commands have run
+        CommandQueue.for_window(self).drained.connect(self._pump)
+        self._started = time.perf_counter()
+        self._wall = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        QTimer.singleShot(0, self._feed)
+
+    def _feed(self) -> None:
+        """One input line per tick; a line with several commands is spread
+        over ticks by CommandQueue."""
+        if self.lines:
+            line = self.lines.popleft()
+            if line.startswith("/"):
+                command_handler(self, line)
+            else:
+                self.new_tab(to_qurl(line))
+            QTimer.singleShot(0, self._feed)
+        self._pump()
+
+    def _pump(self) -> None:
+        while self.pending and self.idle:
+            self.busy += 1
+            self.idle.pop().start(self.pending.popleft())
+        if (not self.lines and not self.pending and self.busy == 0
+                and CommandQueue.for_window(self).pending() == 0):
+            self._finish()
+
+    def capture_path(self, job: Dict) -> str:
+        host = re.sub(r"[^A-Za-z0-9.-]+", "_", QUrl(job["url"]).host() or "page")
+        ext = "png" if self.args.full else FORMATS[self.args.format][1]
+        return os.path.join(self.args.capture, f"{job['index']:04d}_{host}.{ext}")
+
+    def job_done(self, slot: _Slot, job: Dict) -> None:
+        self.busy -= 1
+        self.idle.append(slot)
+        self.results.append(job)
+        if job["status"] != "ok":
+            self.failed += 1
+        print(f"[batch] {job['status']:>14}  {job['total_ms']:8.0f} ms  {job['url']}", file=sys.stderr)
+        QTimer.singleShot(0, self._pump)
+
+    def _finish(self) -> None:
+        if self._started == 0.0:
+            return
+        elapsed = time.perf_counter() - self._started
+        self._started = 0.0
+        self.results.sort(key=lambda r: r["index"])
+        report = {
+            "started": self._wall,
+            "elapsed_s": round(elapsed, 3),
+            "jobs": self.args.jobs,
+            "timeout_s": self.args.timeout,
+            "pages": len(self.results),
+            "failed": self.failed,
+            "pages_per_min": round(len(self.results) / elapsed * 60.0, 1) if elapsed else 0.0,
+            "results": self.results,
+        }
+        text = json.dumps(report, indent=1)
+        target = self.args.report or (os.path.join(self.args.capture, "report.json")
+                                      if self.args.capture else None)
+        if target:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            print(text)
+        self.finished.emit()
+
+
+def run_batch(argv: List[str]) -> int:
+    """Entry point for app.main(); returns the exit status."""
+    # The flags app.main handles for every launch: startup profiling means
+    # nothing here, the stall watchdog works as in a windowed run
+    watch_stalls = STALL_WATCHDOG or "--watch-stalls" in argv
+    args = parse_args([a for a in argv if a not in ("--profile-startup", "--watch-stalls")])
+    try:
+        lines = read_lines(args.batch)
+    except OSError as e:
+        print("[batch] cannot read input:", e, file=sys.stderr)
+        return 2
+
+    # Before QApplication: no display needed, nothing shown if there is one,
+    # even when the desktop session exports wayland or xcb
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    register_scheme()
+    app = QApplication([sys.argv[0]])
+    app.setApplicationName("TBrowser")
+    if watch_stalls:
+        from stall_watchdog import StallWatchdog
+        StallWatchdog.shared().start()
+        app.aboutToQuit.connect(StallWatchdog.shared().stop)
+    ContentBlocker.shared().load_async()
+    load_user_commands()  # so aliases and macros in the input work
+
+    runner = BatchRunner(args, lines)
+    runner.finished.connect(app.quit)
+    runner.start()
+    app.exec()
+    return 0 if runner.failed == 0 else 1
@@ -0,0 +1,78 @@
+"""Content-blocker cost: compile vs cached load, and per-request match time.
+
+    python benchmarks/bench_adblock.py [rules] [list.txt]
+
+Uses a real EasyList file when given one, otherwise a synthetic list of
+``rules`` EasyList-shaped rules (mostly ||domain^, some path patterns).
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adblock import load_matcher  # noqa: E402
+
+
+def word(rnd, k):
+    return "".join(rnd.choices(string.ascii_lowercase, k=k))
+
+
+def fake_list(n: int):
+    rnd = random.Random(7)
+    for i in range(n):
+        r = rnd.random()
+        if r < 0.75:
+            yield f"||{word(rnd, 8)}.{rnd.choice(['com', 'net', 'io'])}^"
+        elif r < 0.85:
+            yield f"||{word(rnd, 6)}.com^$third-party"
+        elif r < 0.95:
+            yield f"/{word(rnd, 5)}/{word(rnd, 6)}*"
+        else:
+            yield f"@@||{word(rnd, 7)}.com/{word(rnd, 4)}/"
+
+
+def fake_requests(n: int):
+    rnd = random.Random(11)
+    for _ in range(n):
+        host = f"{word(rnd, 3)}.{word(rnd, 8)}.com"
+        path = "/".join(word(rnd, 6) for _ in range(3))
+        yield f"https://{host}/{path}?v={rnd.randint(1, 999)}", host
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tmp = tempfile.mkdtemp()
+    if len(sys.argv) > 2:
+        lists = [sys.argv[2]]
+    else:
+        lists = [os.path.join(tmp, "list.txt")]
+        with open(lists[0], "w") as f:
+            f.write("\n".join(fake_list(n)))
+    cache = os.path.join(tmp, "cache.pickle")
+
+    started = time.perf_counter()
+    matcher = load_matcher(lists, cache)
+    print(f"compile: {matcher.rule_count} rules in {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    matcher = load_matcher(lists, cache)
+    print(f"cached load: {time.perf_counter() - started:.3f}s "
+          f"({os.path.getsize(cache) / 1e6:.1f} MB cache)")
+
+    samples = []
+    blocked = 0
+    for url, host in fake_requests(20_000):
+        t = time.perf_counter()
+        blocked += matcher.should_block(url, host, "www.example.org", "script")
+        samples.append((time.perf_counter() - t) * 1e6)
+    samples.sort()
+    print(f"match: median {statistics.median(samples):.1f} us, "
+          f"p99 {samples[int(len(samples) * 0.99)]:.1f} us, {blocked} blocked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Per-request cost of serving an internal page over tbrowser://.
+
+    python benchmarks/bench_assets.py [iterations]
+
+Compares reading new_tab.html from disk on every request (what _reply_file
+did) with read_asset's mtime-checked cache. Needs PyQt (scheme_handler
+imports it).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheme_handler import PAGES, asset_path, read_asset  # noqa: E402
+
+
+def per_call_us(fn, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) * 1e6 / n
+
+
+def uncached_read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    for (host, page), relpath in sorted(PAGES.items()):
+        path = asset_path(relpath)
+        before = per_call_us(lambda: uncached_read(path), n)
+        after = per_call_us(lambda: read_asset(path, os.stat(path)), n)
+        url = f"tbrowser://{host}{page}"
+        print(f"{url:<26} {os.path.getsize(path):6,} bytes: "
+              f"{before:6.1f} us read -> {after:5.1f} us cached")
+
+
+if __name__ == "__main__":
+    main()
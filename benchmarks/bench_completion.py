@@ -0,0 +1,72 @@
+"""Keystroke-to-suggestion latency of CompletionIndex with a large history.
+
+    python benchmarks/bench_completion.py [entries]
+
+Prints build time and the worst/median lookup time per typed prefix; the
+palette needs lookups well under one 60 Hz frame (~16 ms). Runs twice: URLs
+spread evenly over ~5000 hosts, then with 30% of them on github.com, as in
+a real history dominated by a few sites.
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from completion import CompletionIndex  # noqa: E402
+
+
+def fake_history(n: int, skew: float = 0.0):
+    rnd = random.Random(42)
+    hosts = ["github.com", "docs.python.org", "stackoverflow.com", "news.ycombinator.com",
+             "en.wikipedia.org", "youtube.com", "reddit.com", "google.com"]
+    hosts += ["".join(rnd.choices(string.ascii_lowercase, k=8)) + ".com" for _ in range(5000)]
+    now = time.time()
+    for i in range(n):
+        host = "github.com" if rnd.random() < skew else rnd.choice(hosts)
+        path = "/".join("".join(rnd.choices(string.ascii_lowercase, k=6)) for _ in range(2))
+        yield (f"https://{host}/{path}/{i}", f"Page {i}", rnd.randint(1, 50),
+               now - rnd.random() * 365 * 86400)
+
+
+def run(n: int, skew: float):
+    print(f"-- {'uniform' if not skew else f'{skew:.0%} on github.com'}")
+    rows = list(fake_history(n, skew))
+    started = time.perf_counter()
+    index = CompletionIndex()
+    index.bulk_load(rows)
+    print(f"build: {len(rows)} urls in {time.perf_counter() - started:.2f}s")
+
+    samples = []
+    worst = ("", 0.0)
+    for word in ("github.com/abc", "github.com/12", "docs.python.org/3/library",
+                 "stackoverflow.com/q", "xyz"):
+        for end in range(1, len(word) + 1):
+            started = time.perf_counter()
+            index.complete_urls(word[:end])
+            ms = (time.perf_counter() - started) * 1000.0
+            samples.append(ms)
+            if ms > worst[1]:
+                worst = (word[:end], ms)
+    print(f"lookup: median {statistics.median(samples):.3f} ms, max {worst[1]:.3f} ms "
+          f"({worst[0]!r}) over {len(samples)} prefixes")
+
+    visits = 1000
+    started = time.perf_counter()
+    for i in range(visits):
+        index.record_visit(f"https://github.com/new/{i}", "New")
+    per_visit = (time.perf_counter() - started) * 1000.0 / visits
+    print(f"update: {per_visit:.4f} ms per visit")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    run(n, 0.0)
+    run(n, 0.3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Bytes per history entry: list-of-dicts vs CompactHistory.
+
+    python benchmarks/bench_history_memory.py [visits]
+
+"before" is the old MainWindow.global_history layout, one
+{"title", "url", "timestamp"} dict per visit. "after" is CompactHistory
+holding the same visits. Both are measured with tracemalloc, so the URL
+and title strings are counted too.
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact_history import CompactHistory  # noqa: E402
+
+
+def visits(n: int):
+    rnd = random.Random(7)
+    hosts = ["github.com", "docs.python.org", "stackoverflow.com", "en.wikipedia.org"]
+    hosts += [f"site{i}.example.com" for i in range(2000)]
+    now = time.time()
+    for i in range(n):
+        host = rnd.choice(hosts)
+        url = f"https://{host}/articles/{i}/page-{rnd.randint(0, 99)}"
+        yield url, f"Article {i} on {host}", now - i
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def build_dicts(n: int):
+    return [{"title": t, "url": u, "timestamp": ts} for u, t, ts in visits(n)]
+
+
+def build_compact(n: int):
+    h = CompactHistory()
+    for u, t, ts in visits(n):
+        h.append(u, t, 1, ts)
+    return h
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    before = measure(lambda: build_dicts(n))
+    after = measure(lambda: build_compact(n))
+    print(f"{n} visits")
+    print(f"before (list of dicts): {before / n:7.1f} bytes/entry  {before / 2**20:8.1f} MiB")
+    print(f"after  (CompactHistory): {after / n:7.1f} bytes/entry  {after / 2**20:8.1f} MiB")
+    print(f"saving: {100.0 * (1 - after / before):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Cost of the app-wide key filter on events that aren't key presses.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_keymap.py [events]
+
+Sends mouse-move events to a widget with no filter, with a copy of the old
+MainWindow.eventFilter installed three times (MainWindow, shortcuts() and
+app.main each installed it), and with the KeymapDispatcher installed once.
+Prints events/sec and the per-event overhead against no filter.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from qtcompat import (  # noqa: E402
+    Qt, QApplication, QEvent, QMouseEvent, QObject, QPointF, QWidget, USING_QT6
+)
+
+from keymap import KeymapDispatcher  # noqa: E402
+
+
+class OldFilter(QObject):
+    """The per-event work of the removed MainWindow.eventFilter."""
+
+    def eventFilter(self, obj, event):
+        try:
+            KeyPressType = QEvent.Type.KeyPress if USING_QT6 else QEvent.KeyPress
+            ShortcutOvType = QEvent.Type.ShortcutOverride if USING_QT6 else QEvent.ShortcutOverride
+            evt_type = event.type()
+            if evt_type not in (KeyPressType, ShortcutOvType):
+                return super().eventFilter(obj, event)
+        except Exception:
+            pass
+        return super().eventFilter(obj, event)
+
+
+def events_per_sec(widget, n: int) -> float:
+    app = QApplication.instance()
+    if USING_QT6:
+        move, button, mods = (QEvent.Type.MouseMove, Qt.MouseButton.NoButton,
+                              Qt.KeyboardModifier.NoModifier)
+    else:
+        move, button, mods = QEvent.MouseMove, Qt.NoButton, Qt.NoModifier
+    event = QMouseEvent(move, QPointF(5, 5), QPointF(5, 5), button, button, mods)
+    started = time.perf_counter()
+    for _ in range(n):
+        app.sendEvent(widget, event)
+    return n / (time.perf_counter() - started)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = QApplication(sys.argv)
+    widget = QWidget()
+
+    base = events_per_sec(widget, n)
+
+    old = [OldFilter() for _ in range(3)]
+    for f in old:
+        app.installEventFilter(f)
+    before = events_per_sec(widget, n)
+    for f in old:
+        app.removeEventFilter(f)
+
+    dispatcher = KeymapDispatcher([])
+    app.installEventFilter(dispatcher)
+    after = events_per_sec(widget, n)
+
+    for name, rate in (("no filter", base), ("old filter x3", before), ("keymap", after)):
+        overhead = (1e6 / rate - 1e6 / base) if rate else 0.0
+        print(f"{name:>14}: {rate:12,.0f} events/s  (+{overhead:.2f} us/event)")
+
+
+if __name__ == "__main__":
+    main()
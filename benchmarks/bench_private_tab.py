@@ -0,0 +1,56 @@
+"""Private-tab open latency: fresh profile per tab vs the shared pool.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_private_tab.py [tabs]
+
+"before" builds a new off-the-record QWebEngineProfile for every tab, as
+BrowserTab used to; "after" goes through PrivateProfilePool. Each sample is
+the time from construction until the first about:blank load finishes.
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer, QUrl  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QWidget  # noqa: E402
+from PyQt6.QtWebEngineWidgets import QWebEngineView  # noqa: E402
+from PyQt6.QtWebEngineCore import QWebEnginePage  # noqa: E402
+
+from private_profile import PrivateProfilePool, _make_private_profile  # noqa: E402
+
+
+def open_tab(window, pooled: bool) -> float:
+    started = time.perf_counter()
+    view = QWebEngineView(window)
+    if pooled:
+        profile = PrivateProfilePool.for_window(window).acquire()
+    else:
+        profile = _make_private_profile(view)
+    view.setPage(QWebEnginePage(profile, view))
+    loop = QEventLoop()
+    view.loadFinished.connect(lambda _ok: loop.quit())
+    QTimer.singleShot(10_000, loop.quit)
+    view.setUrl(QUrl("about:blank"))
+    loop.exec()
+    elapsed = (time.perf_counter() - started) * 1000.0
+    view.deleteLater()
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QApplication(sys.argv)
+    window = QWidget()
+    open_tab(window, pooled=True)  # warm up Chromium itself
+    for label, pooled in (("before (profile per tab)", False), ("after  (pooled profile)", True)):
+        samples = [open_tab(window, pooled) for _ in range(n)]
+        print(f"{label}: median {statistics.median(samples):7.1f} ms, "
+              f"max {max(samples):7.1f} ms over {n} tabs")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
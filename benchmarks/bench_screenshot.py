@@ -0,0 +1,62 @@
+"""UI-thread cost of a 4K screenshot: encoding inline vs ScreenshotSaver.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_screenshot.py [width height]
+
+For each format, prints how long a synchronous QImage.save blocks the
+caller, against how long ScreenshotSaver.submit does (the encode then runs
+on the worker pool), and the worker-side encode time it reports.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from qtcompat import QApplication, QImage, Qt  # noqa: E402
+from screenshots import FORMATS, CaptureOptions, ScreenshotSaver, writable  # noqa: E402
+
+
+def noisy_image(w: int, h: int) -> QImage:
+    # Gradients and noise, so PNG can't compress it away
+    image = QImage(w, h, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    bits = image.bits()
+    bits.setsize(image.sizeInBytes())
+    data = bytes((i * 7 + (i >> 11)) & 0xFF for i in range(1 << 16))
+    buf = memoryview(bits)
+    for off in range(0, len(buf) - len(data), len(data) * 3):
+        buf[off:off + len(data)] = data
+    return image
+
+
+def main():
+    w, h = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (3840, 2160)
+    app = QApplication(sys.argv)
+    image = noisy_image(w, h)
+    tmp = tempfile.mkdtemp()
+    saver = ScreenshotSaver.shared()
+
+    for fmt in ("png", "jpg", "webp"):
+        if not writable(fmt):
+            print(f"{fmt:>5}: no writer in this Qt build")
+            continue
+        opts = CaptureOptions(fmt=fmt, quality=85, ask=False)
+        started = time.perf_counter()
+        image.save(os.path.join(tmp, f"inline.{fmt}"), FORMATS[fmt][0], -1 if fmt == "png" else 85)
+        inline_ms = (time.perf_counter() - started) * 1000.0
+
+        done = []
+        started = time.perf_counter()
+        saver.submit(image, os.path.join(tmp, f"pool.{fmt}"), opts, done.append)
+        submit_ms = (time.perf_counter() - started) * 1000.0
+        while not done:
+            app.processEvents()
+            time.sleep(0.001)
+        print(f"{fmt:>5}: inline {inline_ms:7.1f} ms on the UI thread | "
+              f"pool {submit_ms:5.2f} ms on the UI thread, encode {done[0]['encode_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
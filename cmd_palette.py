@@ -1,11 +1,20 @@
-USING_QT6 = False
-try:
-    from PyQt6.QtCore import Qt
-    from PyQt6.QtWidgets import QFrame, QLineEdit, QVBoxLayout, QSizePolicy
-    USING_QT6 = True
-except Exception:
-    from PyQt5.QtCore import Qt  # type: ignore
-    from PyQt5.QtWidgets import QFrame, QLineEdit, QVBoxLayout, QSizePolicy  # type: ignore
+import time
+
+from commands import BUILTIN_COMMANDS, REGISTRY, URL_COMMANDS
+from completion import CompletionIndex
+from constants import SPECULATE
+from qtcompat import (
+    Qt, QEvent, QFrame, QLineEdit, QListWidget, QListWidgetItem, QSizePolicy, QTimer,
+    QVBoxLayout, USING_QT6
+)
+from speculation import Speculator
+
+
+# Wait this long after the last keystroke before looking up suggestions
+SUGGEST_DEBOUNCE_MS = 30
+MAX_SUGGESTIONS = 8
+ROW_HEIGHT = 28
+
 
 class CommandPalette(QFrame):
     """Translucent bottom command palette with a single-line input."""
@@ -29,6 +38,16 @@ class CommandPalette(QFrame):
                 border: none;
                 selection-background-color: rgba(255,255,255,50);
             }
+            QListWidget {
+                background: transparent;
+                color: #ddd;
+                font-family: "Courier New", monospace;
+                font-size: 13px;
+                border: none;
+                outline: none;
+            }
+            QListWidget::item { padding: 4px 14px; }
+            QListWidget::item:selected { background: rgba(255,255,255,40); color: white; }
         """)
 
         self.setSizePolicy(
@@ -36,23 +55,138 @@ class CommandPalette(QFrame):
             QSizePolicy.Policy.Fixed if USING_QT6 else QSizePolicy.Fixed
         )
 
+        self.index = CompletionIndex.shared()
+        self.last_suggest_ms = 0.0  # keystroke-to-suggestion lookup time
+
+        self.suggestions = QListWidget(self)
+        self.suggestions.setFocusPolicy(Qt.FocusPolicy.NoFocus if USING_QT6 else Qt.NoFocus)
+        self.suggestions.itemClicked.connect(self._accept_item)
+        self.suggestions.hide()
+
         self.input = QLineEdit(self)
-        self.input.setPlaceholderText("/nt:<url> | /pt:<url> | /nw | /hist | /help | /capture")
+        self.input.setPlaceholderText("/nt:<url> | /pt:<url> | /nw | /hist[:<query>] | /help | /capture")
         self.input.returnPressed.connect(self._on_return)
+        self.input.textEdited.connect(self._schedule_suggest)
+        # Warm up the page the command would open once typing pauses
+        self.speculator = Speculator(parent) if SPECULATE and parent is not None else None
+        if self.speculator is not None:
+            self.input.textChanged.connect(self.speculator.update)
+        self.input.installEventFilter(self)
+
+        # Debounce: restart on every keystroke, look up once typing pauses
+        self._suggest_timer = QTimer(self)
+        self._suggest_timer.setSingleShot(True)
+        self._suggest_timer.setInterval(SUGGEST_DEBOUNCE_MS)
+        self._suggest_timer.timeout.connect(self._update_suggestions)
 
         lay = QVBoxLayout(self)
         lay.setContentsMargins(8, 8, 8, 8)
+        lay.setSpacing(0)
+        lay.addWidget(self.suggestions)
         lay.addWidget(self.input)
 
         self.hide()
 
     def _on_return(self):
+        item = self.suggestions.currentItem()
+        if self.suggestions.isVisible() and item is not None and item.isSelected():
+            self.input.setText(item.data(Qt.ItemDataRole.UserRole if USING_QT6 else Qt.UserRole))
         text = self.input.text().strip()
-        if self.parent() and hasattr(self.parent(), "handle_command"):
-            getattr(self.parent(), "handle_command")(text)
+        if text.startswith("/"):
+            self.index.record_command(text[1:].split(":", 1)[0].strip().lower())
+        # A matching prerender is swapped in instead of running the command
+        if self.speculator is None or not self.speculator.commit(text):
+            if self.parent() and hasattr(self.parent(), "handle_command"):
+                getattr(self.parent(), "handle_command")(text)
         self.input.clear()
+        self._clear_suggestions()
         self.hide()
 
+    # --- Suggestions ---------------------------------------------------------
+    def _schedule_suggest(self, _text=None):
+        self._suggest_timer.start()
+
+    def _suggestions_for(self, text: str):
+        """(completion, label) pairs for the palette text."""
+        if not text.startswith("/"):
+            return []
+        body = text[1:]
+        if ":" in body:
+            cmd, arg = body.split(":", 1)
+            cmd = cmd.strip().lower()
+            if cmd not in URL_COMMANDS or not arg.strip():
+                return []
+            return [(f"/{cmd}:{url}", f"/{cmd}:{url}  —  {title}")
+                    for url, title in self.index.complete_urls(arg, MAX_SUGGESTIONS)]
+        # No argument yet: matching commands/aliases first, then history
+        names = list(BUILTIN_COMMANDS) + list(REGISTRY.keys())
+        out = [(f"/{n}", f"/{n}") for n in
+               self.index.complete_commands(body.strip(), names, MAX_SUGGESTIONS)]
+        if body.strip():
+            out += [(f"/nt:{url}", f"/nt:{url}  —  {title}")
+                    for url, title in self.index.complete_urls(body, MAX_SUGGESTIONS - len(out))]
+        return out[:MAX_SUGGESTIONS]
+
+    def _update_suggestions(self):
+        started = time.perf_counter()
+        items = self._suggestions_for(self.input.text())
+        self.last_suggest_ms = (time.perf_counter() - started) * 1000.0
+        self.suggestions.clear()
+        role = Qt.ItemDataRole.UserRole if USING_QT6 else Qt.UserRole
+        for completion, label in items:
+            item = QListWidgetItem(label)
+            item.setData(role, completion)
+            self.suggestions.addItem(item)
+        self.suggestions.setVisible(bool(items))
+        self._relayout()
+
+    def _clear_suggestions(self):
+        self._suggest_timer.stop()
+        self.suggestions.clear()
+        self.suggestions.hide()
+
+    def _accept_item(self, item):
+        self.input.setText(item.data(Qt.ItemDataRole.UserRole if USING_QT6 else Qt.UserRole))
+        self.input.setFocus()
+        self._schedule_suggest()
+
+    def _move_selection(self, step: int):
+        count = self.suggestions.count()
+        if not count:
+            return
+        row = self.suggestions.currentRow()
+        row = (row + step) % count if row >= 0 else (0 if step > 0 else count - 1)
+        self.suggestions.setCurrentRow(row)
+
+    def eventFilter(self, obj, event):
+        if obj is self.input and event.type() == (QEvent.Type.KeyPress if USING_QT6 else QEvent.KeyPress):
+            key = event.key()
+            if key == (Qt.Key.Key_Down if USING_QT6 else Qt.Key_Down):
+                self._move_selection(1)
+                return True
+            if key == (Qt.Key.Key_Up if USING_QT6 else Qt.Key_Up):
+                self._move_selection(-1)
+                return True
+            if key == (Qt.Key.Key_Tab if USING_QT6 else Qt.Key_Tab) and self.suggestions.count():
+                item = self.suggestions.currentItem() or self.suggestions.item(0)
+                self._accept_item(item)
+                return True
+        return super().eventFilter(obj, event)
+
+    # --- Geometry ------------------------------------------------------------
+    def _relayout(self):
+        if not self.isVisible():
+            return
+        pw = self.parent().width() if self.parent() else 800
+        ph = self.parent().height() if self.parent() else 600
+        rows = self.suggestions.count() if self.suggestions.isVisible() else 0
+        self.suggestions.setFixedHeight(rows * ROW_HEIGHT + (4 if rows else 0))
+        w = int(pw * 0.7)
+        h = 56 + self.suggestions.height() * (1 if rows else 0)
+        x = int((pw - w) / 2)
+        y = ph - h - 70
+        self.setGeometry(x, y, w, h)
+
     def focusInEvent(self, event):
         super().focusInEvent(event)
         self.input.setFocus()
@@ -61,17 +195,17 @@ class CommandPalette(QFrame):
         if self.isVisible():
             self.hide()
         else:
-            pw = self.parent().width() if self.parent() else 800
-            ph = self.parent().height() if self.parent() else 600
-            w = int(pw * 0.7)
-            h = 56
-            x = int((pw - w) / 2)
-            y = ph - h - 70
-            self.setGeometry(x, y, w, h)
+            self._clear_suggestions()
             self.show()
+            self._relayout()
             self.input.setFocus()
             self.input.setText("/")  # Always start with "/"
 
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.speculator is not None:
+            self.speculator.reset()
+
     def keyPressEvent(self, event):
         esc = (Qt.Key.Key_Escape if USING_QT6 else Qt.Key_Escape)
         if event.key() == esc:
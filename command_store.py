@@ -0,0 +1,135 @@
+import json
+import os
+from typing import Callable, Dict, Optional
+
+from qtcompat import QFileSystemWatcher, QObject, QTimer
+from session import write_json_atomic
+
+
+# Coalesce bursts of /map, /unmap and /macro edits into one write
+WRITE_DELAY_MS = 500
+# Editors save in several steps (truncate, write, rename); read once they settle
+RELOAD_DELAY_MS = 100
+
+_MISSING = object()
+
+
+class CommandStore(QObject):
+    """In-memory copy of a {name: value} JSON file such as commands.json.
+
+    The copy is authoritative for this process: lookups never touch the
+    disk, and set()/remove() take effect at once and queue a write. Writes
+    wait WRITE_DELAY_MS, are merged onto what the file holds by then (so
+    other processes' edits to other names survive) and renamed into place.
+    A QFileSystemWatcher picks up edits made outside the app. After every
+    change, ``on_change(name, value)`` runs only for the names whose value
+    changed, with None for removed names. Names keep the file's spelling;
+    set() and remove() match them case-insensitively, and lowercasing for
+    lookups is up to ``on_change``.
+    """
+
+    def __init__(self, path, on_change: Callable[[str, Optional[object]], None], parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.on_change = on_change
+        self.entries: Dict[str, object] = {}
+        self._ops: Dict[str, Optional[object]] = {}   # local edits not yet written
+        self._signature = None                        # (mtime_ns, size) last read or written
+
+        self._write_timer = QTimer(self)
+        self._write_timer.setSingleShot(True)
+        self._write_timer.setInterval(WRITE_DELAY_MS)
+        self._write_timer.timeout.connect(self.flush)
+
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(RELOAD_DELAY_MS)
+        self._reload_timer.timeout.connect(self.reload)
+
+        # The file is replaced by rename, which ends a watch on the file
+        # itself; the directory watch sees the new one arrive
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(lambda _path: self._reload_timer.start())
+        self._watcher.directoryChanged.connect(lambda _path: self._reload_timer.start())
+        self.reload()
+
+    # --- Edits ---------------------------------------------------------------
+    def set(self, name: str, value) -> None:
+        self._ops[name] = value
+        self._apply(self._with_ops(self.entries))
+        self._write_timer.start()
+
+    def remove(self, name: str) -> None:
+        self._ops[name] = None
+        self._apply(self._with_ops(self.entries))
+        self._write_timer.start()
+
+    def flush(self) -> None:
+        """Write queued edits now (also called on quit)."""
+        self._write_timer.stop()
+        if not self._ops:
+            return
+        data = self._with_ops(self._read())
+        try:
+            write_json_atomic(self.path, data)
+            self._ops.clear()
+            self._signature = self._stat()
+        except Exception as e:
+            print("[commands] failed writing", self.path, e)
+        self._apply(data)
+        self._watch()
+
+    # --- Disk ----------------------------------------------------------------
+    def reload(self) -> None:
+        self._watch()
+        signature = self._stat()
+        if signature == self._signature:
+            return  # our own write, or the directory changed around the file
+        self._signature = signature
+        self._apply(self._with_ops(self._read()))
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _read(self) -> Dict[str, object]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                return {}
+            return {k: v for k, v in data.items() if isinstance(k, str)}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            # Half-written by an editor; keep what we have and wait for the next change
+            print("[commands] failed reading", self.path, e)
+            return dict(self.entries)
+
+    def _with_ops(self, data: Dict[str, object]) -> Dict[str, object]:
+        data = dict(data)
+        for name, value in self._ops.items():
+            # "/unmap:gh" removes "GH" too; an edit keeps the file's spelling
+            same = [k for k in data if k.lower() == name.lower()]
+            for k in same:
+                del data[k]
+            if value is not None:
+                data[same[0] if same else name] = value
+        return data
+
+    def _apply(self, data: Dict[str, object]) -> None:
+        old, self.entries = self.entries, data
+        for name in old.keys() - data.keys():
+            self.on_change(name, None)
+        for name, value in data.items():
+            if old.get(name, _MISSING) != value:
+                self.on_change(name, value)
+
+    def _watch(self) -> None:
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        for path in (str(self.path), os.path.dirname(str(self.path))):
+            if path not in watched and os.path.exists(path):
+                self._watcher.addPath(path)
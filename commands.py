@@ -1,42 +1,119 @@
-from typing import Callable, Dict, Optional
-import json, os, urllib
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+import os, re, urllib
 from pathlib import Path
-from constants import COMMANDS_JSON
-from utils import to_qurl, read_asset
+from constants import COMMANDS_JSON, MACROS_JSON, STARTUP_SCRIPT
+from command_store import CommandStore
+from utils import to_qurl
+from scheme_handler import NEW_TAB_URL, PRIVATE_TAB_URL
+from qtcompat import QMessageBox, QObject, QTimer, QUrl, pyqtSignal
 
-try:
-    from PyQt6.QtCore import Qt, QUrl, QSize, QEvent
-    from PyQt6.QtGui import QAction, QIcon, QKeySequence, QShortcut  # <-- QShortcut here!
-    from PyQt6.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
-        QLineEdit, QTabBar, QStackedWidget, QToolButton, QFileDialog, QLabel,
-        QStyle, QMessageBox, QSizePolicy
-    )
-    from PyQt6.QtWebEngineWidgets import QWebEngineView
-    from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
-    USING_QT6 = True
-except Exception:
-    from PyQt5.QtCore import Qt, QUrl, QSize, QEvent
 
+REGISTRY: Dict[str, Callable[[object, str], None]] = {}
 
+# Names handled directly by command_handler, and the ones taking a URL argument
+BUILTIN_COMMANDS = ("nt", "pt", "t", "nw", "s", "ts", "hist", "help", "commands", "capture",
+                    "perf")
+URL_COMMANDS = ("nt", "pt", "t")
+# Names commands.json and /map can't take over
+RESERVED_COMMANDS = BUILTIN_COMMANDS + ("map", "unmap", "macro")
 
-REGISTRY: Dict[str, Callable[[object, str], None]] = {}
+# Named command lists from MACROS_JSON, run with /macro:<name>
+MACROS: Dict[str, str] = {}
+MAX_MACRO_DEPTH = 8
+
+# ";" separates commands only where the next one starts, so URLs keep theirs
+_BATCH_SPLIT = re.compile(r"\s*;\s*(?=/)")
+_MACRO_DEFINITION = re.compile(r"/\s*macro\s*:[^=;]*=", re.IGNORECASE)
 
 def register_command(name: str, fn: Callable[[object, str], None]) -> None:
     REGISTRY[name.lower()] = fn
 
+def _search_url(query: str) -> QUrl:
+    return QUrl(f"https://www.google.com/search?q={urllib.parse.quote(query)}")
+
+def resolve_command(text: str) -> Optional[Tuple[QUrl, str]]:
+    """The URL a palette command would open, without running it.
+
+    Returns (url, where) with where one of "current", "new" or "private",
+    or None for commands that don't open a page (and for plain text).
+    """
+    if not text.startswith("/") or _BATCH_SPLIT.search(text):
+        return None
+    cmd, arg = parse_command(text)
+
+    if cmd in REGISTRY:
+        resolve = getattr(REGISTRY[cmd], "resolve", None)
+        return resolve(arg) if resolve else None
+    if cmd in ("nt", "pt", "t") and arg:
+        return to_qurl(arg), {"nt": "new", "pt": "private", "t": "current"}[cmd]
+    if cmd in ("s", "ts") and arg:
+        return _search_url(arg), "current" if cmd == "s" else "new"
+    return None
+
 def unregister_command(name: str) -> None:
     REGISTRY.pop(name.lower(), None)
 
+def _message(window, title: str, text: str, warning: bool = False) -> None:
+    # Headless runs (batch.py) have no one to click OK; they take notify()
+    notify = getattr(window, "notify", None)
+    if notify is not None:
+        notify(title, text)
+    elif warning:
+        QMessageBox.warning(window, title, text)
+    else:
+        QMessageBox.information(window, title, text)
+
+def parse_command(text: str) -> Tuple[str, str]:
+    """"/nt:example.com" -> ("nt", "example.com")."""
+    parts = text.strip()[1:].split(":", 1)
+    return parts[0].strip().lower(), (parts[1].strip() if len(parts) > 1 else "")
+
+def parse_batch(text: str, expanding: Tuple[str, ...] = ()) -> List[Tuple[str, str]]:
+    """Split "/a ; /b" into (cmd, arg) pairs, expanding /macro:<name> inline.
+
+    Raises ValueError for a macro that runs itself, directly or through
+    others, or that nests deeper than MAX_MACRO_DEPTH; nothing runs then.
+    """
+    text = text.strip()
+    if _MACRO_DEFINITION.match(text):
+        return [parse_command(text)]  # the definition's own ";"s belong to it
+    out: List[Tuple[str, str]] = []
+    for part in _BATCH_SPLIT.split(text):
+        if not part.startswith("/"):
+            if part:
+                print("[commands] not a command, skipped:", part)
+            continue
+        cmd, arg = parse_command(part)
+        name = arg.strip().lower()
+        body = MACROS.get(name) if cmd == "macro" else None
+        if body is None:
+            out.append((cmd, arg))
+        elif name in expanding:
+            chain = " -> ".join(expanding + (name,))
+            raise ValueError(f"Macro /macro:{name} runs itself ({chain})")
+        elif len(expanding) >= MAX_MACRO_DEPTH:
+            raise ValueError(f"Macros nested more than {MAX_MACRO_DEPTH} deep at /macro:{name}")
+        else:
+            out.extend(parse_batch(body, expanding + (name,)))
+    return out
+
 def command_handler(window, text: str, new_window_factory=None) -> None:
     if not text.startswith("/"):
-        QMessageBox.information(window, "Command", "Commands must start with '/'.")
+        _message(window, "Command", "Commands must start with '/'.")
         return
 
-    parts = text[1:].split(":", 1)
-    cmd = parts[0].strip().lower()
-    arg = parts[1].strip() if len(parts) > 1 else ""
+    try:
+        commands = parse_batch(text)
+    except ValueError as e:
+        _message(window, "Macro", str(e), warning=True)
+        return
+    if len(commands) == 1:
+        run_command(window, *commands[0], new_window_factory)
+    elif commands:
+        CommandQueue.for_window(window).extend(commands, new_window_factory)
 
+def run_command(window, cmd: str, arg: str, new_window_factory=None) -> None:
     # 1) User / plugin commands first
     if cmd in REGISTRY:
         REGISTRY[cmd](window, arg)
@@ -44,28 +121,12 @@ def command_handler(window, text: str, new_window_factory=None) -> None:
 
     # 2) Built-ins
     if cmd == "nt":
-        if not arg:
-            new_tab_html = read_asset("browser_pages/new_tab.html")
-            window.new_tab(QUrl("about:blank"), private=False)
-            tab = window.current_tab()
-            if tab:
-                tab.view.setHtml(new_tab_html, QUrl("about:blank"))
-        else:
-            url = to_qurl(arg)
-            window.new_tab(url, private=False)
+        url = to_qurl(arg) if arg else QUrl(NEW_TAB_URL)
+        window.new_tab(url, private=False)
 
     elif cmd == "pt":
-        if not arg:
-            new_ptab_html = read_asset("browser_pages/new-ptab.html")
-            window.new_tab(QUrl("about:blank"), private=True)
-            tab = window.current_tab()
-            if tab:
-                tab.view.setHtml(new_ptab_html, QUrl("about:blank"))
-        else:
-            url = to_qurl(arg)
-            tab = window.new_tab(QUrl("about:blank"), private=True)
-            if tab:
-                tab.view.setUrl(url)
+        url = to_qurl(arg) if arg else QUrl(PRIVATE_TAB_URL)
+        window.new_tab(url, private=True)
 
     elif cmd == "t":
         url = to_qurl(arg or "about:blank")
@@ -77,14 +138,13 @@ def command_handler(window, text: str, new_window_factory=None) -> None:
 
     elif cmd == "nw":
         if new_window_factory is None:
-            QMessageBox.warning(window, "Unavailable", "New window command is not wired up.")
+            _message(window, "Unavailable", "New window command is not wired up.", warning=True)
             return
         win = new_window_factory()
         win.show()
 
     elif cmd == "s":
-        query = urllib.parse.quote(arg)
-        url = QUrl(f"https://www.google.com/search?q={query}")
+        url = _search_url(arg)
         tab = window.current_tab()
         if tab:
             tab.view.setUrl(url)
@@ -92,12 +152,11 @@ def command_handler(window, text: str, new_window_factory=None) -> None:
             window.new_tab(url, private=False)
 
     elif cmd == "ts":
-        query = urllib.parse.quote(arg)
-        url = QUrl(f"https://www.google.com/search?q={query}")
-        window.new_tab(url, private=False)
+        window.new_tab(_search_url(arg), private=False)
 
     elif cmd == "hist":
-        window.open_history_tab()
+        # /hist lists everything, /hist:<query> searches titles + URLs
+        window.open_history_tab(arg)
 
     elif cmd == "help":
         window.open_help_tab()
@@ -106,45 +165,172 @@ def command_handler(window, text: str, new_window_factory=None) -> None:
         window.open_commands_tab()
 
     elif cmd == "capture":
-        window.capture_screenshot()
+        window.capture_screenshot(arg)
+
+    elif cmd == "perf":
+        # /perf lists every tab's load metrics, /perf:hud toggles the overlay
+        if arg.lower() == "hud":
+            window.toggle_perf_hud()
+        else:
+            window.open_perf_tab()
 
     else:
-        QMessageBox.warning(window, "Unknown command",
-                            f"Unrecognized command: {text}\nTry /help")
+        _message(window, "Unknown command",
+                 f"Unrecognized command: /{cmd}\nTry /help", warning=True)
+
+
+class CommandQueue(QObject):
+    """Runs a parsed command list one command per event-loop tick.
+
+    Spawning a tab is cheap, but spawning fifteen in one call keeps the
+    window from repainting until they're all set up; a zero-interval timer
+    gives input and paint events a turn between commands. ``drained`` is
+    emitted once the last queued command has run.
+    """
+
+    drained = pyqtSignal()
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self._pending = deque()
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._step)
+
+    @classmethod
+    def for_window(cls, window) -> "CommandQueue":
+        queue = getattr(window, "_command_queue", None)
+        if queue is None:
+            queue = window._command_queue = cls(window)
+        return queue
+
+    def extend(self, commands: List[Tuple[str, str]], new_window_factory=None) -> None:
+        self._pending.extend((cmd, arg, new_window_factory) for cmd, arg in commands)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _step(self):
+        if not self._pending:
+            self._timer.stop()
+            self.drained.emit()
+            return
+        cmd, arg, factory = self._pending.popleft()
+        # Tabs opened mid-batch queue up behind the last one, which takes focus
+        self.window.open_tabs_in_background = bool(self._pending)
+        try:
+            run_command(self.window, cmd, arg, factory)
+        except Exception as e:
+            print(f"[commands] /{cmd} failed:", e)
+        finally:
+            self.window.open_tabs_in_background = False
+        if not self._pending:
+            self._timer.stop()
+            self.drained.emit()
 
 def _url_template_handler(template: str):
+    def _url(arg: str) -> QUrl:
+        return QUrl(template.format(q=urllib.parse.quote(arg or "")))
+
     def _fn(window, arg: str):
-        q = urllib.parse.quote(arg or "")
-        url = QUrl(template.format(q=q))
+        url = _url(arg)
         # open in a new normal tab; you could add a convention for private
         tab = window.current_tab()
         if tab:
             tab.view.setUrl(url)
         else:
             window.new_tab(url, private=False)
+    _fn.resolve = lambda arg: (_url(arg), "current")
     return _fn
 
-def load_user_commands() -> None:
-    if not COMMANDS_JSON.exists():
+def _handler_for(template: str):
+    if "{q}" in template:
+        # Search-style alias
+        return _url_template_handler(template)
+
+    # Direct URL alias
+    def _alias_url(arg2):
+        if arg2:  # Append if user gives extra path
+            if not template.endswith("/") and not arg2.startswith("/"):
+                return to_qurl(f"{template}/{arg2}")
+            return to_qurl(template + arg2)
+        return to_qurl(template)
+
+    def handler(window, arg2):
+        window.new_tab(_alias_url(arg2), private=False)
+    handler.resolve = lambda arg2: (_alias_url(arg2), "new")
+    return handler
+
+def _apply_user_command(name: str, template) -> None:
+    name = name.lower()
+    if name in RESERVED_COMMANDS:
+        if template is not None:
+            print(f"[commands] /{name} is built in; ignored in {COMMANDS_JSON.name}")
         return
+    if isinstance(template, str) and template.strip():
+        register_command(name, _handler_for(template.strip()))
+    else:
+        unregister_command(name)
+
+def _apply_macro(name: str, body) -> None:
+    # A macro is a list of commands or one "/a ; /b" string
+    if isinstance(body, list):
+        body = " ; ".join(str(line) for line in body)
+    name = name.lower()
+    if isinstance(body, str) and body.strip():
+        MACROS[name] = body.strip()
+    else:
+        MACROS.pop(name, None)
+
+_STORES: Dict[str, CommandStore] = {}
+
+def user_commands() -> CommandStore:
+    """commands.json, loaded once and kept in sync with REGISTRY."""
+    if "commands" not in _STORES:
+        _STORES["commands"] = CommandStore(COMMANDS_JSON, _apply_user_command)
+    return _STORES["commands"]
+
+def user_macros() -> CommandStore:
+    """macros.json, loaded once and kept in sync with MACROS."""
+    if "macros" not in _STORES:
+        _STORES["macros"] = CommandStore(MACROS_JSON, _apply_macro)
+    return _STORES["macros"]
+
+def load_user_commands() -> None:
+    user_commands()
+    user_macros()
+
+def flush_user_commands() -> None:
+    """Write pending /map and /macro edits now (on quit)."""
+    for store in _STORES.values():
+        store.flush()
+
+def read_startup_script(path=STARTUP_SCRIPT) -> List[Tuple[str, str]]:
+    """STARTUP_SCRIPT parsed once: one or more commands per line, # comments."""
     try:
-        data = json.loads(COMMANDS_JSON.read_text(encoding="utf-8"))
-        if isinstance(data, dict):
-            for name, template in data.items():
-                if isinstance(name, str) and isinstance(template, str) and "{q}" in template:
-                    register_command(name, _url_template_handler(template))
+        if not path.exists():
+            return []
+        lines = path.read_text(encoding="utf-8").splitlines()
     except Exception as e:
-        print("Failed to load user commands:", e)
+        print("[commands] failed reading startup script:", e)
+        return []
+    commands: List[Tuple[str, str]] = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                commands.extend(parse_batch(line))
+            except ValueError as e:
+                print("[commands] startup script line skipped:", e)
+    return commands
 
-def _save_user_command(name: str, template: str) -> None:
-    data = {}
-    if COMMANDS_JSON.exists():
-        try:
-            data = json.loads(COMMANDS_JSON.read_text(encoding="utf-8")) or {}
-        except Exception:
-            data = {}
-    data[name] = template
-    COMMANDS_JSON.write_text(json.dumps(data, indent=2), encoding="utf-8")
+def run_startup_script(window, new_window_factory=None) -> None:
+    commands = read_startup_script()
+    if commands:
+        CommandQueue.for_window(window).extend(commands, new_window_factory)
 
 def _alias_cmd(window, arg: str):
     """
@@ -157,50 +343,57 @@ def _alias_cmd(window, arg: str):
         name, template = arg.split("=", 1)
         name = name.strip().lower()
         template = template.strip()
-        if not name:
+        if not name or not template:
             raise ValueError
+        if name in RESERVED_COMMANDS:
+            _message(window, "Map error", f"/{name} is a built-in command", warning=True)
+            return
 
-        if "{q}" in template:
-            # Search-style alias
-            handler = _url_template_handler(template)
-        else:
-            # Direct URL alias
-            def handler(window, arg2):
-                if arg2:  # Append if user gives extra path
-                    if not template.endswith("/") and not arg2.startswith("/"):
-                        url = f"{template}/{arg2}"
-                    else:
-                        url = template + arg2
-                else:
-                    url = template
-                window.new_tab(to_qurl(url), private=False)
-
-        register_command(name, handler)
-        _save_user_command(name, template)
-        QMessageBox.information(window, "Mapped",
-                                f"/{name} -> {template}")
+        user_commands().set(name, template)  # registers it, writes it shortly
+        _message(window, "Mapped",
+                 f"/{name} -> {template}")
     except Exception:
-        QMessageBox.warning(window, "Map error",
-                            "Usage: /map:name=https://site/")
+        _message(window, "Map error",
+                 "Usage: /map:name=https://site/", warning=True)
 
 
 def _unalias_cmd(window, arg: str):
     name = (arg or "").strip().lower()
     if not name:
-        QMessageBox.warning(window, "Unalias", "Usage: /unalias:name")
+        _message(window, "Unalias", "Usage: /unalias:name", warning=True)
+        return
+    if name in RESERVED_COMMANDS:
+        _message(window, "Unalias", f"/{name} is a built-in command", warning=True)
         return
     unregister_command(name)
-    # update file
-    data = {}
-    if COMMANDS_JSON.exists():
-        try:
-            data = json.loads(COMMANDS_JSON.read_text(encoding="utf-8")) or {}
-        except Exception:
-            data = {}
-    if name in data:
-        data.pop(name)
-        COMMANDS_JSON.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    QMessageBox.information(window, "Unalias", f"Removed /{name}")
+    user_commands().remove(name)
+    _message(window, "Unalias", f"Removed /{name}")
+
+def _macro_cmd(window, arg: str):
+    """
+    Syntax: /macro:name=/nt:a ; /nt:b   save a macro
+            /macro:name                 run it (expanded by parse_batch)
+            /macro:name=                delete it
+    """
+    name, sep, body = (arg or "").partition("=")
+    name = name.strip().lower()
+    if not name:
+        names = ", ".join(sorted(MACROS)) or "(none)"
+        _message(window, "Macros",
+                 f"Macros: {names}\nUsage: /macro:name=/nt:a ; /nt:b")
+        return
+    if not sep:
+        # parse_batch already expanded known names
+        _message(window, "Macro", f"No macro named {name}", warning=True)
+        return
+    body = body.strip()
+    if body:
+        user_macros().set(name, body)
+    else:
+        user_macros().remove(name)
+    _message(window, "Macro",
+             f"/macro:{name} -> {body}" if body else f"Removed /macro:{name}")
 
 register_command("map", _alias_cmd)
-register_command("unmap", _unalias_cmd)
\ No newline at end of file
+register_command("unmap", _unalias_cmd)
+register_command("macro", _macro_cmd)
\ No newline at end of file
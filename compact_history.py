@@ -0,0 +1,138 @@
+from array import array
+from typing import Dict, List
+
+
+# Scheme + "www." prefixes stored as a one-byte code instead of per URL.
+# Longest first so "https://www." wins over "https://".
+_PREFIXES = ("https://www.", "http://www.", "https://", "http://", "")
+
+
+class HistoryEntry:
+    """Read-only view of one row of CompactHistory."""
+    __slots__ = ("url", "title", "visits", "last_visit")
+
+    def __init__(self, url: str, title: str, visits: int, last_visit: float):
+        self.url = url
+        self.title = title
+        self.visits = visits
+        self.last_visit = last_visit
+
+
+class CompactHistory:
+    """Columnar, one-row-per-URL in-memory history.
+
+    A URL is split into a prefix code (scheme + optional www.), an interned
+    domain id and the remaining path, so the thousands of visits to one site
+    share a single domain string. Numbers live in typed arrays (4-8 bytes a
+    value) instead of boxed Python ints/floats, and there is no per-row dict
+    or object at all; HistoryEntry views are built on demand.
+
+    Lookups by URL hash into an open-addressing table of row ids (an int
+    array, kept at most half full) instead of a url -> row dict, which
+    would hold every URL string a second time.
+    """
+
+    def __init__(self):
+        self._hashes = array("q")          # hash of each row's URL
+        self._table = array("i", [-1]) * 16
+        self._domain_ids: Dict[str, int] = {}
+        self.domains: List[str] = []
+        self.prefix = array("B")
+        self.domain = array("I")
+        self.path: List[str] = []
+        self.titles: List[str] = []
+        self.visits = array("I")
+        self.last_visit = array("d")
+
+    def __len__(self) -> int:
+        return len(self.path)
+
+    @staticmethod
+    def _split(url: str):
+        head = url[:len(_PREFIXES[0])].lower()  # "HTTPS://" is still https://
+        code = next(n for n, p in enumerate(_PREFIXES) if head.startswith(p))
+        rest = url[len(_PREFIXES[code]):]
+        cut = len(rest)
+        for sep in "/?#":
+            pos = rest.find(sep)
+            if pos != -1 and pos < cut:
+                cut = pos
+        return code, rest[:cut], rest[cut:]
+
+    def append(self, url: str, title: str, visits: int, last_visit: float) -> int:
+        code, domain, path = self._split(url)
+        did = self._domain_ids.get(domain)
+        if did is None:
+            did = self._domain_ids[domain] = len(self.domains)
+            self.domains.append(domain)
+        self.prefix.append(code)
+        self.domain.append(did)
+        self.path.append(path)
+        # Untitled pages fall back to the URL; don't store it twice
+        self.titles.append("" if title == url else (title or ""))
+        self.visits.append(visits)
+        self.last_visit.append(last_visit)
+        i = len(self.path) - 1
+        self._hashes.append(hash(_PREFIXES[code] + domain + path))
+        if 2 * len(self.path) > len(self._table):
+            self._rehash(2 * len(self._table))
+        else:
+            self._insert(i)
+        return i
+
+    def reserve(self, rows: int) -> None:
+        """Size the lookup table for ``rows`` rows up front (bulk loads)."""
+        size = len(self._table)
+        while size < 2 * rows:
+            size *= 2
+        if size != len(self._table):
+            self._rehash(size)
+
+    def _insert(self, i: int) -> None:
+        table, mask = self._table, len(self._table) - 1
+        j = self._hashes[i] & mask
+        while table[j] != -1:
+            j = (j + 1) & mask
+        table[j] = i
+
+    def _rehash(self, size: int) -> None:
+        self._table = array("i", [-1]) * size
+        for i in range(len(self._hashes)):
+            self._insert(i)
+
+    def find(self, url: str) -> int:
+        """Row of ``url``, or -1."""
+        code, domain, path = self._split(url)
+        h = hash(_PREFIXES[code] + domain + path)
+        did = self._domain_ids.get(domain, -1)
+        table, hashes, mask = self._table, self._hashes, len(self._table) - 1
+        j = h & mask
+        while True:
+            i = table[j]
+            if i == -1:
+                return -1
+            if (hashes[i] == h and self.path[i] == path and self.domain[i] == did
+                    and self.prefix[i] == code):
+                return i
+            j = (j + 1) & mask
+
+    def touch(self, i: int, title: str, timestamp: float) -> None:
+        """Count one more visit to row ``i``."""
+        self.visits[i] += 1
+        if timestamp > self.last_visit[i]:
+            self.last_visit[i] = timestamp
+        if title:
+            self.titles[i] = "" if title == self.url(i) else title
+
+    def url(self, i: int) -> str:
+        return _PREFIXES[self.prefix[i]] + self.domains[self.domain[i]] + self.path[i]
+
+    def title(self, i: int) -> str:
+        return self.titles[i] or self.url(i)
+
+    def key(self, i: int) -> str:
+        """The typed form used for completion (see completion.normalize_url)."""
+        return (self.domains[self.domain[i]] + self.path[i]).lower()
+
+    def entry(self, i: int) -> HistoryEntry:
+        return HistoryEntry(self.url(i), self.title(i), self.visits[i], self.last_visit[i])
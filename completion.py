@@ -0,0 +1,241 @@
+import heapq
+import math
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from compact_history import CompactHistory
+from constants import FRECENCY_HALF_LIFE_DAYS
+
+
+# Suggestions cached per prefix; prefixes up to CACHE_DEPTH characters are
+# always cached, longer ones once more than SCAN_LIMIT URLs share them.
+TOP_K = 12
+CACHE_DEPTH = 4
+SCAN_LIMIT = 2000
+
+_HALF_LIFE = FRECENCY_HALF_LIFE_DAYS * 86400.0
+
+
+def frecency(count: int, last_visit: float) -> float:
+    """Visit count with exponential recency decay, in log2 space.
+
+    ``count * 2 ** (-(now - last_visit) / half_life)`` orders URLs exactly
+    like ``log2(count) + last_visit / half_life``, and the latter does not
+    depend on "now", so rankings cached in the index never go stale.
+    """
+    return math.log2(max(1, count)) + last_visit / _HALF_LIFE
+
+
+def normalize_url(url: str) -> str:
+    """The part of a URL people actually type: no scheme, no www., lowercase."""
+    key = url.lower()
+    for prefix in ("https://", "http://"):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+            break
+    if key.startswith("www."):
+        key = key[4:]
+    return key
+
+
+def _crowded_prefixes(sorted_keys: List[str]) -> set:
+    """Prefixes longer than CACHE_DEPTH that more than SCAN_LIMIT keys share.
+
+    Such a prefix holds some key and the one SCAN_LIMIT places after it in
+    sorted order, so it is a prefix of their common prefix; that makes one
+    pass enough. The result is closed under taking shorter prefixes.
+    """
+    crowded = set()
+    for a, b in zip(sorted_keys, sorted_keys[SCAN_LIMIT:]):
+        n = 0
+        for x, y in zip(a, b):
+            if x != y:
+                break
+            n += 1
+        prefix = a[:n]
+        while len(prefix) > CACHE_DEPTH and prefix not in crowded:
+            crowded.add(prefix)
+            prefix = prefix[:-1]
+    return crowded
+
+
+class CompletionIndex:
+    """Frecency-ranked prefix index over history URLs and palette commands.
+
+    URL ids are kept sorted by their typed form, so the URLs starting with a
+    prefix are one bisected range. Every prefix up to CACHE_DEPTH characters,
+    and every longer one whose range holds more than SCAN_LIMIT URLs, caches
+    its TOP_K best entries: a lookup is either one dict hit or a ranking of
+    at most about SCAN_LIMIT ids, however skewed history is towards one
+    site. Visits update the index in place, so it never has to be rebuilt. Per-URL data lives in a
+    CompactHistory, and the shared() instance is the one in-memory copy of
+    history for every window.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "CompletionIndex":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.entries = CompactHistory()
+        self._scores = array("d")
+        self._top: Dict[str, List[int]] = {}
+        self._order = array("I")   # ids sorted by entries.key()
+        self._commands: Dict[str, Tuple[int, float]] = {}
+        self._loading = False
+        self._replay: Optional[list] = None
+        self.loaded = False
+
+    # --- Loading -------------------------------------------------------------
+    def load_async(self, history) -> None:
+        """Build the URL index from ``history`` on a worker thread (once)."""
+        with self._lock:
+            if self.loaded or self._loading:
+                return
+            self._loading = True
+            self._replay = []
+        threading.Thread(target=self._load, args=(history,),
+                         name="completion-index", daemon=True).start()
+
+    def _load(self, history) -> None:
+        try:
+            rows = history.url_stats()
+        except Exception as e:
+            print("[completion] failed loading history:", e)
+            rows = []
+        fresh = CompletionIndex()
+        fresh.bulk_load(rows)
+        del rows
+        with self._lock:
+            for name in ("entries", "_scores", "_top", "_order"):
+                setattr(self, name, getattr(fresh, name))
+            replay, self._replay = self._replay or [], None
+            # Visits recorded while we were reading the database
+            for url, title, ts in replay:
+                self.record_visit(url, title, ts)
+            self._loading = False
+            self.loaded = True
+
+    def bulk_load(self, rows) -> None:
+        """Index (url, title, count, last_visit) rows, one per distinct URL."""
+        with self._lock:
+            if hasattr(rows, "__len__"):
+                self.entries.reserve(len(self.entries) + len(rows))
+            for url, title, count, last in rows:
+                self._append(url, title, int(count), float(last))
+            entries = self.entries
+            keys = [entries.key(i) for i in range(len(entries))]
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._order = array("I", order)
+            cached = _crowded_prefixes([keys[i] for i in order])
+            # Visiting ids best-first means each prefix list fills up sorted
+            self._top = {}
+            for i in sorted(order, key=self._scores.__getitem__, reverse=True):
+                key = keys[i]
+                for d in range(len(key) + 1):
+                    prefix = key[:d]
+                    if d > CACHE_DEPTH and prefix not in cached:
+                        break  # nor any longer prefix of this key
+                    top = self._top.setdefault(prefix, [])
+                    if len(top) < TOP_K:
+                        top.append(i)
+
+    def _append(self, url: str, title: str, count: int, last: float) -> int:
+        i = self.entries.append(url, title, count, last)
+        self._scores.append(frecency(count, last))
+        return i
+
+    def _lower_bound(self, key: str) -> int:
+        """First position in _order whose key is >= ``key``."""
+        order, key_of = self._order, self.entries.key
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_of(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        """The slice of _order whose keys start with ``prefix``."""
+        end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self._lower_bound(prefix), self._lower_bound(end)
+
+    # --- Updates -------------------------------------------------------------
+    def record_visit(self, url: str, title: str, timestamp: Optional[float] = None) -> None:
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((url, title, ts))
+                return
+            entries = self.entries
+            i = entries.find(url)
+            if i == -1:
+                i = self._append(url, title, 1, ts)
+                self._order.insert(self._lower_bound(entries.key(i)), i)
+            else:
+                entries.touch(i, title, ts)
+                self._scores[i] = frecency(entries.visits[i], entries.last_visit[i])
+            self._promote(i)
+
+    def _promote(self, i: int) -> None:
+        # Scores only ever go up, so an entry can only climb the cached lists
+        key, score, scores = self.entries.key(i), self._scores[i], self._scores
+        for d in range(len(key) + 1):
+            if d <= CACHE_DEPTH:
+                top = self._top.setdefault(key[:d], [])
+            else:
+                top = self._top.get(key[:d])
+                if top is None:
+                    continue  # ranked on demand; a longer prefix may be cached
+            if i not in top:
+                if len(top) >= TOP_K and score <= scores[top[-1]]:
+                    continue
+                top.append(i)
+            top.sort(key=scores.__getitem__, reverse=True)
+            del top[TOP_K:]
+
+    def record_command(self, name: str) -> None:
+        count, _ = self._commands.get(name, (0, 0.0))
+        self._commands[name] = (count + 1, time.time())
+
+    # --- Queries -------------------------------------------------------------
+    def complete_urls(self, text: str, limit: int = 8) -> List[Tuple[str, str]]:
+        """Best (url, title) pairs whose typed form starts with ``text``."""
+        prefix = normalize_url(text.strip())
+        with self._lock:
+            entries = self.entries
+            top = self._top.get(prefix)
+            if top is not None:
+                ids = top[:limit]
+            elif len(prefix) <= CACHE_DEPTH:
+                ids = []  # every such prefix in history is cached
+            else:
+                lo, hi = self._range(prefix)
+                rank = self._scores.__getitem__
+                if hi - lo > SCAN_LIMIT:
+                    # Grew past the limit since the build: cache it from now on
+                    top = self._top[prefix] = heapq.nlargest(TOP_K, self._order[lo:hi], key=rank)
+                    ids = top[:limit]
+                else:
+                    ids = heapq.nlargest(limit, self._order[lo:hi], key=rank)
+            return [(entries.url(i), entries.title(i)) for i in ids]
+
+    def complete_commands(self, prefix: str, names, limit: int = 8) -> List[str]:
+        """Command names starting with ``prefix``, most used first."""
+        prefix = prefix.lower()
+        stats = self._commands
+
+        def rank(name):
+            count, last = stats.get(name, (0, 0.0))
+            return (-frecency(count, last) if count else 0.0, name)
+
+        return sorted((n for n in set(names) if n.startswith(prefix)), key=rank)[:limit]
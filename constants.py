@@ -6,6 +6,86 @@ BASE_DIR = Path(__file__).resolve().parent
 
 
 COMMANDS_JSON = BASE_DIR / "cmd_list" / "commands.json"
+MACROS_JSON = BASE_DIR / "cmd_list" / "macros.json"      # {"morning": ["/nt:a", "/nt:b"]}
+STARTUP_SCRIPT = BASE_DIR / "cmd_list" / "startup.txt"   # commands run once at launch
 
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-HISTORY_FILE = os.path.join(os.path.dirname(__file__), "history", "browser_history.json")
\ No newline at end of file
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "history", "browser_history.json")
+HISTORY_DB = os.path.join(os.path.dirname(__file__), "history", "browser_history.sqlite3")
+HISTORY_FLUSH_BATCH = 50         # visits per background write
+HISTORY_FLUSH_INTERVAL = 2.0     # seconds a visit may wait in memory
+
+FRECENCY_HALF_LIFE_DAYS = 14.0   # a visit counts half as much after this long
+
+# History retention (enforced by the history writer thread)
+HISTORY_RAW_DAYS = 90            # keep individual visits this long, then daily rollups
+HISTORY_MAX_AGE_DAYS = 365       # forget URLs not visited for this long
+HISTORY_MAX_URLS = 200_000       # cap on distinct URLs kept
+HISTORY_COMPACT_INTERVAL = 15 * 60   # seconds between compaction passes
+
+# Background tab lifecycle (tab_lifecycle.TabLifecycleManager)
+TAB_MEMORY_BUDGET_MB = 2048      # renderer memory allowed before tabs get discarded
+TAB_MEMORY_ESTIMATE_MB = 150     # per live tab, where renderer RSS can't be read
+TAB_FREEZE_AFTER = 5 * 60        # seconds in the background before a tab is frozen
+TAB_LIFECYCLE_INTERVAL_MS = 30_000
+
+# User key bindings, {"Ctrl+T": "new_tab", ...}; see keymap.DEFAULT_KEYMAP
+KEYMAP_JSON = BASE_DIR / "cmd_list" / "keymap.json"
+
+# Content blocking: EasyList-style *.txt lists in ADBLOCK_DIR, compiled once
+# into ADBLOCK_CACHE and reused until a list changes
+ADBLOCK_ENABLED = True
+ADBLOCK_DIR = BASE_DIR / "adblock"
+ADBLOCK_CACHE = ADBLOCK_DIR / "compiled.pickle"
+
+SESSION_FILE = BASE_DIR / "session" / "session.json"
+RESTORE_SESSION = True
+
+# Later launches hand their URLs/commands to the running instance (ipc.py)
+SINGLE_INSTANCE = True
+IPC_TIMEOUT = 2.0                # seconds a launcher waits for the instance's ack
+
+# Palette speculation (speculation.Speculator): once typing pauses, warm up
+# the page the command would open
+SPECULATE = True
+PRECONNECT_DELAY_MS = 150        # pause before preconnecting to the command's origin
+PRERENDER_DELAY_MS = 600         # longer pause before loading it in a hidden tab
+MAX_PRERENDERS = 3               # hidden-tab loads per palette opening
+
+# Tab loads (load_scheduler.LoadScheduler): the foreground tab always starts
+# at once, others wait for one of these slots
+MAX_CONCURRENT_LOADS = 4
+LOAD_SLOT_TIMEOUT_MS = 15_000    # a slow page gives its slot up after this long
+
+# Screenshots (screenshots.py): grabbed on the UI thread, encoded and
+# written by SCREENSHOT_WORKERS threads. "/capture:jpg,80,save" overrides
+SCREENSHOT_DIR = Path.home() / "Pictures" / "TBrowser"
+SCREENSHOT_FORMAT = "png"        # png | jpg | webp
+SCREENSHOT_QUALITY = 90          # 1-100, for jpg and webp
+SCREENSHOT_ASK = True            # False: save to SCREENSHOT_DIR without a dialog
+SCREENSHOT_WORKERS = 2
+
+# /capture:full and /capture:all (page_capture.py)
+FULL_PAGE_MAX_HEIGHT = 20_000    # CSS px; infinite-scroll pages stop here
+CAPTURE_TILES_IN_FLIGHT = 3      # tiles grabbed but not yet encoded, per capture
+CAPTURE_SETTLE_MS = 150          # wait after scrolling/attaching before grabbing
+CAPTURE_LOAD_TIMEOUT_MS = 20_000 # unloaded tabs get this long to load
+CAPTURES_IN_FLIGHT = 4           # /capture:all captures waiting on the encoder
+
+# /perf:hud overlay (perf.PerfHud)
+PERF_HUD_INTERVAL_MS = 1000
+
+# UI-thread stall watchdog (stall_watchdog.py), also enabled by --watch-stalls.
+# Reports go to STALL_REPORT_DIR as stalls_<time>.folded (flamegraph input)
+# and stalls_<time>.log
+STALL_WATCHDOG = False
+STALL_THRESHOLD_MS = 50          # an event loop this late counts as stalled
+STALL_PING_MS = 25               # pause between pings while the loop keeps up
+STALL_SAMPLE_MS = 5              # stack sampling period during a stall
+STALL_WRITE_INTERVAL = 30.0      # seconds between rewrites of the .folded file
+STALL_REPORT_DIR = BASE_DIR / "stalls"
+
+# Headless batch mode: tbrowser --batch urls.txt [--capture DIR] (batch.py)
+BATCH_JOBS = 4                   # pages loading at once
+BATCH_TIMEOUT = 30.0             # seconds per page before it's captured as-is
+BATCH_VIEWPORT = "1280x800"
@@ -0,0 +1,594 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from constants import (
+    HISTORY_DB, HISTORY_FILE, HISTORY_FLUSH_BATCH, HISTORY_FLUSH_INTERVAL,
+    HISTORY_RAW_DAYS, HISTORY_MAX_AGE_DAYS, HISTORY_MAX_URLS, HISTORY_COMPACT_INTERVAL,
+)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS visits (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    url       TEXT NOT NULL,
+    title     TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS visits_url ON visits(url);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- One row per distinct URL: visit count and last visit survive compaction
+CREATE TABLE IF NOT EXISTS urls (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    url         TEXT NOT NULL UNIQUE,
+    title       TEXT NOT NULL,
+    visit_count INTEGER NOT NULL,
+    last_visit  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_last_visit ON urls(last_visit);
+
+-- Raw visits older than HISTORY_RAW_DAYS are folded into per-day counts
+CREATE TABLE IF NOT EXISTS daily_visits (
+    url_id INTEGER NOT NULL,
+    day    INTEGER NOT NULL,      -- days since the epoch (UTC)
+    count  INTEGER NOT NULL,
+    PRIMARY KEY (url_id, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS daily_visits_day ON daily_visits(day, url_id);
+
+-- The first search index covered raw visits, which compaction deletes
+DROP TRIGGER IF EXISTS visits_ai;
+DROP TRIGGER IF EXISTS visits_ad;
+DROP TABLE IF EXISTS visits_fts;
+"""
+
+# Separate from _SCHEMA: the trigram tokenizer needs SQLite >= 3.34, and
+# without it history still works, searched with LIKE (see _setup_fts)
+_FTS_SCHEMA = """
+-- Full-text index over URL titles and addresses. The trigram tokenizer
+-- matches any substring of 3+ characters ("hub.com", "kuberne"), and the
+-- triggers keep it in step with urls whoever writes them.
+CREATE VIRTUAL TABLE IF NOT EXISTS urls_fts USING fts5(
+    title, url, content='urls', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS urls_ai AFTER INSERT ON urls BEGIN
+    INSERT INTO urls_fts(rowid, title, url) VALUES (new.id, new.title, new.url);
+END;
+CREATE TRIGGER IF NOT EXISTS urls_ad AFTER DELETE ON urls BEGIN
+    INSERT INTO urls_fts(urls_fts, rowid, title, url) VALUES ('delete', old.id, old.title, old.url);
+END;
+CREATE TRIGGER IF NOT EXISTS urls_au AFTER UPDATE OF title ON urls
+WHEN old.title IS NOT new.title BEGIN
+    INSERT INTO urls_fts(urls_fts, rowid, title, url) VALUES ('delete', old.id, old.title, old.url);
+    INSERT INTO urls_fts(rowid, title, url) VALUES (new.id, new.title, new.url);
+END;
+"""
+
+# How many of the most recently visited matching URLs are ranked per search
+_SEARCH_CANDIDATES = 500
+
+_FTS_TRIGGERS = ("urls_ai", "urls_ad", "urls_au")
+
+_DAY = 86400.0
+
+
+def _like_escape(term: str) -> str:
+    """``term`` as a literal inside a LIKE pattern with ESCAPE '\\'."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=10.0, isolation_level=None,
+                           check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _insert_visits(conn: sqlite3.Connection, rows: list) -> None:
+    """Append raw (url, title, timestamp) visits and roll them into urls."""
+    conn.executemany("INSERT INTO visits (url, title, timestamp) VALUES (?, ?, ?)", rows)
+    conn.executemany("""
+        INSERT INTO urls (url, title, visit_count, last_visit) VALUES (?, ?, 1, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            visit_count = visit_count + 1,
+            title = CASE WHEN excluded.last_visit >= last_visit THEN excluded.title ELSE title END,
+            last_visit = MAX(last_visit, excluded.last_visit)
+    """, rows)
+
+
+def compact(conn: sqlite3.Connection, now: Optional[float] = None,
+            raw_days: float = HISTORY_RAW_DAYS, max_age_days: float = HISTORY_MAX_AGE_DAYS,
+            max_urls: int = HISTORY_MAX_URLS) -> dict:
+    """Apply the retention policy in one transaction; returns what was removed.
+
+    1. Raw visits older than ``raw_days`` become daily_visits counts.
+    2. URLs not visited for ``max_age_days`` are forgotten entirely.
+    3. Beyond ``max_urls`` distinct URLs, the least recently visited go.
+    Per-URL visit counts are untouched by step 1, so frecency is preserved.
+    """
+    now = time.time() if now is None else now
+    raw_cutoff = now - raw_days * _DAY
+    age_cutoff = now - max_age_days * _DAY
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # The WHERE clause is required for INSERT ... SELECT ... ON CONFLICT
+        conn.execute("""
+            INSERT INTO daily_visits (url_id, day, count)
+            SELECT u.id, CAST(v.timestamp / 86400 AS INTEGER), COUNT(*)
+            FROM visits v JOIN urls u ON u.url = v.url
+            WHERE v.timestamp < ?
+            GROUP BY u.id, CAST(v.timestamp / 86400 AS INTEGER)
+            ON CONFLICT(url_id, day) DO UPDATE SET count = count + excluded.count
+        """, (raw_cutoff,))
+        rolled = conn.execute("DELETE FROM visits WHERE timestamp < ?", (raw_cutoff,)).rowcount
+
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS doomed (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM doomed")
+        conn.execute("INSERT INTO doomed SELECT id FROM urls WHERE last_visit < ?", (age_cutoff,))
+        conn.execute("""
+            INSERT OR IGNORE INTO doomed
+            SELECT id FROM urls ORDER BY last_visit DESC LIMIT -1 OFFSET ?
+        """, (max_urls,))
+        conn.execute("DELETE FROM visits WHERE url IN (SELECT url FROM urls WHERE id IN doomed)")
+        conn.execute("DELETE FROM daily_visits WHERE url_id IN doomed")
+        expired = conn.execute("DELETE FROM urls WHERE id IN doomed").rowcount
+        conn.execute("DELETE FROM daily_visits WHERE day < ?", (int(age_cutoff // _DAY),))
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+    return {"rolled_up_visits": rolled, "expired_urls": expired}
+
+
+class HistoryWriter(threading.Thread):
+    """Flushes queued visits to SQLite in batches, off the UI thread.
+
+    A batch is written when ``batch_size`` visits are queued, when the oldest
+    queued visit is ``interval`` seconds old, or when someone calls flush().
+    Each batch is one transaction, so a crash leaves either the whole batch
+    or none of it on disk, never a truncated file. Every
+    ``compact_interval`` seconds the thread also runs compact().
+    """
+
+    def __init__(self, path: str, batch_size: int = HISTORY_FLUSH_BATCH,
+                 interval: float = HISTORY_FLUSH_INTERVAL,
+                 compact_interval: Optional[float] = HISTORY_COMPACT_INTERVAL):
+        super().__init__(name="history-writer", daemon=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._queue = []
+        self._oldest = None       # monotonic time of the oldest queued visit
+        self._requested = 0       # flush generations asked for ...
+        self._done = 0            # ... and completed
+        self._stopping = False
+        self.compact_interval = compact_interval
+        # First pass a minute after startup, so it never competes with loading
+        self._next_compact = time.monotonic() + min(60.0, compact_interval or 0)
+        self.stats = {"flushes": 0, "visits": 0, "last_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0,
+                      "compactions": 0, "compact_ms": 0.0, "rolled_up_visits": 0, "expired_urls": 0}
+
+    def enqueue(self, row: tuple) -> None:
+        with self._cond:
+            self._queue.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def queued(self) -> list:
+        """The (url, title, timestamp) visits not written yet, oldest first."""
+        with self._cond:
+            return list(self._queue)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is on disk."""
+        with self._cond:
+            self._requested += 1
+            target = self._requested
+            self._cond.notify()
+            return self._cond.wait_for(lambda: self._done >= target, timeout)
+
+    def request_compact(self) -> None:
+        """Run a compaction pass as soon as the thread is free."""
+        with self._cond:
+            self._next_compact = time.monotonic()
+            self.compact_interval = self.compact_interval or HISTORY_COMPACT_INTERVAL
+            self._cond.notify()
+
+    def _compact_due(self) -> bool:
+        return bool(self.compact_interval) and time.monotonic() >= self._next_compact
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self.join(timeout)
+
+    def run(self) -> None:
+        conn = _connect(self.path)
+        while True:
+            with self._cond:
+                while not (self._stopping or self._requested > self._done
+                           or len(self._queue) >= self.batch_size or self._compact_due()):
+                    timeout = None
+                    if self.compact_interval:
+                        timeout = self._next_compact - time.monotonic()
+                    if self._queue:
+                        remaining = self.interval - (time.monotonic() - self._oldest)
+                        if remaining <= 0:
+                            break
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+                    self._cond.wait(timeout)
+                batch, self._queue, self._oldest = self._queue, [], None
+                target, stopping = self._requested, self._stopping
+                compact_now = self._compact_due() and not stopping
+            if batch and not self._write(conn, batch):
+                if stopping:
+                    # No next tick to retry on: one more try (the lock may
+                    # just have been busy), then say what is lost
+                    time.sleep(0.2)
+                    if not self._write(conn, batch):
+                        print(f"[history] {len(batch)} visits could not be saved at exit")
+                else:
+                    with self._cond:
+                        # Put the batch back in front; retry on the next tick
+                        self._queue[:0] = batch
+                        self._oldest = time.monotonic()
+            with self._cond:
+                self._done = max(self._done, target)
+                self._cond.notify_all()
+            if compact_now:
+                self._compact(conn)
+            if stopping:
+                break
+        conn.close()
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        started = time.perf_counter()
+        try:
+            result = compact(conn)
+        except sqlite3.Error as e:
+            print("[history] compaction failed:", e)
+            result = {}
+        with self._cond:
+            self._next_compact = time.monotonic() + (self.compact_interval or 0)
+        s = self.stats
+        s["compactions"] += 1
+        s["compact_ms"] = (time.perf_counter() - started) * 1000.0
+        s["rolled_up_visits"] += result.get("rolled_up_visits", 0)
+        s["expired_urls"] += result.get("expired_urls", 0)
+
+    def _write(self, conn: sqlite3.Connection, batch: list) -> bool:
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            last = conn.execute("SELECT url FROM visits ORDER BY id DESC LIMIT 1").fetchone()
+            last_url = last[0] if last else None
+            rows = []
+            for row in batch:
+                # Another process may have written the same URL in between
+                if row[0] != last_url:
+                    rows.append(row)
+                    last_url = row[0]
+            _insert_visits(conn, rows)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            print("[history] batch write failed:", e)
+            return False
+        elapsed = (time.perf_counter() - started) * 1000.0
+        s = self.stats
+        s["flushes"] += 1
+        s["visits"] += len(rows)
+        s["last_ms"] = elapsed
+        s["max_ms"] = max(s["max_ms"], elapsed)
+        s["total_ms"] += elapsed
+        return True
+
+
+class HistoryStore:
+    """Append-only browsing history backed by SQLite in WAL mode.
+
+    Three tables: raw ``visits`` (recent ones only), ``urls`` with a visit
+    count and last visit per distinct URL, and ``daily_visits`` rollups that
+    compact() turns old raw visits into. The writer thread runs compact()
+    periodically, which keeps the database bounded in size.
+
+    Recording a visit only appends to an in-memory queue; a HistoryWriter
+    thread turns the queue into batched INSERTs, so the cost is the same with
+    ten entries as with a million and the UI thread never touches the disk.
+    WAL lets several windows (or several TBrowser processes) read while one
+    of them writes; writers queue on the database lock via ``busy_timeout``.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "HistoryStore":
+        """One store per process, shared by every MainWindow."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path: str = HISTORY_DB, legacy_json: Optional[str] = HISTORY_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = _connect(path)
+        self._conn.executescript(_SCHEMA)
+        self.fts = self._setup_fts()
+        # Roll up visits from before the urls table existed, then import JSON
+        self._build_urls()
+        if legacy_json:
+            self._migrate_json(legacy_json)
+        last = self._conn.execute("SELECT url FROM visits ORDER BY id DESC LIMIT 1").fetchone()
+        self._last_url = last[0] if last else None
+        self._writer = HistoryWriter(path)
+        self._writer.start()
+
+    def _setup_fts(self) -> bool:
+        """Create the search index; False where this SQLite can't have it.
+
+        Without the trigram tokenizer its triggers would fail every write to
+        urls, so they are dropped and the index marked stale; the next
+        start on a newer SQLite rebuilds it.
+        """
+        with self._lock:
+            try:
+                self._conn.executescript(_FTS_SCHEMA)
+                self._conn.execute("SELECT rowid FROM urls_fts LIMIT 0").fetchall()
+            except sqlite3.Error as e:
+                print(f"[history] SQLite {sqlite3.sqlite_version} has no trigram search "
+                      f"({e}); using LIKE")
+                for name in _FTS_TRIGGERS:
+                    self._conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fts_stale', '1')")
+                return False
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'fts_stale'").fetchone():
+                self._conn.execute("INSERT INTO urls_fts(urls_fts) VALUES ('rebuild')")
+                self._conn.execute("DELETE FROM meta WHERE key = 'fts_stale'")
+            return True
+
+    # --- Migration -----------------------------------------------------------
+    def _migrate_json(self, json_path: str) -> None:
+        """Import the old browser_history.json once; the file is left untouched."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+            if row is not None:
+                return
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except Exception:
+                entries = []
+            rows = []
+            for entry in entries if isinstance(entries, list) else []:
+                try:
+                    url = str(entry["url"])
+                    rows.append((url, str(entry.get("title") or url),
+                                 float(entry.get("timestamp") or 0.0)))
+                except Exception:
+                    continue
+            # BEGIN IMMEDIATE serialises concurrent first starts: only one
+            # process gets to import, the others see the meta flag.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+                if row is None:
+                    _insert_visits(self._conn, rows)
+                    self._conn.execute(
+                        "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                        (str(len(rows)),))
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                self._conn.execute("ROLLBACK")
+                print("[history] JSON migration failed:", e)
+
+    def _build_urls(self) -> None:
+        """Aggregate pre-existing raw visits into urls (and its index), once."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'urls_built'").fetchone()
+            if row is not None:
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute(
+                        "SELECT value FROM meta WHERE key = 'urls_built'").fetchone() is None:
+                    # SQLite takes the bare "title" column from the MAX(timestamp) row
+                    self._conn.execute("""
+                        INSERT OR IGNORE INTO urls (url, title, visit_count, last_visit)
+                        SELECT url, title, COUNT(*), MAX(timestamp) FROM visits GROUP BY url
+                    """)
+                    self._conn.execute("INSERT INTO meta (key, value) VALUES ('urls_built', '1')")
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                print("[history] building url table failed:", e)
+
+    # --- Writes --------------------------------------------------------------
+    def record_visit(self, url: str, title: str, timestamp: Optional[float] = None) -> bool:
+        """Queue a visit unless it repeats the most recent one. Returns True if queued."""
+        if url == self._last_url:
+            return False
+        self._last_url = url
+        ts = time.time() if timestamp is None else timestamp
+        self._writer.enqueue((url, title or url, ts))
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write queued visits now, blocking until they are (window close)."""
+        if not self._writer.is_alive():
+            return False
+        return self._writer.flush(timeout)
+
+    def compact(self) -> None:
+        """Ask the writer thread for a retention/compaction pass now."""
+        self._writer.request_compact()
+
+    def flush_stats(self) -> dict:
+        """Writer-thread flush latency, to check the UI thread stays off the disk."""
+        s = dict(self._writer.stats)
+        s["avg_ms"] = s["total_ms"] / s["flushes"] if s["flushes"] else 0.0
+        s["pending"] = self._writer.pending()
+        return s
+
+    # --- Reads ---------------------------------------------------------------
+    # Reads never wait for the writer: they see what is committed, and the
+    # visit lists add the queued visits in front from memory. search() and
+    # url_stats() may lag the last HISTORY_FLUSH_INTERVAL seconds.
+    def _queued_entries(self) -> List[dict]:
+        return [{"id": None, "title": title, "url": url, "timestamp": ts}
+                for url, title, ts in reversed(self._writer.queued())]
+
+    def recent(self, limit: Optional[int] = None) -> List[dict]:
+        """Visits newest first, as {"id", "title", "url", "timestamp"} dicts."""
+        entries = self._queued_entries()
+        sql = "SELECT id, title, url, timestamp FROM visits ORDER BY id DESC"
+        params = ()
+        if limit is not None:
+            entries = entries[:int(limit)]
+            sql += " LIMIT ?"
+            params = (int(limit) - len(entries),)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return entries + [{"id": r[0], "title": r[1], "url": r[2], "timestamp": r[3]} for r in rows]
+
+    def page(self, before: Optional[str] = None, limit: int = 100) -> Tuple[List[dict], Optional[str]]:
+        """One page of history, newest first, after the ``before`` cursor.
+
+        Raw visits come first. Past the oldest of them, paging continues
+        through the daily_visits rollups compact() left of older visits: one
+        entry per URL and day, with "day": True and the count in "visits".
+        Keyset pagination throughout, so every page costs one index seek
+        however deep into history it is. Returns (entries, next_cursor),
+        next_cursor being None on the last page. Cursors are opaque: a visit
+        id, or "d<day>:<url_id>" once in the rollups. The first page also
+        leads with the visits still queued for the writer.
+        """
+        entries: List[dict] = []
+        queued = self._queued_entries() if before is None else []
+        rollup_from = None
+        if before is not None and str(before).startswith("d"):
+            day, url_id = str(before)[1:].split(":")
+            rollup_from = (int(day), int(url_id))
+        else:
+            sql = "SELECT id, title, url, timestamp FROM visits"
+            params = []
+            if before is not None:
+                sql += " WHERE id < ?"
+                params.append(int(before))
+            sql += " ORDER BY id DESC LIMIT ?"
+            params.append(int(limit))
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            entries = [{"id": r[0], "title": r[1], "url": r[2], "timestamp": r[3]} for r in rows]
+            if len(rows) == limit:
+                return queued + entries, str(rows[-1][0])
+
+        sql = """SELECT d.day, d.url_id, u.title, u.url, d.count
+                 FROM daily_visits d JOIN urls u ON u.id = d.url_id"""
+        params = []
+        if rollup_from is not None:
+            sql += " WHERE (d.day, d.url_id) < (?, ?)"
+            params.extend(rollup_from)
+        sql += " ORDER BY d.day DESC, d.url_id DESC LIMIT ?"
+        remaining = limit - len(entries)
+        params.append(remaining)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        entries += [{"id": None, "title": r[2], "url": r[3], "timestamp": r[0] * _DAY,
+                     "day": True, "visits": r[4]} for r in rows]
+        next_cursor = f"d{rows[-1][0]}:{rows[-1][1]}" if rows and len(rows) == remaining else None
+        return queued + entries, next_cursor
+
+    def search(self, query: str, limit: int = 50) -> List[dict]:
+        """Ranked full-text search over titles and URLs, one result per URL.
+
+        The _SEARCH_CANDIDATES most recently visited matching URLs are
+        ordered by bm25 relevance, boosted for URLs visited often and
+        recently. Without the trigram index (old SQLite), or for terms
+        shorter than 3 characters, recently visited URLs are matched with
+        LIKE instead. Each dict carries "title", "url", "timestamp" (last
+        visit) and "visits".
+        """
+        terms = [t for t in query.split() if t]
+        long_terms = [t for t in terms if len(t) >= 3]
+        if not terms:
+            return []
+        if long_terms and self.fts:
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+            # Candidates by last visit, not FTS rowid: a rowid is the URL's
+            # first insert, so old but still visited URLs would drop out
+            sql = """
+                SELECT u.url, u.title, u.last_visit, urls_fts.rank, u.visit_count
+                FROM urls_fts JOIN urls u ON u.id = urls_fts.rowid
+                WHERE urls_fts MATCH ?
+                ORDER BY u.last_visit DESC LIMIT ?
+            """
+            params = (match, _SEARCH_CANDIDATES)
+        else:
+            # Trigrams need 3+ characters; short queries (and SQLite without
+            # trigrams) fall back to a scan of the most recently visited URLs
+            likes = ["%" + _like_escape(t) + "%" for t in (long_terms or terms)]
+            sql = """
+                SELECT url, title, last_visit, -1.0, visit_count
+                FROM (SELECT * FROM urls ORDER BY last_visit DESC LIMIT ?)
+                WHERE """ + " AND ".join(
+                    ["(title LIKE ? ESCAPE '\\' OR url LIKE ? ESCAPE '\\')"] * len(likes))
+            params = (_SEARCH_CANDIDATES * 20, *[x for like in likes for x in (like, like)])
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                print("[history] search failed:", e)
+                return []
+        now = time.time()
+
+        def score(r):
+            age_days = max(0.0, now - r[2]) / 86400.0
+            # bm25 is negative: larger magnitude is a better match
+            return -r[3] * (1.0 + 0.25 * math.log1p(r[4])) / (1.0 + age_days / 30.0)
+
+        rows.sort(key=score, reverse=True)
+        return [{"title": r[1], "url": r[0], "timestamp": r[2], "visits": r[4]}
+                for r in rows[:limit]]
+
+    def url_stats(self) -> List[tuple]:
+        """(url, latest title, visit count, last visit) for every distinct URL."""
+        sql = "SELECT url, title, visit_count, last_visit FROM urls"
+        with self._lock:
+            return self._conn.execute(sql).fetchall()
+
+    def count(self) -> int:
+        with self._lock:
+            committed = self._conn.execute("SELECT COUNT(*) FROM visits").fetchone()[0]
+        return committed + self._writer.pending()
+
+    def close(self) -> None:
+        self._writer.stop()
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        if type(self)._shared is self:
+            type(self)._shared = None
@@ -0,0 +1,66 @@
+from typing import Callable, Dict, List
+
+import ipc
+from qtcompat import QLocalServer, QObject, QTimer
+
+
+class InstanceServer(QObject):
+    """Receives argument lists from later launches (see ipc.forward).
+
+    Each launch sends one JSON line; it is acknowledged before ``handler``
+    runs, so the launching process can exit right away.
+    """
+
+    def __init__(self, handler: Callable[[List[str]], None], parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self._buffers: Dict[object, bytes] = {}
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_connection)
+
+    def listen(self) -> bool:
+        name = ipc.server_name()
+        if self.server.listen(name):
+            return True
+        # Only unlink a socket nobody answers on (left behind by a crash);
+        # one that is live belongs to an instance that started meanwhile
+        if not ipc.is_stale():
+            print("[ipc] another instance is listening; not taking over", name)
+            return False
+        QLocalServer.removeServer(name)
+        if self.server.listen(name):
+            return True
+        print("[ipc] could not listen:", self.server.errorString())
+        return False
+
+    def close(self) -> None:
+        self.server.close()
+
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            conn = self.server.nextPendingConnection()
+            self._buffers[conn] = b""
+            conn.readyRead.connect(lambda c=conn: self._on_ready_read(c))
+            conn.disconnected.connect(lambda c=conn: self._drop(c))
+
+    def _on_ready_read(self, conn):
+        data = self._buffers.get(conn, b"") + bytes(conn.readAll())
+        if b"\n" not in data:
+            self._buffers[conn] = data
+            return
+        line = data.split(b"\n", 1)[0]
+        try:
+            args = ipc.decode(line)
+        except Exception as e:
+            print("[ipc] bad message:", e)
+            conn.disconnectFromServer()
+            return
+        conn.write(b"ok\n")
+        conn.flush()
+        conn.disconnectFromServer()
+        QTimer.singleShot(0, lambda: self.handler(args))
+
+    def _drop(self, conn):
+        self._buffers.pop(conn, None)
+        conn.deleteLater()
@@ -0,0 +1,112 @@
+"""Client side of single-instance mode.
+
+Kept free of Qt imports: a launch that finds a running instance only pays
+for the Python interpreter, a socket connect and one short message.
+instance_server.InstanceServer is the other end.
+"""
+import json
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import List
+
+from constants import IPC_TIMEOUT
+
+
+def server_name() -> str:
+    """Socket path (or pipe name on Windows) shared by all launches of one user."""
+    if not hasattr(socket, "AF_UNIX"):
+        return f"tbrowser-{os.environ.get('USERNAME', 'user')}"
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime, f"tbrowser-{os.getuid()}.sock")
+
+
+def normalize_args(args: List[str], cwd: str = None) -> List[str]:
+    """Existing local files become file:// URLs; the instance has another cwd."""
+    cwd = cwd or os.getcwd()
+    out = []
+    for arg in args:
+        # "/nt:..." is a palette command unless such a file really exists
+        if not arg.startswith("/") or os.path.exists(arg):
+            path = Path(cwd, arg)
+            if path.exists():
+                arg = path.resolve().as_uri()
+        out.append(arg)
+    return out
+
+
+def encode(args: List[str]) -> bytes:
+    return json.dumps({"args": args}).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> List[str]:
+    args = json.loads(line.decode("utf-8")).get("args", [])
+    return [a for a in args if isinstance(a, str)]
+
+
+def forward(args: List[str]) -> bool:
+    """Hand ``args`` to a running instance. False only if there is none.
+
+    An instance that takes the connection but doesn't answer within
+    IPC_TIMEOUT is busy, not gone: it may already have the message, and
+    starting another one would open everything twice.
+    """
+    message = encode(args)
+    if not hasattr(socket, "AF_UNIX"):
+        return _forward_qt(message)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(IPC_TIMEOUT)
+        try:
+            sock.connect(server_name())
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False  # no socket, or one left behind by a crashed instance
+        except OSError as e:
+            print("[ipc] running instance not reachable:", e)
+            return True
+        try:
+            sock.sendall(message)
+            if not sock.recv(16).startswith(b"ok"):
+                print("[ipc] the running instance did not accept the arguments")
+        except OSError as e:
+            print("[ipc] no answer from the running instance:", e)
+        return True
+
+
+def is_stale() -> bool:
+    """True if the socket exists but nothing listens on it any more."""
+    if not hasattr(socket, "AF_UNIX"):
+        return False  # a named pipe goes away with its server
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(IPC_TIMEOUT)
+        try:
+            sock.connect(server_name())
+        except ConnectionRefusedError:
+            return True
+        except OSError:
+            return False  # gone already, or someone is there
+        return False
+
+
+def _forward_qt(message: bytes) -> bool:
+    # Windows: QLocalServer listens on a named pipe. QtNetwork alone still
+    # loads far faster than QtWebEngine, so import it only here.
+    try:
+        from PyQt6.QtNetwork import QLocalSocket
+    except Exception:
+        from PyQt5.QtNetwork import QLocalSocket
+    errors = getattr(QLocalSocket, "LocalSocketError", QLocalSocket)
+    sock = QLocalSocket()
+    sock.connectToServer(server_name())
+    timeout_ms = int(IPC_TIMEOUT * 1000)
+    if not sock.waitForConnected(timeout_ms):
+        if sock.error() in (errors.ServerNotFoundError, errors.ConnectionRefusedError):
+            return False
+        print("[ipc] running instance not reachable:", sock.errorString())
+        return True
+    sock.write(message)
+    sock.waitForBytesWritten(timeout_ms)
+    if not (sock.waitForReadyRead(timeout_ms) and bytes(sock.readAll()).startswith(b"ok")):
+        print("[ipc] no answer from the running instance:", sock.errorString())
+    sock.disconnectFromServer()
+    return True
@@ -0,0 +1,182 @@
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+from constants import KEYMAP_JSON
+from qtcompat import Qt, QApplication, QEvent, QKeySequence, QObject, QShortcut, USING_QT6
+
+
+# Action name -> what it does to a MainWindow
+ACTIONS: Dict[str, Callable[[object], None]] = {
+    "reload": lambda w: w.reload_page(),
+    "back": lambda w: w.go_back(),
+    "forward": lambda w: w.go_forward(),
+    "palette": lambda w: w.palette.toggle(),
+    "close_tab": lambda w: w.close_current_tab(),
+    "new_tab": lambda w: w.onew_tab(),
+    "new_private_tab": lambda w: w.onew_ptab(),
+    "next_tab": lambda w: w.next_tab(),
+    "prev_tab": lambda w: w.prev_tab(),
+    "history": lambda w: w.open_history_tab(),
+    "help": lambda w: w.open_help_tab(),
+    "screenshot": lambda w: w.capture_screenshot(),
+}
+
+# Actions that must win over the focused web view, so they are claimed in
+# the app-wide event filter. Everything else is a plain QShortcut, which
+# leaves keys to text fields that want them (e.g. "/" while typing).
+GLOBAL_ACTIONS = frozenset({"next_tab", "prev_tab", "history"})
+
+DEFAULT_KEYMAP: Dict[str, str] = {
+    "Ctrl+R": "reload",
+    "Meta+R": "reload",          # macOS
+    "Ctrl+Left": "back",
+    "Meta+Left": "back",
+    "Ctrl+Right": "forward",
+    "Meta+Right": "forward",
+    "/": "palette",
+    "Ctrl+W": "close_tab",
+    "Meta+W": "close_tab",
+    "Ctrl+T": "new_tab",
+    "Meta+T": "new_tab",
+    "Ctrl+Shift+P": "new_private_tab",
+    "Meta+Shift+P": "new_private_tab",
+    "Ctrl+Tab": "next_tab",
+    "Ctrl+Shift+Tab": "prev_tab",
+    "Ctrl+PgDown": "next_tab",
+    "Ctrl+PgUp": "prev_tab",
+    "Ctrl+H": "history",
+    "Meta+Shift+H": "history",   # Cmd+H is "Hide" on macOS
+}
+
+if USING_QT6:
+    _PORTABLE = QKeySequence.SequenceFormat.PortableText
+    _KEY_PRESS = QEvent.Type.KeyPress
+    _SHORTCUT_OVERRIDE = QEvent.Type.ShortcutOverride
+    _KEY_TAB, _KEY_BACKTAB = Qt.Key.Key_Tab.value, Qt.Key.Key_Backtab.value
+    _SHIFT = Qt.KeyboardModifier.ShiftModifier.value
+    # Modifiers that are part of a chord (not e.g. KeypadModifier)
+    _CHORD_MODS = (Qt.KeyboardModifier.ShiftModifier | Qt.KeyboardModifier.ControlModifier
+                   | Qt.KeyboardModifier.AltModifier | Qt.KeyboardModifier.MetaModifier).value
+else:
+    _PORTABLE = QKeySequence.PortableText
+    _KEY_PRESS = QEvent.KeyPress
+    _SHORTCUT_OVERRIDE = QEvent.ShortcutOverride
+    _KEY_TAB, _KEY_BACKTAB = int(Qt.Key_Tab), int(Qt.Key_Backtab)
+    _SHIFT = int(Qt.ShiftModifier)
+    _CHORD_MODS = int(Qt.ShiftModifier | Qt.ControlModifier | Qt.AltModifier | Qt.MetaModifier)
+
+
+def _mods_int(mods) -> int:
+    return (mods.value if USING_QT6 else int(mods)) & _CHORD_MODS
+
+
+def _chord_key(key: int, mods: int) -> Tuple[int, int]:
+    # Shift+Tab arrives as Backtab (still with Shift held)
+    if key == _KEY_BACKTAB:
+        return _KEY_TAB, mods | _SHIFT
+    return key, mods
+
+
+def normalize_chord(chord: str) -> str:
+    """"ctrl+r" -> "Ctrl+R", so differently written chords compare equal."""
+    text = QKeySequence(chord).toString(_PORTABLE)
+    return text or chord
+
+
+def compile_chord(chord: str) -> Optional[Tuple[int, int]]:
+    """"Ctrl+Shift+Tab" -> (key, modifiers) as plain ints, or None if invalid."""
+    seq = QKeySequence(chord)
+    if seq.isEmpty() or seq.count() != 1:
+        return None
+    combo = seq[0]
+    if USING_QT6:
+        key, mods = combo.key().value, combo.keyboardModifiers().value
+    else:
+        key, mods = combo & 0x01FFFFFF, combo & _CHORD_MODS
+    return _chord_key(key, mods & _CHORD_MODS)
+
+
+def load_keymap(path=KEYMAP_JSON) -> Dict[str, str]:
+    """DEFAULT_KEYMAP with the user's keymap.json on top.
+
+    The file maps chords to action names; an empty name unbinds a default.
+    Chords are normalized, so "ctrl+r" unbinds the default "Ctrl+R".
+    """
+    keymap = {normalize_chord(chord): action for chord, action in DEFAULT_KEYMAP.items()}
+    try:
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                for chord, action in data.items():
+                    chord = normalize_chord(chord)
+                    if not action:
+                        keymap.pop(chord, None)
+                    elif action in ACTIONS:
+                        keymap[chord] = action
+                    else:
+                        print("[keymap] unknown action:", action)
+    except Exception as e:
+        print("[keymap] failed reading keymap.json:", e)
+    return keymap
+
+
+class KeymapDispatcher(QObject):
+    """The one app-wide key event filter.
+
+    Chords for GLOBAL_ACTIONS are compiled to a {(key, modifiers): action}
+    dict. Every other event type is turned away by a single comparison, so
+    mouse moves and paints cost one Python call and nothing more.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls, windows: list) -> "KeymapDispatcher":
+        if cls._shared is None:
+            cls._shared = cls(windows)
+            QApplication.instance().installEventFilter(cls._shared)
+        return cls._shared
+
+    def __init__(self, windows: list, keymap: Optional[Dict[str, str]] = None):
+        super().__init__()
+        self.windows = windows      # MainWindow.windows, shared by reference
+        self.keymap = keymap if keymap is not None else load_keymap()
+        self.global_chords: Dict[Tuple[int, int], Callable] = {}
+        self.local_chords: List[Tuple[str, Callable]] = []
+        for chord, name in self.keymap.items():
+            if name in GLOBAL_ACTIONS:
+                compiled = compile_chord(chord)
+                if compiled is None:
+                    print("[keymap] invalid chord:", chord)
+                    continue
+                self.global_chords[compiled] = ACTIONS[name]
+            else:
+                self.local_chords.append((chord, ACTIONS[name]))
+
+    def install_shortcuts(self, window) -> None:
+        """Bind the non-global chords to ``window`` as QShortcuts."""
+        window._shortcuts = [
+            QShortcut(QKeySequence(chord), window, activated=lambda a=action, w=window: a(w))
+            for chord, action in self.local_chords
+        ]
+
+    def eventFilter(self, obj, event):
+        t = event.type()
+        if t != _KEY_PRESS and t != _SHORTCUT_OVERRIDE:
+            return False
+        action = self.global_chords.get(_chord_key(event.key(), _mods_int(event.modifiers())))
+        if action is None:
+            return False
+        window = QApplication.activeWindow()
+        if window not in self.windows:
+            return False
+        if t == _SHORTCUT_OVERRIDE:
+            # Claim the key before QWebEngineView or a QShortcut does; the
+            # KeyPress that follows runs the action (once)
+            event.accept()
+            return True
+        try:
+            action(window)
+        except Exception as e:
+            print("[keymap] action failed:", e)
+        return True
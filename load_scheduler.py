@@ -0,0 +1,93 @@
+import itertools
+import time
+from typing import Dict
+
+from constants import LOAD_SLOT_TIMEOUT_MS, MAX_CONCURRENT_LOADS
+from qtcompat import QObject, QTimer
+
+
+class LoadScheduler(QObject):
+    """Starts tab loads a few at a time, the tab being looked at first.
+
+    One instance for the whole process, like TabLifecycleManager. Tabs are
+    built with defer_load=True and handed to request(). A tab in the
+    foreground of its window starts at once; any other waits for one of
+    ``max_concurrent`` slots. A slot frees when the tab's first load
+    finishes, or after ``slot_timeout_ms`` so one hanging page can't stall
+    the queue. Waiting tabs go most recently activated first, then in the
+    order they were requested; activating a waiting tab starts it.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "LoadScheduler":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_LOADS,
+                 slot_timeout_ms: int = LOAD_SLOT_TIMEOUT_MS):
+        super().__init__()
+        self.max_concurrent = max(1, max_concurrent)
+        self.slot_timeout_ms = slot_timeout_ms
+        self._waiting: Dict[object, int] = {}     # tab -> request order
+        self._loading: Dict[object, float] = {}   # tab -> start time
+        self._activated: Dict[object, float] = {}
+        self._order = itertools.count()
+
+    # --- Tabs ----------------------------------------------------------------
+    def request(self, tab) -> None:
+        """Load ``tab`` now if it's in the foreground, else when a slot frees."""
+        if not tab.is_load_pending() or tab in self._loading:
+            return
+        if self._is_foreground(tab):
+            self._start(tab)
+        else:
+            self._waiting.setdefault(tab, next(self._order))
+            self._pump()
+
+    def activated(self, tab) -> None:
+        """Tab was brought to the front: start it if it's still waiting."""
+        self._activated[tab] = time.monotonic()
+        if self._waiting.pop(tab, None) is not None:
+            self._start(tab)
+
+    def forget(self, tab) -> None:
+        self._waiting.pop(tab, None)
+        self._activated.pop(tab, None)
+        if self._loading.pop(tab, None) is not None:
+            self._pump()
+
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def loading(self) -> int:
+        return len(self._loading)
+
+    # --- Slots ---------------------------------------------------------------
+    @staticmethod
+    def _is_foreground(tab) -> bool:
+        try:
+            return tab.isVisibleTo(tab.window())
+        except Exception:
+            return False
+
+    def _priority(self, tab):
+        return (not self._is_foreground(tab), -self._activated.get(tab, 0.0), self._waiting[tab])
+
+    def _pump(self) -> None:
+        while self._waiting and len(self._loading) < self.max_concurrent:
+            tab = min(self._waiting, key=self._priority)
+            del self._waiting[tab]
+            self._start(tab)
+
+    def _start(self, tab) -> None:
+        self._loading[tab] = time.monotonic()
+        tab.view.loadFinished.connect(lambda _ok, t=tab: self._release(t))
+        QTimer.singleShot(self.slot_timeout_ms, lambda t=tab: self._release(t))
+        tab.start_load()
+
+    def _release(self, tab) -> None:
+        if self._loading.pop(tab, None) is not None:
+            self._pump()
@@ -0,0 +1,407 @@
+import re
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from BrowserTab import BrowserTab
+from constants import (
+    CAPTURE_LOAD_TIMEOUT_MS, CAPTURE_SETTLE_MS, CAPTURES_IN_FLIGHT, FULL_PAGE_MAX_HEIGHT,
+    SCREENSHOT_DIR
+)
+from qtcompat import (
+    Qt, QFileDialog, QImage, QMessageBox, QObject, QTimer, QVBoxLayout, QWebEnginePage,
+    QWebEngineProfile, QWebEngineView, QWidget, USING_QT6
+)
+from request_interceptor import attach_interceptor
+from screenshots import FORMATS, CaptureOptions, ScreenshotSaver, parse_capture_options, writable
+
+
+_DONT_SHOW = Qt.WidgetAttribute.WA_DontShowOnScreen if USING_QT6 else Qt.WA_DontShowOnScreen
+
+# [page height, viewport height, scroll x, scroll y] in CSS pixels
+_MEASURE_JS = (
+    "[Math.max(document.documentElement.scrollHeight,"
+    " document.body ? document.body.scrollHeight : 0),"
+    " window.innerHeight, window.scrollX, window.scrollY]"
+)
+
+
+def grab_viewport(view) -> QImage:
+    """The visible part of ``view`` as a QImage (UI thread)."""
+    return view.grab().toImage()
+
+
+class FullPageCapture(QObject):
+    """Scrolls a view down its page and streams the tiles into one PNG.
+
+    Each tile is grabbed CAPTURE_SETTLE_MS after scrolling, so the page has
+    repainted, and goes to ScreenshotSaver.stream(). While the encoder has
+    CAPTURE_TILES_IN_FLIGHT tiles waiting, the next grab waits too, so
+    memory stays at a few tiles however tall the page is. Pages are cut at
+    FULL_PAGE_MAX_HEIGHT; position: fixed headers repeat in every tile.
+    """
+
+    def __init__(self, view, path: str, on_done: Callable[[Dict], None],
+                 on_grabbed: Optional[Callable[[], None]] = None):
+        super().__init__(view)
+        self.view = view
+        self.path = path
+        self.on_done = on_done
+        self.on_grabbed = on_grabbed
+        self._tiles = None
+        self._scale = 1.0
+        self._width = self._height = self._written = 0
+        self._last_y = -1.0
+        self._grab_s = 0.0
+        self._count = 0
+        self._error = ""
+
+    def start(self) -> None:
+        self.view.page().runJavaScript(_MEASURE_JS, 0, self._on_measured)
+
+    def _on_measured(self, result) -> None:
+        try:
+            page_h, self._vh, self._restore_x, self._restore_y = (float(v) for v in result)
+        except Exception:
+            self._fail("could not measure the page")
+            return
+        self._page_h = min(page_h, float(FULL_PAGE_MAX_HEIGHT))
+        self._scroll_to(0)
+
+    def _scroll_to(self, y: float) -> None:
+        self.view.page().runJavaScript(f"window.scrollTo(0, {int(y)}); window.scrollY",
+                                       0, self._on_scrolled)
+
+    def _on_scrolled(self, y) -> None:
+        if y is None:  # the script failed; window.scrollY is always a number
+            self._fail("could not scroll the page")
+            return
+        QTimer.singleShot(CAPTURE_SETTLE_MS, lambda y=float(y): self._grab(y))
+
+    def _grab(self, y: float) -> None:
+        if self._tiles is not None and self._tiles.full():
+            QTimer.singleShot(20, lambda: self._grab(y))  # encoder is behind
+            return
+        started = time.perf_counter()
+        image = grab_viewport(self.view)
+        self._grab_s += time.perf_counter() - started
+        if image.isNull():
+            self._fail("could not grab the page")
+            return
+        if self._tiles is None:
+            self._scale = image.height() / self._vh if self._vh else 1.0
+            self._width = image.width()
+            self._height = max(image.height(), round(self._page_h * self._scale))
+            self._tiles = ScreenshotSaver.shared().stream(
+                self.path, self._width, self._height, self._on_saved)
+        elif image.width() != self._width:
+            image = image.copy(0, 0, self._width, image.height())  # scrollbar came or went
+        # Rows already written from the previous tile (the last one overlaps)
+        first = max(0, self._written - round(y * self._scale))
+        if first < image.height():
+            self._tiles.put((image, first))
+            self._written += image.height() - first
+            self._count += 1
+        if self._written >= self._height or y + self._vh >= self._page_h or y <= self._last_y:
+            self._finish()
+        else:
+            self._last_y = y
+            self._scroll_to(y + self._vh)
+
+    def _finish(self) -> None:
+        if self._tiles.full():
+            QTimer.singleShot(20, self._finish)
+            return
+        self._tiles.put(None)
+        self._release()
+
+    def _release(self) -> None:
+        self.view.page().runJavaScript(
+            f"window.scrollTo({int(self._restore_x)}, {int(self._restore_y)})")
+        if self.on_grabbed is not None:
+            self.on_grabbed()
+
+    def _fail(self, error: str) -> None:
+        if self._tiles is not None:
+            # Close the PNG (the rest of it stays black) but don't call it a success
+            self._error = error
+            self._finish()
+            return
+        if self.on_grabbed is not None:
+            self.on_grabbed()
+        self.on_done({"path": self.path, "ok": False, "error": error,
+                      "capture_ms": self._grab_s * 1000.0, "encode_ms": 0.0})
+        self.deleteLater()
+
+    def _on_saved(self, result: Dict) -> None:
+        result["capture_ms"] = self._grab_s * 1000.0
+        result["tiles"] = self._count
+        if self._error and result["ok"]:
+            result.update(ok=False, partial=True,
+                          error=f"{self._error} ({self._written} of {self._height} rows saved)")
+        self.on_done(result)
+        self.deleteLater()
+
+
+class CaptureHost(QWidget):
+    """Somewhere off screen to paint tabs that aren't in front.
+
+    Chromium only paints visible pages. WA_DontShowOnScreen makes this
+    widget count as shown without a window appearing, so a background tab's
+    page is moved into its view for the capture and handed back after. Tabs
+    without a live page load their URL into a scratch page instead.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(_DONT_SHOW)
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        self.view = QWebEngineView(self)
+        lay.addWidget(self.view)
+        self._scratch = None
+
+    def scratch_page(self) -> QWebEnginePage:
+        if self._scratch is None:
+            self._scratch = QWebEnginePage(QWebEngineProfile.defaultProfile(), self)
+            self._scratch.setAudioMuted(True)
+            attach_interceptor(self._scratch)
+        return self._scratch
+
+    def attach(self, page, size) -> None:
+        self.resize(size)
+        self.view.setPage(page)
+        self.show()
+
+
+class CaptureQueue(QObject):
+    """/capture:all: every tab of every window, one grab at a time.
+
+    Grabbing has to happen on the UI thread, so tabs are taken one per
+    timer tick and input and paints get a turn between them. Once
+    CAPTURES_IN_FLIGHT grabs are waiting on the encoder the queue pauses
+    until one is written, which bounds memory for any number of tabs.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "CaptureQueue":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self):
+        super().__init__()
+        self._jobs = deque()
+        self._active = False
+        self._in_flight = 0
+        self._host: Optional[CaptureHost] = None
+        self._restore: Optional[Callable[[], None]] = None
+        self._job_id = 0
+        self._window = None
+        self._opts = CaptureOptions()
+        self._counts = {"saved": 0, "failed": 0, "skipped": 0}
+        self._total = 0
+        self._started = 0.0
+        self._folder = ""
+
+    def busy(self) -> bool:
+        return self._active or bool(self._jobs) or self._in_flight > 0
+
+    def capture_all(self, window, windows, opts: CaptureOptions) -> None:
+        if self.busy():
+            window.statusBar().showMessage("A capture of all tabs is already running", 5000)
+            return
+        self._window, self._opts = window, opts
+        self._counts = {"saved": 0, "failed": 0, "skipped": 0}
+        self._folder = str(SCREENSHOT_DIR / time.strftime("tbrowser_all_%Y%m%d_%H%M%S"))
+        ext = "png" if opts.full else FORMATS[opts.fmt][1]
+        for wi, win in enumerate(windows, 1):
+            for ti in range(win.stack.count()):
+                tab = win.stack.widget(ti)
+                host = re.sub(r"[^A-Za-z0-9.-]+", "_", tab.url().host() or tab.url().scheme())
+                self._jobs.append((win, tab, f"{self._folder}/w{wi}_t{ti + 1:02d}_{host}.{ext}"))
+        self._total = len(self._jobs)
+        self._started = time.perf_counter()
+        QTimer.singleShot(0, self._next)
+
+    # --- One tab at a time ----------------------------------------------------
+    def _next(self) -> None:
+        if self._active or self._in_flight >= CAPTURES_IN_FLIGHT:
+            return
+        if not self._jobs:
+            if self._in_flight == 0 and self._total:
+                self._report_done()
+            return
+        win, tab, path = self._jobs.popleft()
+        try:
+            if win.stack.indexOf(tab) == -1:
+                raise RuntimeError("tab closed")
+        except RuntimeError:
+            self._counts["skipped"] += 1
+            QTimer.singleShot(0, self._next)
+            return
+        live = isinstance(tab, BrowserTab) and not tab.is_load_pending() and not tab.is_discarded()
+        if tab.is_private() and not live:
+            # Loading it again would need its (per-window) private profile
+            self._counts["skipped"] += 1
+            QTimer.singleShot(0, self._next)
+            return
+        self._active = True
+        self._job_id += 1
+        job = self._job_id
+        if live and tab.isVisible():
+            self._grab(tab.view, path)
+        elif live:
+            self._attach_live(win, tab)
+            QTimer.singleShot(CAPTURE_SETTLE_MS, lambda: self._grab(self._host.view, path))
+        else:
+            self._load_scratch(win, tab.url(), job, path)
+
+    def _host_widget(self) -> CaptureHost:
+        if self._host is None:
+            self._host = CaptureHost()
+        return self._host
+
+    def _attach_live(self, win, tab) -> None:
+        page = tab.view.page()
+        State = QWebEnginePage.LifecycleState
+        was = page.lifecycleState()
+        if was != State.Active:
+            page.setLifecycleState(State.Active)  # frozen pages don't paint
+        self._host_widget().attach(page, win.stack.size())
+
+        def restore():
+            tab.view.setPage(page)
+            if was == State.Frozen:
+                page.setLifecycleState(State.Frozen)
+        self._restore = restore
+
+    def _load_scratch(self, win, url, job: int, path: str) -> None:
+        host = self._host_widget()
+        page = host.scratch_page()
+        host.attach(page, win.stack.size())
+
+        fired = []
+
+        def loaded(_ok=True):
+            # loadFinished or the timeout, whichever comes first, for this job only
+            if fired or job != self._job_id:
+                return
+            fired.append(True)
+            QTimer.singleShot(CAPTURE_SETTLE_MS, lambda: self._grab(host.view, path))
+        self._restore = lambda: page.loadFinished.disconnect(loaded)
+        page.loadFinished.connect(loaded)
+        QTimer.singleShot(CAPTURE_LOAD_TIMEOUT_MS, loaded)  # grab whatever loaded
+        page.setUrl(url)
+
+    def _grab(self, view, path: str) -> None:
+        self._in_flight += 1
+        if self._opts.full:
+            FullPageCapture(view, path, self._on_saved, on_grabbed=self._release).start()
+            return
+        image = grab_viewport(view)
+        if image.isNull():
+            self._on_saved({"path": path, "ok": False, "error": "could not grab the page"})
+        else:
+            ScreenshotSaver.shared().submit(image, path, self._opts, self._on_saved)
+        self._release()
+
+    def _release(self) -> None:
+        if self._restore is not None:
+            try:
+                self._restore()
+            except (RuntimeError, TypeError) as e:
+                print("[capture] could not hand the page back:", e)
+            self._restore = None
+        if self._host is not None:
+            self._host.hide()
+        self._active = False
+        QTimer.singleShot(0, self._next)
+
+    def _on_saved(self, result: Dict) -> None:
+        self._in_flight -= 1
+        self._counts["saved" if result["ok"] else "failed"] += 1
+        if not result["ok"]:
+            print("[capture] failed:", result["path"], result.get("error"))
+        done = self._counts["saved"] + self._counts["failed"] + self._counts["skipped"]
+        self._status(f"Capturing tabs: {done}/{self._total}…")
+        QTimer.singleShot(0, self._next)
+
+    def _report_done(self) -> None:
+        elapsed = time.perf_counter() - self._started
+        c = self._counts
+        extra = ", ".join(f"{n} {k}" for k, n in (("failed", c["failed"]), ("skipped", c["skipped"])) if n)
+        self._status(f"Saved {c['saved']} captures to {self._folder} in {elapsed:.1f} s"
+                     + (f" ({extra})" if extra else ""), 15000)
+        self._total = 0
+
+    def _status(self, text: str, timeout: int = 0) -> None:
+        try:
+            self._window.statusBar().showMessage(text, timeout)
+        except (AttributeError, RuntimeError):
+            pass  # the window that asked is gone
+
+
+# --- /capture ----------------------------------------------------------------
+def capture_current_tab(window, arg: str = "") -> None:
+    """/capture[:options]: grab now, encode and save in the background."""
+    try:
+        opts = parse_capture_options(arg)
+    except ValueError as e:
+        QMessageBox.warning(window, "Screenshot", str(e))
+        return
+    if opts.full and opts.fmt != "png":
+        window.statusBar().showMessage("Full-page captures are saved as PNG", 5000)
+    elif not writable(opts.fmt):
+        window.statusBar().showMessage(f"No {opts.fmt} writer in this Qt build, saving PNG", 5000)
+        opts.fmt = "png"
+    if opts.full:
+        opts.fmt = "png"
+    if opts.all:
+        CaptureQueue.shared().capture_all(window, type(window).windows, opts)
+        return
+    tab = window.current_tab()
+    if not tab:
+        return
+
+    saver = ScreenshotSaver.shared()
+    ext, file_filter = FORMATS[opts.fmt][1], FORMATS[opts.fmt][2]
+    if opts.full:
+        path = saver.default_path(ext)
+        if opts.ask:
+            path, _ = QFileDialog.getSaveFileName(window, "Save Full-Page Screenshot", path, file_filter)
+            if not path:
+                return
+        window.statusBar().showMessage("Capturing full page…")
+        FullPageCapture(tab.view, path, lambda r: _report(window, r)).start()
+        return
+
+    started = time.perf_counter()
+    image = grab_viewport(tab.view)
+    capture_ms = (time.perf_counter() - started) * 1000.0
+    if image.isNull():
+        QMessageBox.warning(window, "Screenshot", "Failed to capture screenshot.")
+        return
+
+    path = saver.default_path(ext)
+    if opts.ask:
+        # Grabbed first, so the capture is what was on screen at the command
+        path, _ = QFileDialog.getSaveFileName(window, "Save Screenshot", path, file_filter)
+        if not path:
+            return
+
+    window.statusBar().showMessage(f"Saving screenshot… (capture {capture_ms:.0f} ms)")
+    saver.submit(image, path, opts, lambda r: _report(window, r), capture_ms=capture_ms)
+
+
+def _report(window, result: Dict) -> None:
+    if result["ok"]:
+        tiles = f", {result['tiles']} tiles" if result.get("tiles") else ""
+        window.statusBar().showMessage(
+            f"Saved screenshot: {result['path']} "
+            f"(capture {result['capture_ms']:.0f} ms, encode {result['encode_ms']:.0f} ms{tiles})", 8000)
+    else:
+        window.statusBar().clearMessage()
+        QMessageBox.warning(window, "Screenshot", f"Failed to save screenshot: {result['error']}")
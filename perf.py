@@ -0,0 +1,232 @@
+"""Per-tab load metrics, the tbrowser://perf/ page and the /perf:hud overlay.
+
+Every BrowserTab owns a LoadMetrics. It times each navigation from
+loadStarted to loadFinished (plus, for the first load, the time the tab
+waited in the LoadScheduler queue), then reads the page's Navigation
+Timing entry with one runJavaScript call. snapshot() joins that with the
+renderer PID, renderer memory, lifecycle state and blocked-request count
+of every tab in every window.
+"""
+import json
+import time
+from typing import Dict, List, Optional
+
+from constants import PERF_HUD_INTERVAL_MS
+from qtcompat import QLabel, Qt, QTimer, QWebEnginePage, USING_QT6
+from utils import process_rss
+
+
+# Milestones in ms from navigation start (the entry's startTime is 0), read
+# once after loadFinished. loadEventEnd is still 0 while the load event
+# runs, which is when loadFinished can arrive; that becomes null.
+_NAV_TIMING_JS = """(function () {
+  var n = performance.getEntriesByType('navigation')[0];
+  if (!n) return null;
+  var fcp = performance.getEntriesByName('first-contentful-paint')[0];
+  var ms = function (v) { return v > 0 ? Math.round(v) : null; };
+  return JSON.stringify({
+    redirect: ms(n.redirectEnd - n.redirectStart),
+    dns: ms(n.domainLookupEnd - n.domainLookupStart),
+    connect: ms(n.connectEnd - n.connectStart),
+    ttfb: ms(n.responseStart),
+    response_end: ms(n.responseEnd),
+    dom_interactive: ms(n.domInteractive),
+    dom_content_loaded: ms(n.domContentLoadedEventEnd),
+    load_event: ms(n.loadEventEnd),
+    fcp: fcp ? ms(fcp.startTime) : null,
+    transfer_bytes: n.transferSize || 0,
+    resources: performance.getEntriesByType('resource').length
+  });
+})()"""
+
+_MB = 1024 * 1024
+_MOUSE_THROUGH = (Qt.WidgetAttribute.WA_TransparentForMouseEvents if USING_QT6
+                  else Qt.WA_TransparentForMouseEvents)
+
+
+class LoadMetrics:
+    """Timings of a tab's current (or last) navigation."""
+
+    __slots__ = ("created", "queue_ms", "started", "load_ms", "ok", "loads", "timing")
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.queue_ms: Optional[float] = None   # LoadScheduler wait, first load only
+        self.started: Optional[float] = None    # perf_counter at loadStarted
+        self.load_ms: Optional[float] = None    # loadStarted -> loadFinished
+        self.ok: Optional[bool] = None
+        self.loads = 0
+        self.timing: Optional[Dict] = None      # Navigation Timing, see _NAV_TIMING_JS
+
+    def load_started(self) -> None:
+        now = time.perf_counter()
+        if self.queue_ms is None:
+            self.queue_ms = (now - self.created) * 1000.0
+        self.started = now
+        self.load_ms = self.ok = self.timing = None
+
+    def load_finished(self, page: QWebEnginePage, ok: bool) -> None:
+        if self.started is None:
+            return
+        self.load_ms = (time.perf_counter() - self.started) * 1000.0
+        self.ok = ok
+        self.loads += 1
+        if ok:
+            started = self.started
+            page.runJavaScript(_NAV_TIMING_JS, 0,
+                               lambda result, s=started: self._on_timing(s, result))
+
+    def _on_timing(self, started: float, result) -> None:
+        if started != self.started or not result:
+            return  # a newer navigation began, or not an HTML document
+        try:
+            self.timing = json.loads(result)
+        except ValueError as e:
+            print("[perf] bad navigation timing:", e)
+
+    def loading(self) -> bool:
+        return self.started is not None and self.load_ms is None
+
+    def as_dict(self) -> Dict:
+        elapsed = None
+        if self.loading():
+            elapsed = (time.perf_counter() - self.started) * 1000.0
+        return {
+            "queue_ms": _round(self.queue_ms),
+            "load_ms": _round(self.load_ms),
+            "loading_ms": _round(elapsed),
+            "ok": self.ok,
+            "loads": self.loads,
+            "timing": self.timing,
+        }
+
+
+def _round(v: Optional[float]) -> Optional[float]:
+    return None if v is None else round(v, 1)
+
+
+def _state_name(tab) -> str:
+    if tab.is_load_pending():
+        return "queued"
+    try:
+        state = tab.lifecycle_state()
+    except Exception:
+        return "unknown"
+    name = getattr(state, "name", None)  # Qt 6 enums; PyQt5 has plain ints
+    return name.lower() if name else {0: "active", 1: "frozen", 2: "discarded"}.get(int(state), "?")
+
+
+def tab_report(tab, rss_by_pid: Dict[int, Optional[int]], sharing: Dict[int, int]) -> Dict:
+    pid = tab.renderer_pid()
+    rss = rss_by_pid.get(pid)
+    return dict(
+        tab.metrics.as_dict(),
+        title=tab.title(),
+        url=tab.url().toString(),
+        private=tab.is_private(),
+        state=_state_name(tab),
+        blocked=tab.blocked_requests(),
+        pid=pid,
+        renderer_mb=round(rss / _MB, 1) if rss is not None else None,
+        renderer_tabs=sharing.get(pid, 0),
+    )
+
+
+def snapshot(windows) -> Dict:
+    """Every BrowserTab of ``windows`` (MainWindow.windows), for /perf."""
+    from BrowserTab import BrowserTab  # BrowserTab imports this module
+
+    found = []
+    for w_index, window in enumerate(windows):
+        for t_index in range(window.stack.count()):
+            tab = window.stack.widget(t_index)
+            if isinstance(tab, BrowserTab):
+                found.append((w_index, t_index, tab, tab is window.current_tab()))
+
+    # Tabs can share a renderer; read each process once and say how many share it
+    sharing: Dict[int, int] = {}
+    for _w, _t, tab, _c in found:
+        pid = tab.renderer_pid()
+        if pid:
+            sharing[pid] = sharing.get(pid, 0) + 1
+    rss_by_pid = {pid: process_rss(pid) for pid in sharing}
+
+    tabs: List[Dict] = []
+    for w_index, t_index, tab, current in found:
+        entry = tab_report(tab, rss_by_pid, sharing)
+        entry.update(window=w_index, index=t_index, current=current)
+        tabs.append(entry)
+    known = [rss for rss in rss_by_pid.values() if rss is not None]
+    return {
+        "tabs": tabs,
+        "renderers": len(sharing),
+        "renderer_mb": round(sum(known) / _MB, 1) if known else None,
+    }
+
+
+class PerfHud(QLabel):
+    """Corner overlay with the current tab's metrics; /perf:hud toggles it."""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.main = window  # not self.window: that's QWidget.window()
+        self.setObjectName("PerfHud")
+        self.setStyleSheet("""
+            QLabel#PerfHud {
+                background: rgba(17, 17, 17, 220);
+                color: #cfe3ff;
+                border: 1px solid #333;
+                border-radius: 6px;
+                padding: 6px 8px;
+                font-family: monospace;
+                font-size: 11px;
+            }
+        """)
+        self.setAttribute(_MOUSE_THROUGH)
+        self._timer = QTimer(self)
+        self._timer.setInterval(PERF_HUD_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self) -> None:
+        if self.isVisible():
+            self._timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self._timer.start()
+
+    def refresh(self) -> None:
+        tab = self.main.current_tab()
+        if tab is None:
+            self.setText("no tab")
+        else:
+            pid = tab.renderer_pid()
+            self.setText(hud_text(tab_report(tab, {pid: process_rss(pid)}, {})))
+        self.adjustSize()
+        # Top right of the page area, clear of the bottom bar and palette
+        self.move(self.main.width() - self.width() - 12, 12)
+
+
+def hud_text(r: Dict) -> str:
+    def ms(v):
+        return "-" if v is None else f"{v:.0f} ms"
+
+    t = r["timing"] or {}
+    if r["loading_ms"] is not None:
+        load = f"loading {ms(r['loading_ms'])}"
+    else:
+        load = f"load {ms(r['load_ms'])}" + ("" if r["ok"] is not False else " (failed)")
+    lines = [
+        f"{load}   queued {ms(r['queue_ms'])}",
+        f"ttfb {ms(t.get('ttfb'))}   fcp {ms(t.get('fcp'))}",
+        f"dcl {ms(t.get('dom_content_loaded'))}   onload {ms(t.get('load_event'))}",
+        (f"{t['resources']} requests, {t['transfer_bytes'] // 1024} KB, " if t else "")
+        + f"{r['blocked']} blocked",
+        f"pid {r['pid'] or '-'}   "
+        + (f"renderer {r['renderer_mb']:.0f} MB" if r["renderer_mb"] is not None else "renderer -"),
+        f"state {r['state']}",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,71 @@
+"""A PNG writer that takes the image a band of rows at a time.
+
+Full-page captures can be tens of thousands of pixels tall; QImage.save
+needs the whole image in memory, this needs one tile. Rows are stored
+unfiltered (filter type 0): per-pixel filtering in Python would cost more
+than the size it saves.
+"""
+import os
+import struct
+import zlib
+
+_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class PngStreamWriter:
+    """8-bit RGB PNG of a fixed size, written to ``path`` + ".part" and
+    renamed into place by close()."""
+
+    def __init__(self, path: str, width: int, height: int, level: int = 6):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows = 0
+        self._tmp = f"{path}.part"
+        self._z = zlib.compressobj(level)
+        self._f = open(self._tmp, "wb")
+        self._f.write(_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self._f.write(struct.pack(">I", len(data)))
+        self._f.write(kind)
+        self._f.write(data)
+        self._f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+    def write_rows(self, data, stride: int, rows: int, first: int = 0) -> int:
+        """Append ``rows`` rows of packed RGB, starting at row ``first`` of
+        ``data`` (rows ``stride`` bytes apart). Rows past the image height
+        are dropped; returns how many were written."""
+        rows = max(0, min(rows, self.height - self.rows))
+        row_bytes = self.width * 3
+        view = memoryview(data)
+        band = bytearray()
+        for r in range(first, first + rows):
+            band.append(0)
+            band += view[r * stride:r * stride + row_bytes]
+        out = self._z.compress(bytes(band))
+        if out:
+            self._chunk(b"IDAT", out)
+        self.rows += rows
+        return rows
+
+    def close(self) -> None:
+        """Finish the file; rows never written are left black."""
+        blank = b"\0" * (self.width * 3 + 1)
+        while self.rows < self.height:
+            out = self._z.compress(blank)
+            if out:
+                self._chunk(b"IDAT", out)
+            self.rows += 1
+        self._chunk(b"IDAT", self._z.flush())
+        self._chunk(b"IEND", b"")
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._f.close()
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
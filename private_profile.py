@@ -0,0 +1,73 @@
+from qtcompat import QWebEngineProfile
+from request_interceptor import install_interceptor
+from scheme_handler import install_scheme_handler
+
+
+def _make_private_profile(parent) -> QWebEngineProfile:
+    # A profile constructed without a storage name is off-the-record in Qt6
+    profile = QWebEngineProfile(parent)
+    # Best-effort cross-version incognito:
+    try:
+        # Qt6 API
+        profile.setOffTheRecord(True)  # type: ignore[attr-defined]
+    except Exception:
+        # Qt5 fallback: no persistent storage/cookies/cache
+        try:
+            profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.NoPersistentCookies)  # type: ignore
+        except Exception:
+            pass
+        try:
+            profile.setPersistentStoragePath('')
+            profile.setCachePath('')
+        except Exception:
+            pass
+    # Private new-tab pages are tbrowser:// too, and blocking applies as well
+    install_scheme_handler(profile)
+    install_interceptor(profile)
+    return profile
+
+
+class PrivateProfilePool:
+    """One off-the-record profile per window, shared by its private tabs.
+
+    Creating a QWebEngineProfile means a new network context, cache and
+    storage partition, which dominated private-tab open time. Private tabs
+    of a window now share one profile (so they share cookies with each
+    other, like an incognito window); it is created by the first private tab
+    and torn down when the last one closes.
+    """
+
+    _pools = {}
+
+    @classmethod
+    def for_window(cls, window) -> "PrivateProfilePool":
+        pool = cls._pools.get(window)
+        if pool is None:
+            pool = cls._pools[window] = cls(window)
+        return pool
+
+    @classmethod
+    def drop_window(cls, window) -> None:
+        """Window is closing; its profile goes down with it as a child object."""
+        cls._pools.pop(window, None)
+
+    def __init__(self, window):
+        self.window = window
+        self.profile = None
+        self.users = 0
+
+    def acquire(self) -> QWebEngineProfile:
+        if self.profile is None:
+            self.profile = _make_private_profile(self.window)
+        self.users += 1
+        return self.profile
+
+    def release(self) -> None:
+        self.users -= 1
+        if self.users <= 0 and self.profile is not None:
+            # Queued after the closing tab's own deleteLater, so the last
+            # page is gone before its profile is
+            self.profile.deleteLater()
+            self.profile = None
+            self.users = 0
+            type(self)._pools.pop(self.window, None)
@@ -0,0 +1,47 @@
+"""The one guarded PyQt6 / PyQt5 import. Other modules take Qt names from here.
+
+Importing QtWebEngine is the biggest single cost of a cold start; doing it
+once, here, also makes it show up as one line in --profile-startup.
+"""
+try:
+    from PyQt6.QtCore import (
+        Qt, QBuffer, QByteArray, QEvent, QFile, QFileSystemWatcher, QIODevice, QObject, QPointF,
+        QSize, QTimer, QUrl, pyqtSignal
+    )
+    from PyQt6.QtGui import (
+        QAction, QIcon, QImage, QImageWriter, QKeySequence, QMouseEvent, QShortcut
+    )
+    from PyQt6.QtWidgets import (
+        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
+        QLineEdit, QListWidget, QListWidgetItem, QTabBar, QStackedWidget, QToolButton,
+        QFileDialog, QLabel, QStyle, QMessageBox, QSizePolicy
+    )
+    from PyQt6.QtNetwork import QLocalServer
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+    from PyQt6.QtWebEngineCore import (
+        QWebEnginePage, QWebEngineProfile,
+        QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor,
+        QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+    )
+    USING_QT6 = True
+except ImportError:
+    from PyQt5.QtCore import (  # type: ignore
+        Qt, QBuffer, QByteArray, QEvent, QFile, QFileSystemWatcher, QIODevice, QObject, QPointF,
+        QSize, QTimer, QUrl, pyqtSignal
+    )
+    from PyQt5.QtGui import (  # type: ignore
+        QIcon, QImage, QImageWriter, QKeySequence, QMouseEvent
+    )
+    from PyQt5.QtWidgets import (  # type: ignore
+        QAction, QShortcut,
+        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
+        QLineEdit, QListWidget, QListWidgetItem, QTabBar, QStackedWidget, QToolButton,
+        QFileDialog, QLabel, QStyle, QMessageBox, QSizePolicy
+    )
+    from PyQt5.QtNetwork import QLocalServer  # type: ignore
+    from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile  # type: ignore
+    from PyQt5.QtWebEngineCore import (  # type: ignore
+        QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor,
+        QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+    )
+    USING_QT6 = False
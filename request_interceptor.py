@@ -0,0 +1,167 @@
+import threading
+from typing import Dict, Optional
+
+from adblock import BlockMatcher, list_files, load_matcher
+from constants import ADBLOCK_CACHE, ADBLOCK_DIR, ADBLOCK_ENABLED
+from qtcompat import (
+    QUrl, QWebEnginePage, QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor, USING_QT6
+)
+
+
+# QtWebEngine resource types -> EasyList type options (enum scoping differs
+# between Qt5 and Qt6, and some members only exist in newer versions)
+_RT = getattr(QWebEngineUrlRequestInfo, "ResourceType", QWebEngineUrlRequestInfo)
+_TYPE_NAMES = {
+    getattr(_RT, qt_name): name
+    for qt_name, name in (
+        ("ResourceTypeMainFrame", "document"),
+        ("ResourceTypeSubFrame", "subdocument"),
+        ("ResourceTypeStylesheet", "stylesheet"),
+        ("ResourceTypeScript", "script"),
+        ("ResourceTypeImage", "image"),
+        ("ResourceTypeFontResource", "font"),
+        ("ResourceTypeObject", "object"),
+        ("ResourceTypeMedia", "media"),
+        ("ResourceTypeXhr", "xmlhttprequest"),
+        ("ResourceTypePing", "ping"),
+        ("ResourceTypeWebSocket", "websocket"),
+    )
+    if hasattr(_RT, qt_name)
+}
+_MAIN_FRAME = getattr(_RT, "ResourceTypeMainFrame")
+_BLOCKABLE_SCHEMES = ("http", "https", "ws", "wss")
+
+# Pages whose counters are kept; the oldest are dropped past this
+MAX_COUNTED_PAGES = 1000
+
+# Qt6 runs interceptors on the UI thread and lets each page have its own,
+# which is what ties a blocked request to its tab. Qt5 only has the
+# profile-wide one, called on the IO thread.
+PAGE_INTERCEPTORS = USING_QT6 and hasattr(QWebEnginePage, "setUrlRequestInterceptor")
+
+
+class ContentBlocker:
+    """The compiled blocklists and blocked-request counters, for every profile.
+
+    Lists are compiled (or read from the on-disk cache) on a worker thread;
+    until then nothing is blocked. With PAGE_INTERCEPTORS each tab counts
+    its own blocks (see PageInterceptor); otherwise the counters here are
+    keyed by the page (first party) URL, so tabs showing the same page
+    share one.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "ContentBlocker":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, list_dir=ADBLOCK_DIR, cache_path=ADBLOCK_CACHE):
+        self.list_dir = str(list_dir)
+        self.cache_path = str(cache_path)
+        self.matcher: Optional[BlockMatcher] = None
+        self._blocked: Dict[str, int] = {}
+        self._lock = threading.Lock()  # record_block runs on Qt5's IO thread
+        self._loading = False
+
+    def load_async(self) -> None:
+        if not ADBLOCK_ENABLED or self._loading or self.matcher is not None:
+            return
+        self._loading = True
+        threading.Thread(target=self._load, name="adblock", daemon=True).start()
+
+    def _load(self) -> None:
+        try:
+            self.matcher = load_matcher(list_files(self.list_dir), self.cache_path)
+        except Exception as e:
+            print("[adblock] failed loading blocklists:", e)
+
+    @staticmethod
+    def _page_key(url: QUrl) -> str:
+        return url.toString(QUrl.UrlFormattingOption.RemoveFragment)
+
+    def record_block(self, page_url: QUrl) -> None:
+        key = self._page_key(page_url)
+        with self._lock:
+            counts = self._blocked
+            counts[key] = counts.pop(key, 0) + 1  # re-insert: most recent last
+            if len(counts) > MAX_COUNTED_PAGES:
+                del counts[next(iter(counts))]
+
+    def blocked_on(self, page_url: QUrl) -> int:
+        key = self._page_key(page_url)
+        with self._lock:
+            return self._blocked.get(key, 0)
+
+    def reset(self, page_url: QUrl) -> None:
+        key = self._page_key(page_url)
+        with self._lock:
+            self._blocked.pop(key, None)
+
+
+class RequestInterceptor(QWebEngineUrlRequestInterceptor):
+    """Blocks requests the ContentBlocker's lists match. One per profile."""
+
+    def __init__(self, blocker: ContentBlocker, parent=None):
+        super().__init__(parent)
+        self.blocker = blocker
+
+    def interceptRequest(self, info):
+        matcher = self.blocker.matcher
+        if matcher is None:
+            return
+        rtype = info.resourceType()
+        # Never block what the user navigated to, only what pages pull in
+        if rtype == _MAIN_FRAME:
+            return
+        url = info.requestUrl()
+        if url.scheme() not in _BLOCKABLE_SCHEMES:
+            return
+        first_party = info.firstPartyUrl()
+        if matcher.should_block(url.toString(), url.host(), first_party.host(),
+                                _TYPE_NAMES.get(rtype, "other")):
+            info.block(True)
+            self.record_block(first_party)
+
+    def record_block(self, first_party: QUrl) -> None:
+        self.blocker.record_block(first_party)
+
+
+class PageInterceptor(RequestInterceptor):
+    """The same filter for one page, counting what it blocks there (Qt6)."""
+
+    def __init__(self, blocker: ContentBlocker, parent=None):
+        super().__init__(blocker, parent)
+        self.blocked = 0
+        self._page_key = ""
+
+    def record_block(self, first_party: QUrl) -> None:
+        self.blocked += 1
+
+    def reset(self, page_url: QUrl) -> None:
+        """The page navigated; a fragment or same-URL change keeps the count."""
+        key = ContentBlocker._page_key(page_url)
+        if key != self._page_key:
+            self._page_key = key
+            self.blocked = 0
+
+
+def install_interceptor(profile) -> Optional[RequestInterceptor]:
+    """Filter every request made by pages of ``profile`` (Qt5; Qt6 filters per page)."""
+    if not ADBLOCK_ENABLED or PAGE_INTERCEPTORS:
+        return None
+    interceptor = RequestInterceptor(ContentBlocker.shared(), profile)
+    profile.setUrlRequestInterceptor(interceptor)
+    return interceptor
+
+
+def attach_interceptor(page) -> Optional[PageInterceptor]:
+    """Filter ``page``'s requests and count its blocks; None where the profile does it."""
+    if not ADBLOCK_ENABLED or not PAGE_INTERCEPTORS:
+        return None
+    # The page doesn't take ownership, so it is made the parent
+    interceptor = PageInterceptor(ContentBlocker.shared(), page)
+    page.setUrlRequestInterceptor(interceptor)
+    return interceptor
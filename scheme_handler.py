@@ -0,0 +1,230 @@
+import itertools
+import json
+import mimetypes
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from constants import ASSETS_DIR
+from history_store import HistoryStore
+from qtcompat import (
+    QBuffer, QByteArray, QFile, QIODevice, QUrl, QWebEngineUrlRequestJob,
+    QWebEngineUrlScheme, QWebEngineUrlSchemeHandler, pyqtSignal
+)
+
+
+SCHEME = b"tbrowser"
+
+# Upper bound for one /api page, whatever the page asks for
+MAX_PAGE = 500
+
+# Built-in pages: (host, path) -> file under assets/
+PAGES = {
+    ("newtab", "/"): "browser_pages/new_tab.html",
+    ("newtab", "/private"): "browser_pages/new-ptab.html",
+    ("history", "/"): "browser_pages/history.html",
+    ("help", "/"): "browser_pages/help.html",
+    ("commands", "/"): "browser_pages/commands.html",
+    ("perf", "/"): "browser_pages/perf.html",
+}
+
+NEW_TAB_URL = "tbrowser://newtab/"
+PRIVATE_TAB_URL = "tbrowser://newtab/private"
+
+# Pages and assets only change with the app; data is always fetched fresh
+STATIC_CACHE = b"max-age=3600"
+NO_CACHE = b"no-store"
+
+# Assets up to this size are kept in memory; larger ones stream from disk
+MAX_CACHED_ASSET = 512 * 1024
+
+# real path -> (mtime_ns, size, bytes); re-read only when the file changes
+_ASSET_CACHE: Dict[str, Tuple[int, int, bytes]] = {}
+
+
+def asset_path(relpath: str) -> Optional[str]:
+    """Real path of ``relpath`` under assets/, or None if it escapes it."""
+    root = os.path.realpath(ASSETS_DIR)
+    path = os.path.realpath(os.path.join(root, relpath))
+    return path if path.startswith(root + os.sep) else None
+
+
+def read_asset(path: str, st: os.stat_result) -> Optional[bytes]:
+    """Contents of the asset at ``path`` (stat'ed as ``st``), from memory
+    while its mtime and size are unchanged; None if it is too big to keep."""
+    if st.st_size > MAX_CACHED_ASSET:
+        return None
+    cached = _ASSET_CACHE.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    with open(path, "rb") as f:
+        data = f.read()
+    _ASSET_CACHE[path] = (st.st_mtime_ns, st.st_size, data)
+    return data
+
+
+def register_scheme() -> None:
+    """Declare tbrowser:// to Chromium. Must run before QApplication exists."""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    Flag = QWebEngineUrlScheme.Flag
+    flags = Flag.SecureScheme | Flag.LocalAccessAllowed | Flag.CorsEnabled
+    if hasattr(Flag, "FetchApiAllowed"):  # Qt >= 6.6
+        flags |= Flag.FetchApiAllowed
+    scheme.setFlags(flags)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def install_scheme_handler(profile) -> "InternalSchemeHandler":
+    """Serve tbrowser:// for every page created from ``profile``."""
+    handler = InternalSchemeHandler(profile)
+    profile.installUrlSchemeHandler(SCHEME, handler)
+    return handler
+
+
+class InternalSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Serves built-in pages, files from assets/ and their JSON data.
+
+    tbrowser://newtab/, help/, commands/, history/, perf/   built-in pages (see PAGES)
+    tbrowser://assets/<path>                         any file under assets/
+    tbrowser://history/api?...    JSON: {"entries": [...], "next": cursor}
+    tbrowser://commands/api       JSON: {"name": "template", ...}
+    tbrowser://perf/api           JSON: {"tabs": [...], "renderers": n, ...}
+
+    History queries run on a worker thread and the job is answered when
+    they finish, so a search over a large history never blocks the UI.
+    """
+
+    # (job key, JSON body or None on failure), from the worker thread
+    _history_done = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-api")
+        self._jobs = {}  # key -> job still waiting for its answer
+        self._keys = itertools.count()
+        self._history_done.connect(self._answer_history)
+
+    @property
+    def history(self) -> HistoryStore:
+        # Opened on first use, not when the handler is installed at startup
+        return HistoryStore.shared()
+
+    def requestStarted(self, job):
+        url = job.requestUrl()
+        host, path = url.host(), url.path() or "/"
+        query = url.query(QUrl.ComponentFormattingOption.FullyEncoded)
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        try:
+            if (host, path) in PAGES:
+                self._reply_file(job, PAGES[(host, path)])
+            elif host == "assets":
+                self._reply_file(job, path.lstrip("/"))
+            elif host == "history" and path == "/api":
+                self._start_history(job, params)
+            elif host == "commands" and path == "/api":
+                self._reply(job, b"application/json", self._commands_api())
+            elif host == "perf" and path == "/api":
+                self._reply(job, b"application/json", self._perf_api())
+            else:
+                job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+        except Exception as e:
+            print("[scheme] failed serving", url.toString(), e)
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+
+    def _start_history(self, job, params: dict) -> None:
+        HistoryStore.shared()  # opened on the UI thread, not by the worker
+        key = next(self._keys)
+        self._jobs[key] = job
+        # A cancelled request deletes its job; don't answer it after that
+        job.destroyed.connect(lambda _=None, k=key: self._jobs.pop(k, None))
+        self._pool.submit(self._run_history, key, params)
+
+    def _run_history(self, key: int, params: dict) -> None:
+        try:
+            body = self._history_api(params)
+        except Exception as e:
+            print("[scheme] history query failed:", e)
+            body = None
+        self._history_done.emit(key, body)
+
+    def _answer_history(self, key: int, body) -> None:
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return
+        if body is None:
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+        else:
+            self._reply(job, b"application/json", body)
+
+    def _history_api(self, params: dict) -> str:
+        limit = max(1, min(MAX_PAGE, int(params.get("limit") or 100)))
+        query = (params.get("q") or "").strip()
+        if query:
+            # Search results are already ranked and capped: one chunk
+            return json.dumps({"entries": self.history.search(query, limit), "next": None})
+        before = params.get("before")
+        entries, next_cursor = self.history.page(before or None, limit)
+        return json.dumps({"entries": entries, "next": next_cursor})
+
+    def _commands_api(self) -> str:
+        # The registry's in-memory copy of commands.json, no disk read (and a
+        # late import: commands imports this module)
+        from commands import user_commands
+        return json.dumps(user_commands().entries)
+
+    def _perf_api(self) -> str:
+        # Late imports, like _commands_api: MainWindow imports this module
+        from MainWindow import MainWindow
+        from perf import snapshot
+        return json.dumps(snapshot(MainWindow.windows))
+
+    def _reply_file(self, job, relpath: str) -> None:
+        path = asset_path(relpath)
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        content_type = (mimetypes.guess_type(path)[0] or "application/octet-stream").encode()
+        # Nothing caches these responses before Qt 6.8 (see _set_headers),
+        # so pages opened with every new tab are served from memory
+        data = read_asset(path, st)
+        self._set_headers(job, STATIC_CACHE, st.st_mtime)
+        if data is not None:
+            self._reply_bytes(job, content_type, data)
+            return
+        # Chromium reads a big file itself, off the UI thread
+        f = QFile(path, job)
+        if not f.open(QIODevice.OpenModeFlag.ReadOnly):
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+            return
+        job.reply(content_type, f)
+
+    def _reply(self, job, content_type: bytes, body: str) -> None:
+        self._set_headers(job, NO_CACHE)
+        self._reply_bytes(job, content_type, body.encode("utf-8"))
+
+    @staticmethod
+    def _reply_bytes(job, content_type: bytes, data: bytes) -> None:
+        # The buffer is parented to the job so it lives exactly as long as the reply
+        buf = QBuffer(job)
+        buf.setData(QByteArray(data))
+        buf.open(QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(content_type, buf)
+
+    @staticmethod
+    def _set_headers(job, cache_control: bytes, mtime: float = None) -> None:
+        # Response headers need Qt >= 6.8; older versions use Chromium defaults
+        if not hasattr(job, "setAdditionalResponseHeaders"):
+            return
+        headers = {QByteArray(b"Cache-Control"): QByteArray(cache_control)}
+        if mtime is not None:
+            modified = formatdate(mtime, usegmt=True).encode()
+            headers[QByteArray(b"Last-Modified")] = QByteArray(modified)
+        job.setAdditionalResponseHeaders(headers)
@@ -0,0 +1,206 @@
+import os
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from constants import (
+    CAPTURE_TILES_IN_FLIGHT, SCREENSHOT_ASK, SCREENSHOT_DIR, SCREENSHOT_FORMAT,
+    SCREENSHOT_QUALITY, SCREENSHOT_WORKERS
+)
+from pngstream import PngStreamWriter
+from qtcompat import QImage, QImageWriter, QObject, USING_QT6, pyqtSignal
+
+
+# Option name -> (Qt format, file extension, dialog filter)
+FORMATS = {
+    "png": ("PNG", "png", "PNG Image (*.png)"),
+    "jpg": ("JPEG", "jpg", "JPEG Image (*.jpg *.jpeg)"),
+    "jpeg": ("JPEG", "jpg", "JPEG Image (*.jpg *.jpeg)"),
+    "webp": ("WEBP", "webp", "WebP Image (*.webp)"),
+}
+
+_RGB32 = QImage.Format.Format_RGB32 if USING_QT6 else QImage.Format_RGB32
+_RGB888 = QImage.Format.Format_RGB888 if USING_QT6 else QImage.Format_RGB888
+
+
+class CaptureOptions:
+    """What /capture:<options> asked for, e.g. "jpg,80,save" or "all,full"."""
+
+    __slots__ = ("fmt", "quality", "ask", "full", "all")
+
+    def __init__(self, fmt: str = SCREENSHOT_FORMAT, quality: int = SCREENSHOT_QUALITY,
+                 ask: bool = SCREENSHOT_ASK, full: bool = False, all: bool = False):
+        self.fmt = fmt
+        self.quality = quality
+        self.ask = ask
+        self.full = full    # the whole page, in tiles (always PNG)
+        self.all = all      # every tab of every window, saved without dialogs
+
+
+def parse_capture_options(arg: str) -> CaptureOptions:
+    """Comma/space separated: a format, a 1-100 quality, "save" or "ask",
+    "full" and "all".
+
+    Raises ValueError on anything else.
+    """
+    opts = CaptureOptions()
+    for token in re.split(r"[\s,]+", (arg or "").strip().lower()):
+        if not token:
+            continue
+        if token in FORMATS:
+            opts.fmt = token
+        elif token.isdigit() and 1 <= int(token) <= 100:
+            opts.quality = int(token)
+        elif token in ("save", "ask"):
+            opts.ask = token == "ask"
+        elif token in ("full", "all"):
+            setattr(opts, token, True)
+        else:
+            raise ValueError(f"Unknown capture option: {token}\n"
+                             "Try /capture:png|jpg|webp,<quality>,save|ask,full,all")
+    if opts.fmt not in FORMATS:
+        opts.fmt = "png"
+    return opts
+
+
+_supported = None
+
+
+def writable(fmt: str) -> bool:
+    """Whether Qt has an image writer for ``fmt`` (WebP needs qt-imageformats)."""
+    global _supported
+    if _supported is None:
+        _supported = {bytes(f).decode().lower() for f in QImageWriter.supportedImageFormats()}
+    return FORMATS[fmt][1] in _supported or FORMATS[fmt][0].lower() in _supported
+
+
+class ScreenshotSaver(QObject):
+    """Encodes and writes captures on a small worker pool.
+
+    A 4K grab takes tens of milliseconds to copy but hundreds to encode as
+    PNG, so only the copy stays on the UI thread. Images are written to a
+    ".part" file and renamed, so a half-written capture never appears under
+    the final name. Results come back through a queued signal.
+    """
+
+    _done = pyqtSignal(object)
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "ScreenshotSaver":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, workers: int = SCREENSHOT_WORKERS):
+        super().__init__()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers),
+                                        thread_name_prefix="screenshot")
+        self._reserved = set()  # paths handed out but not written yet
+        self._done.connect(self._deliver)
+
+    def default_path(self, ext: str, directory=SCREENSHOT_DIR) -> str:
+        """A fresh name in ``directory``, also unique among queued captures."""
+        stem = os.path.join(str(directory), time.strftime("tbrowser_%Y%m%d_%H%M%S"))
+        path, n = f"{stem}.{ext}", 1
+        while path in self._reserved or os.path.exists(path):
+            n += 1
+            path = f"{stem}_{n}.{ext}"
+        return path
+
+    def submit(self, image: QImage, path: str, opts: CaptureOptions,
+               on_done: Callable[[Dict], None], **info) -> None:
+        """Encode ``image`` to ``path`` off the UI thread, then call ``on_done``
+        on the UI thread with a result dict (path, ok, error, encode_ms and
+        whatever ``info`` holds)."""
+        self._reserved.add(path)
+        result = dict(info, path=path, ok=False, error="", encode_ms=0.0, on_done=on_done)
+        self._pool.submit(self._encode, image, opts, result)
+
+    def stream(self, path: str, width: int, height: int,
+               on_done: Callable[[Dict], None], **info) -> "queue.Queue":
+        """Start a PNG of ``width`` x ``height`` that arrives in tiles.
+
+        Put (QImage, first_row) for each tile on the returned queue, then
+        None. The queue holds CAPTURE_TILES_IN_FLIGHT tiles; callers on the
+        UI thread check full() rather than block on put().
+        """
+        tiles: "queue.Queue" = queue.Queue(maxsize=CAPTURE_TILES_IN_FLIGHT)
+        self._reserved.add(path)
+        result = dict(info, path=path, ok=False, error="", encode_ms=0.0, on_done=on_done)
+        self._pool.submit(self._stream, tiles, width, height, result)
+        return tiles
+
+    def _stream(self, tiles: "queue.Queue", width: int, height: int, result: Dict) -> None:
+        writer = None
+        drained = False
+        busy = 0.0  # time spent encoding, not waiting for the next tile
+        try:
+            os.makedirs(os.path.dirname(result["path"]) or ".", exist_ok=True)
+            writer = PngStreamWriter(result["path"], width, height)
+            while True:
+                item = tiles.get()
+                if item is None:
+                    drained = True
+                    break
+                started = time.perf_counter()
+                image, first = item
+                data, stride = rgb_bytes(image)
+                writer.write_rows(data, stride, image.height() - first, first)
+                busy += time.perf_counter() - started
+            started = time.perf_counter()
+            writer.close()
+            busy += time.perf_counter() - started
+            result["ok"] = True
+        except Exception as e:
+            result["error"] = str(e)
+            if writer is not None:
+                writer.abort()
+            while not drained and tiles.get() is not None:  # let the producer finish
+                pass
+        finally:
+            result["encode_ms"] = busy * 1000.0
+            self._done.emit(result)
+
+    def _encode(self, image: QImage, opts: CaptureOptions, result: Dict) -> None:
+        started = time.perf_counter()
+        path = result["path"]
+        qt_fmt = FORMATS[opts.fmt][0]
+        tmp = f"{path}.part"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if qt_fmt == "JPEG":
+                image = image.convertToFormat(_RGB32)  # no alpha channel in JPEG
+            quality = -1 if qt_fmt == "PNG" else opts.quality
+            if image.save(tmp, qt_fmt, quality):
+                os.replace(tmp, path)
+                result["ok"] = True
+            else:
+                result["error"] = f"could not encode {qt_fmt}"
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            if not result["ok"] and os.path.exists(tmp):
+                os.remove(tmp)
+            result["encode_ms"] = (time.perf_counter() - started) * 1000.0
+            self._done.emit(result)
+
+    def _deliver(self, result: Dict) -> None:
+        self._reserved.discard(result["path"])
+        try:
+            result.pop("on_done")(result)
+        except RuntimeError:
+            pass  # the window went away while the capture was encoding
+        except Exception as e:
+            print("[screenshot] result handler failed:", e)
+
+
+def rgb_bytes(image: QImage):
+    """(packed RGB rows, bytes per row) for ``image``; any thread."""
+    rgb = image.convertToFormat(_RGB888)
+    bits = rgb.constBits()
+    bits.setsize(rgb.sizeInBytes() if USING_QT6 else rgb.byteCount())
+    return bytes(bits), rgb.bytesPerLine()
@@ -0,0 +1,99 @@
+import json
+import os
+from typing import Dict, List
+
+from constants import SESSION_FILE
+from qtcompat import QObject, QTimer
+
+
+# Coalesce bursts of url/title changes into one write
+SAVE_DELAY_MS = 1000
+
+
+def write_json_atomic(path, data) -> None:
+    """Write JSON to a temp file next to ``path`` and rename it into place."""
+    path = str(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SessionManager(QObject):
+    """Persists the open windows and their (non-private) tabs.
+
+    Windows report changes with mark_dirty(); only those windows are
+    re-snapshotted, and the file is rewritten at most once per SAVE_DELAY_MS.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls, windows: list) -> "SessionManager":
+        if cls._shared is None:
+            cls._shared = cls(windows)
+        return cls._shared
+
+    def __init__(self, windows: list, path=SESSION_FILE):
+        super().__init__()
+        self.windows = windows      # MainWindow.windows, shared by reference
+        self.path = path
+        self._snapshots: Dict[object, dict] = {}
+        self._dirty = set()
+        self._frozen = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SAVE_DELAY_MS)
+        self._timer.timeout.connect(self.save_now)
+
+    def load(self) -> List[dict]:
+        """Saved windows as [{"tabs": [{"url", "title"}], "current": i}]."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return [w for w in data.get("windows", []) if w.get("tabs")]
+        except Exception:
+            return []
+
+    def mark_dirty(self, window) -> None:
+        if self._frozen:
+            return
+        self._dirty.add(window)
+        self._timer.start()
+
+    def freeze(self) -> None:
+        """Stop saving (the last window is closing; keep what's on disk)."""
+        self._timer.stop()
+        self._frozen = True
+
+    def _snapshot(self, window) -> dict:
+        tabs = []
+        current = 0
+        for i in range(window.stack.count()):
+            tab = window.stack.widget(i)
+            if tab.is_private():
+                continue
+            if i == window.tabbar.currentIndex():
+                current = len(tabs)
+            tabs.append({"url": tab.url().toString(), "title": tab.title()})
+        return {"tabs": tabs, "current": current}
+
+    def save_now(self) -> None:
+        self._timer.stop()
+        if self._frozen:
+            return  # the last window already saved; quitting must not empty it
+        for window in list(self._snapshots):
+            if window not in self.windows:
+                del self._snapshots[window]
+        for window in self.windows:
+            if window in self._dirty or window not in self._snapshots:
+                self._snapshots[window] = self._snapshot(window)
+        self._dirty.clear()
+        data = {"windows": [self._snapshots[w] for w in self.windows]}
+        try:
+            write_json_atomic(self.path, data)
+        except Exception as e:
+            print("[session] failed to save:", e)
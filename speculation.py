@@ -0,0 +1,148 @@
+import html
+import time
+from typing import Optional
+
+from BrowserTab import BrowserTab
+from commands import resolve_command
+from constants import MAX_PRERENDERS, PRECONNECT_DELAY_MS, PRERENDER_DELAY_MS
+from qtcompat import QObject, QTimer, QUrl, QWebEnginePage, QWebEngineProfile
+
+
+class Speculator(QObject):
+    """Warms up the page a palette command is about to open.
+
+    Each time the palette text changes, both timers restart and any
+    prerender of a different URL is thrown away, so only a pause in typing
+    costs anything:
+
+    * after PRECONNECT_DELAY_MS the command's origin is preconnected, by a
+      hidden page whose only content is <link rel="preconnect">; the socket
+      lands in the default profile's pool, where the real load picks it up.
+    * after PRERENDER_DELAY_MS, for commands that open a new tab, the URL
+      starts loading in a hidden, muted BrowserTab. If Enter resolves to the
+      same URL, the window adopts that tab instead of making a new one.
+
+    Commands that load into the current tab are only preconnected (adopting
+    a prerender there would drop the tab's back history), private ones are
+    left alone, and at most MAX_PRERENDERS pages load per palette opening.
+    """
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self._text = ""
+        self._target = None          # (url string, QUrl, where) for self._text
+        self._preconnected = ""      # last origin warmed
+        self._preconnect_page: Optional[QWebEnginePage] = None
+        self._tab: Optional[BrowserTab] = None
+        self._tab_url = ""
+        self._tab_started = 0.0
+        self._tab_finished: Optional[bool] = None
+        self._prerenders = 0
+        self.stats = {"preconnects": 0, "prerenders": 0, "hits": 0, "wasted": 0}
+        self.last_head_start_ms = 0.0  # prerender start to Enter, on the last hit
+
+        self._preconnect_timer = QTimer(self)
+        self._preconnect_timer.setSingleShot(True)
+        self._preconnect_timer.setInterval(PRECONNECT_DELAY_MS)
+        self._preconnect_timer.timeout.connect(self._preconnect)
+
+        self._prerender_timer = QTimer(self)
+        self._prerender_timer.setSingleShot(True)
+        self._prerender_timer.setInterval(PRERENDER_DELAY_MS)
+        self._prerender_timer.timeout.connect(self._prerender)
+
+    @staticmethod
+    def _resolve(text: str):
+        resolved = resolve_command(text.strip())
+        if resolved is None:
+            return None
+        url, where = resolved
+        if where == "private" or url.scheme() not in ("http", "https") or not url.host():
+            return None
+        return url.toString(), url, where
+
+    # --- Palette hooks --------------------------------------------------------
+    def update(self, text: str) -> None:
+        """The palette text changed: restart the timers, drop stale work."""
+        if text == self._text:
+            return
+        self._text = text
+        self._target = self._resolve(text)
+        self._preconnect_timer.stop()
+        self._prerender_timer.stop()
+        if self._target is None or self._target[0] != self._tab_url:
+            self._discard()
+        if self._target is not None:
+            self._preconnect_timer.start()
+            if (self._target[2] == "new" and self._tab is None
+                    and self._prerenders < MAX_PRERENDERS):
+                self._prerender_timer.start()
+
+    def commit(self, text: str) -> bool:
+        """Enter was pressed on ``text``; adopt the prerender if it matches."""
+        target = self._resolve(text)
+        if self._tab is None or target is None or target[0] != self._tab_url:
+            return False
+        tab, finished = self._tab, self._tab_finished
+        self._tab, self._tab_url = None, ""
+        self.stats["hits"] += 1
+        self.last_head_start_ms = (time.perf_counter() - self._tab_started) * 1000.0
+        tab.view.page().setAudioMuted(False)
+        self.window.adopt_tab(tab, finished)
+        return True
+
+    def reset(self) -> None:
+        """The palette closed: cancel everything, start the next opening fresh."""
+        self._preconnect_timer.stop()
+        self._prerender_timer.stop()
+        self._discard()
+        self._text = ""
+        self._target = None
+        self._prerenders = 0
+
+    # --- Speculation ----------------------------------------------------------
+    def _preconnect(self) -> None:
+        url = self._target[1]
+        origin = f"{url.scheme()}://{url.host()}"
+        if url.port() != -1:
+            origin += f":{url.port()}"
+        if origin == self._preconnected:
+            return
+        if self._preconnect_page is None:
+            self._preconnect_page = QWebEnginePage(QWebEngineProfile.defaultProfile(), self)
+        href = html.escape(origin, quote=True)
+        self._preconnect_page.setHtml(
+            f'<link rel="dns-prefetch" href="{href}"><link rel="preconnect" href="{href}">',
+            QUrl("about:blank"),
+        )
+        self._preconnected = origin
+        self.stats["preconnects"] += 1
+
+    def _prerender(self) -> None:
+        url_str, url, _where = self._target
+        tab = BrowserTab(self.window, url=url, private=False)
+        tab.hide()
+        tab.resize(self.window.stack.size())
+        tab.view.page().setAudioMuted(True)
+        tab.view.loadFinished.connect(lambda ok, t=tab: self._on_prerender_finished(t, ok))
+        self._tab, self._tab_url = tab, url_str
+        self._tab_started = time.perf_counter()
+        self._tab_finished = None
+        self._prerenders += 1
+        self.stats["prerenders"] += 1
+
+    def _on_prerender_finished(self, tab: BrowserTab, ok: bool) -> None:
+        if tab is self._tab:
+            self._tab_finished = ok
+
+    def _discard(self) -> None:
+        if self._tab is None:
+            return
+        tab, self._tab, self._tab_url = self._tab, None, ""
+        try:
+            tab.view.stop()
+        except Exception as e:
+            print("[speculation] stop failed:", e)
+        tab.deleteLater()
+        self.stats["wasted"] += 1
@@ -0,0 +1,144 @@
+"""Opt-in detector for UI-thread stalls (--watch-stalls or STALL_WATCHDOG).
+
+A watchdog thread pings the Qt event loop through a queued signal. When
+no answer comes within STALL_THRESHOLD_MS, it samples the main thread's
+Python stack with sys._current_frames() every STALL_SAMPLE_MS until the
+answer arrives. Samples are aggregated per stack and written in folded
+format ("outer;inner;leaf count") for flamegraph.pl, inferno or
+speedscope, next to a log with one line per stall.
+
+While nothing stalls, the cost is one queued signal per STALL_PING_MS.
+Sampling needs the GIL, so a stall spent in C++ that holds it (rare: PyQt
+releases it around Qt calls) shows up in the log with no samples.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from constants import (
+    STALL_PING_MS, STALL_REPORT_DIR, STALL_SAMPLE_MS, STALL_THRESHOLD_MS, STALL_WRITE_INTERVAL
+)
+from qtcompat import QObject, pyqtSignal
+
+
+class StallWatchdog(QObject):
+    """Measures how late the event loop answers, and what it was doing."""
+
+    _ping = pyqtSignal()
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "StallWatchdog":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, threshold_ms: int = STALL_THRESHOLD_MS, ping_ms: int = STALL_PING_MS,
+                 sample_ms: int = STALL_SAMPLE_MS, report_dir=STALL_REPORT_DIR):
+        super().__init__()
+        self.threshold = threshold_ms / 1000.0
+        self.ping_interval = ping_ms / 1000.0
+        self.sample_interval = sample_ms / 1000.0
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        self.folded_path = os.path.join(str(report_dir), f"stalls_{stamp}.folded")
+        self.log_path = os.path.join(str(report_dir), f"stalls_{stamp}.log")
+        self.stalls = 0
+        self.stalled_ms = 0.0
+        self._folded: Counter = Counter()   # stack -> samples, whole session
+        self._dirty = False
+        self._written = 0.0
+        self._answered = threading.Event()
+        self._answered_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._main_id = threading.main_thread().ident
+        # Emitted from the watchdog thread, so Qt queues it to the UI thread
+        self._ping.connect(self._pong)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+        print(f"[stall] watching the UI thread; stalls over {self.threshold * 1000:.0f} ms "
+              f"go to {self.folded_path}")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._answered.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self._write_folded()
+
+    # --- UI thread -----------------------------------------------------------
+    def _pong(self) -> None:
+        self._answered_at = time.perf_counter()
+        self._answered.set()
+
+    # --- Watchdog thread -----------------------------------------------------
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            self._answered.clear()
+            sent = time.perf_counter()
+            self._ping.emit()
+            if not self._answered.wait(self.threshold):
+                self._sample_stall(sent)
+            if self._dirty and time.perf_counter() - self._written >= STALL_WRITE_INTERVAL:
+                self._write_folded()
+            self._stop.wait(self.ping_interval)
+
+    def _sample_stall(self, sent: float) -> None:
+        samples: Counter = Counter()
+        while not self._answered.wait(self.sample_interval):
+            stack = self._main_stack()
+            if stack:
+                samples[stack] += 1
+        if self._stop.is_set():
+            return
+        # From the ping, so a lower bound: the stall may have begun up to
+        # one ping interval earlier
+        ms = (self._answered_at - sent) * 1000.0
+        self.stalls += 1
+        self.stalled_ms += ms
+        self._folded.update(samples)
+        self._dirty = bool(self._folded)
+        leaf = samples.most_common(1)[0][0].rsplit(";", 1)[-1] if samples else "(no samples)"
+        print(f"[stall] {ms:.0f} ms, {sum(samples.values())} samples, in {leaf}")
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(f"{time.strftime('%Y-%m-%dT%H:%M:%S')}\t{ms:.1f} ms"
+                        f"\t{sum(samples.values())} samples\t{leaf}\n")
+        except OSError as e:
+            print("[stall] could not write log:", e)
+
+    def _main_stack(self) -> str:
+        frame = sys._current_frames().get(self._main_id)
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    def _write_folded(self) -> None:
+        if not self._folded:
+            return
+        lines = [f"{stack} {count}\n" for stack, count in self._folded.most_common()]
+        tmp = f"{self.folded_path}.part"
+        try:
+            os.makedirs(os.path.dirname(self.folded_path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+            os.replace(tmp, self.folded_path)
+            self._dirty = False
+            self._written = time.perf_counter()
+        except OSError as e:
+            print("[stall] could not write report:", e)
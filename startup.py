@@ -0,0 +1,70 @@
+import time
+from typing import Callable, List, Optional, Tuple
+
+from qtcompat import QApplication, QEvent, QObject, QTimer, USING_QT6
+
+
+class StartupProfiler:
+    """Phase-by-phase cold start timings, printed by --profile-startup.
+
+    mark(name) closes the phase that ran since the previous mark. Does
+    nothing unless enabled, so the startup code can mark unconditionally.
+    """
+
+    def __init__(self, enabled: bool, started: Optional[float] = None):
+        self.enabled = enabled
+        self.started = started if started is not None else time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000.0))
+        self._last = now
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        width = max(len(name) for name, _ in self.phases) if self.phases else 0
+        for name, ms in self.phases:
+            print(f"[startup] {name:<{width}}  {ms:8.1f} ms")
+        total = (self._last - self.started) * 1000.0
+        print(f"[startup] {'total':<{width}}  {total:8.1f} ms")
+
+
+class _FirstPaint(QObject):
+    def __init__(self, window, callback: Callable[[], None]):
+        super().__init__(window)
+        self.window = window
+        self.callback = callback
+        self._paint = QEvent.Type.Paint if USING_QT6 else QEvent.Paint
+
+    def eventFilter(self, obj, event):
+        if (event.type() == self._paint and obj.isWidgetType()
+                and obj.window() is self.window):
+            QApplication.instance().removeEventFilter(self)
+            # Let this paint finish before doing anything slow
+            QTimer.singleShot(0, self.callback)
+            self.deleteLater()
+        return False
+
+
+def after_first_paint(window, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once ``window`` (or any of its children) has painted."""
+    QApplication.instance().installEventFilter(_FirstPaint(window, callback))
+
+
+def run_deferred(steps: List[Tuple[str, Callable[[], None]]], profiler: StartupProfiler) -> None:
+    """Run (name, fn) steps one per event-loop turn, so the UI can repaint between them."""
+    if not steps:
+        profiler.report()
+        return
+    name, fn = steps[0]
+    try:
+        fn()
+    except Exception as e:
+        print(f"[startup] {name} failed:", e)
+    profiler.mark(name)
+    QTimer.singleShot(0, lambda: run_deferred(steps[1:], profiler))
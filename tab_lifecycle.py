@@ -0,0 +1,117 @@
+import time
+from typing import Dict, List
+
+from constants import (
+    TAB_MEMORY_BUDGET_MB, TAB_MEMORY_ESTIMATE_MB, TAB_FREEZE_AFTER, TAB_LIFECYCLE_INTERVAL_MS
+)
+from qtcompat import QObject, QTimer, QWebEnginePage
+from utils import process_rss
+
+
+_MB = 1024 * 1024
+
+
+class TabLifecycleManager(QObject):
+    """Freezes and discards background tabs, least recently used first.
+
+    One instance for the whole process, so the memory budget covers the
+    tabs of every window. A tab left in the background for ``freeze_after``
+    seconds is Frozen (no JS, no timers, memory kept). While renderer memory
+    exceeds ``budget_mb``, the least recently activated hidden tabs are
+    Discarded (renderer state dropped; URL, title and history kept). Setting
+    a tab back to Active, which touch() does on activation, reloads it.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "TabLifecycleManager":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, budget_mb: int = TAB_MEMORY_BUDGET_MB,
+                 freeze_after: float = TAB_FREEZE_AFTER,
+                 interval_ms: int = TAB_LIFECYCLE_INTERVAL_MS):
+        super().__init__()
+        self.budget = budget_mb * _MB
+        self.freeze_after = freeze_after
+        self._last_active: Dict[object, float] = {}
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.enforce)
+        self._timer.start()
+        # Coalesces the "a tab was just opened" checks
+        self._soon = QTimer(self)
+        self._soon.setSingleShot(True)
+        self._soon.setInterval(2000)
+        self._soon.timeout.connect(self.enforce)
+
+    # --- Tracking ------------------------------------------------------------
+    def track(self, tab) -> None:
+        self._last_active.setdefault(tab, time.monotonic())
+        self._soon.start()
+
+    def touch(self, tab) -> None:
+        """Tab was activated: wake it up and mark it most recently used."""
+        self._last_active[tab] = time.monotonic()
+        page = tab.view.page()
+        try:
+            if page.lifecycleState() != QWebEnginePage.LifecycleState.Active:
+                page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        except Exception:
+            pass
+
+    def forget(self, tab) -> None:
+        self._last_active.pop(tab, None)
+
+    # --- Policy --------------------------------------------------------------
+    def _tab_memory(self, tabs: List[object]) -> Dict[object, int]:
+        """Estimated bytes per live tab; tabs sharing a renderer split its RSS."""
+        by_pid: Dict[int, List[object]] = {}
+        usage = {}
+        for tab in tabs:
+            pid = tab.renderer_pid()
+            if pid:
+                by_pid.setdefault(pid, []).append(tab)
+            else:
+                usage[tab] = TAB_MEMORY_ESTIMATE_MB * _MB
+        for pid, group in by_pid.items():
+            rss = process_rss(pid)
+            share = (rss if rss is not None else TAB_MEMORY_ESTIMATE_MB * _MB * len(group)) // len(group)
+            for tab in group:
+                usage[tab] = share
+        return usage
+
+    def enforce(self) -> None:
+        State = QWebEnginePage.LifecycleState
+        now = time.monotonic()
+        # Tabs still queued by the LoadScheduler have no page to freeze yet
+        live = [t for t in self._last_active
+                if not t.is_load_pending() and t.lifecycle_state() != State.Discarded]
+        hidden = sorted((t for t in live if not t.isVisible()), key=self._last_active.__getitem__)
+
+        for tab in hidden:
+            page = tab.view.page()
+            if (tab.lifecycle_state() == State.Active and not page.recentlyAudible()
+                    and now - self._last_active[tab] >= self.freeze_after):
+                self._set_state(tab, State.Frozen)
+
+        usage = self._tab_memory(live)
+        total = sum(usage.values())
+        for tab in hidden:
+            if total <= self.budget:
+                break
+            # Off-the-record tabs can't get their state back after a discard
+            if tab.is_private() or tab.view.page().recentlyAudible():
+                continue
+            if self._set_state(tab, State.Discarded):
+                total -= usage.get(tab, 0)
+
+    def _set_state(self, tab, state) -> bool:
+        try:
+            tab.view.page().setLifecycleState(state)
+            return True
+        except Exception as e:
+            print("[lifecycle] could not change tab state:", e)
+            return False
@@ -1,22 +1,7 @@
 import os
 import urllib
 
-from constants import ASSETS_DIR
-
-
-try:
-    from PyQt6.QtCore import Qt, QUrl, QSize, QEvent
-    from PyQt6.QtGui import QAction, QIcon, QKeySequence, QShortcut  # <-- QShortcut here!
-    from PyQt6.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
-        QLineEdit, QTabBar, QStackedWidget, QToolButton, QFileDialog, QLabel,
-        QStyle, QMessageBox, QSizePolicy
-    )
-    from PyQt6.QtWebEngineWidgets import QWebEngineView
-    from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
-    USING_QT6 = True
-except Exception:
-    from PyQt5.QtCore import Qt, QUrl, QSize, QEvent
+from qtcompat import QApplication, QIcon, QStyle, QUrl
 
 
 def to_qurl(s: str) -> QUrl:
@@ -49,11 +34,13 @@ def resource_icon(name: str) -> QIcon:
     return QIcon()
 
 
-def read_asset(filename: str) -> str:
-    path = os.path.join(ASSETS_DIR, filename)
+def process_rss(pid: int):
+    """Resident memory of ``pid`` in bytes, or None where /proc is unavailable."""
+    if not pid:
+        return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+        with open(f"/proc/{pid}/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
     except Exception:
-        return "<html><body><p>Failed to load asset: {}</p></body></html>".format(filename)
-    
\ No newline at end of file
+        return None